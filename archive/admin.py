@@ -0,0 +1,130 @@
+"""
+Disney Trip Planner - Admin Commands
+Bulk backup, migration and inspection of shared trips in Firestore
+
+USAGE:
+    python admin.py list [--limit N]
+    python admin.py stats
+    python admin.py export trips.jsonl.gz [--workers 8] [--chunk 100]
+    python admin.py import trips.jsonl.gz [--workers 8] [--no-overwrite]
+    python admin.py compact-ops [CODE ...] [--min-age 60]
+
+Shared edits live in each trip's `ops` subcollection until folded into the
+trip document; run compact-ops before export for fully merged documents.
+
+Credentials are read the same way as the app (Streamlit secrets or the
+FIREBASE_CREDENTIALS environment variable). Set FIRESTORE_EMULATOR_HOST and
+pass --emulator to run against the Firestore emulator instead.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.config.constants import (
+    BULK_READ_CHUNK, BULK_WORKERS, FIRESTORE_BATCH_LIMIT, CRDT_COMPACT_MIN_AGE
+)
+from src.storage import bulk
+from src.utils.logger import OperationContext
+
+
+def get_db(args):
+    """Resolve the Firestore client for this run"""
+    if args.emulator:
+        from src.storage.firestore import FirestoreTripStore
+        return FirestoreTripStore.for_emulator(project=args.project).db
+
+    from src.utils.firebase_config import get_firebase_manager
+    firebase = get_firebase_manager()
+    if not firebase.is_enabled():
+        sys.exit("Firebase is not configured (set FIREBASE_CREDENTIALS or use --emulator)")
+    return firebase.db
+
+
+def cmd_list(db, args):
+    for code in bulk.list_trip_codes(db, limit=args.limit):
+        print(code)
+
+
+def cmd_stats(db, args):
+    stats = bulk.trip_stats(db, chunk_size=args.chunk, workers=args.workers)
+    print(json.dumps(stats, indent=2))
+
+
+def cmd_export(db, args):
+    result = bulk.export_trips(db, Path(args.path), chunk_size=args.chunk, workers=args.workers)
+    print(f"Exported {result.trips} trips ({result.bytes / 1024:.1f} KiB raw) "
+          f"in {result.seconds:.1f}s ({result.trips_per_sec:.0f} trips/s) -> {args.path}")
+
+
+def cmd_import(db, args):
+    result = bulk.import_trips(
+        db, Path(args.path), workers=args.workers,
+        overwrite=not args.no_overwrite, batch_limit=args.batch
+    )
+    print(f"Imported {result.trips} trips in {result.batches} batches "
+          f"in {result.seconds:.1f}s ({result.trips_per_sec:.0f} trips/s)")
+    for error in result.errors:
+        print(f"  failed batch {error}", file=sys.stderr)
+    if result.errors:
+        sys.exit(1)
+
+
+def cmd_compact_ops(db, args):
+    from src.storage.firestore import FirestoreTripStore
+    store = FirestoreTripStore(db)
+    codes = args.codes or bulk.list_trip_codes(db)
+    # Codes are streamed from a collection scan, so count them as we go
+    trips = total = 0
+    for code in codes:
+        deleted = store.compact_ops(code, min_age=args.min_age)
+        if deleted:
+            print(f"{code}: folded {deleted} ops")
+        trips += 1
+        total += deleted
+    print(f"Compacted {trips} trips, {total} ops folded")
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Disney Trip Planner admin commands")
+    parser.add_argument('--emulator', action='store_true', help="Use the Firestore emulator")
+    parser.add_argument('--project', default='demo-disney', help="Project ID for --emulator")
+    parser.add_argument('--workers', type=int, default=BULK_WORKERS, help="Parallel chunk workers")
+    parser.add_argument('--chunk', type=int, default=BULK_READ_CHUNK, help="Documents per get_all() read")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_list = sub.add_parser('list', help="List trip codes")
+    p_list.add_argument('--limit', type=int, default=None)
+    p_list.set_defaults(func=cmd_list)
+
+    p_stats = sub.add_parser('stats', help="Aggregate trip statistics")
+    p_stats.set_defaults(func=cmd_stats)
+
+    p_export = sub.add_parser('export', help="Export all trips to compressed JSONL")
+    p_export.add_argument('path')
+    p_export.set_defaults(func=cmd_export)
+
+    p_import = sub.add_parser('import', help="Import trips from compressed JSONL")
+    p_import.add_argument('path')
+    p_import.add_argument('--no-overwrite', action='store_true', help="Skip trips that already exist")
+    p_import.add_argument('--batch', type=int, default=FIRESTORE_BATCH_LIMIT, help="Writes per batch commit")
+    p_import.set_defaults(func=cmd_import)
+
+    p_compact = sub.add_parser('compact-ops', help="Fold shared-edit op logs into trip documents")
+    p_compact.add_argument('codes', nargs='*', help="Trip codes (default: every trip)")
+    p_compact.add_argument('--min-age', type=float, default=CRDT_COMPACT_MIN_AGE,
+                           help="Only delete ops older than this many seconds")
+    p_compact.set_defaults(func=cmd_compact_ops)
+
+    args = parser.parse_args()
+    # One span per command; bulk workers and Firebase start-up nest under it
+    with OperationContext(f"admin.{args.command}", {'emulator': args.emulator}):
+        args.func(get_db(args), args)
+
+
+if __name__ == "__main__":
+    main()
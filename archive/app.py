@@ -10,24 +10,36 @@ ARCHITECTURE:
 """
 import streamlit as st
 import os
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
+import sys
+from datetime import datetime, timedelta, timezone
 import time
-import pytz
 import pickle
 from pathlib import Path
 
 # Core modules
-from src.agents.trip_planner_agent import TripPlannerAgent
-from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
+from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion, trim_ideas
 from src.utils.helpers import calculate_countdown, format_countdown, get_trip_phase
-from src.utils.firebase_config import get_firebase_manager
+from src.utils.firebase_config import get_firebase_manager, start_firebase_warmup
+from src.utils.journal import get_trip_journal
+from src.storage.chat_log import ChatLog, get_chat_log
+from src.storage.codec import encode_trip
+from src.storage.versioning import merge_fields
+from src.storage.crdt import CRDT_FIELDS, TripCRDT, ops_for_change, document_fields_for_change, pull_cursor
+from src.utils.session_state import (
+    SECTIONS, SUMMARY_FIELDS, start_session, start_empty_session, is_hydrated,
+    hydrate, hydrated_trip_data, current_summary, page_ideas, list_index, mark_changed, page_window,
+    session_clock, session_replica, merge_replica, apply_remote_ops
+)
 
 # New modular architecture
-from src.ui.styles import apply_custom_styles
+from src.ui.styles import apply_custom_styles, publish_stylesheet
+from src.ui.perf_dashboard import render_perf_dashboard
+from src.ui.checklist_grid import checklist_grid, grid_events
+from src.ui.chat_view import message_markdown, render_messages
 from src.config.constants import (
-    MAX_CHAT_HISTORY, MAX_IDEAS, MAX_PENDING_SUGGESTIONS,
-    DATA_DIR, DATA_FILE, EMOJI, CHECKLIST_CATEGORIES,
+    MAX_IDEAS, MAX_PENDING_SUGGESTIONS,
+    DATA_DIR, DATA_FILE, LOCAL_PERSISTENCE_MODE, EMOJI, CHECKLIST_CATEGORIES,
+    CRDT_PULL_INTERVAL, CRDT_PULL_OVERLAP, CHECKLIST_PAGE_SIZE, CHAT_WINDOW,
     IDEA_CATEGORIES, PRIORITY_LEVELS
 )
 from src.utils.logger import (
@@ -35,100 +47,344 @@ from src.utils.logger import (
     show_error, show_warning, show_info, show_success,
     safe_execute
 )
+from src.utils.events import APP_RERUN, SECTIONS_LOADED, SHARED_EDITS_MERGED, TRIP_SAVED, emit
+from src.utils.tracing import span, traced
+from src.utils.metrics import start_metrics_export
+from src.utils.access import is_admin
+from src.utils.reruns import instrumented_fragment, instrumented_rerun
+from src.utils.memory import enforce_memory_budget
+
+@st.cache_resource(show_spinner=False)
+def load_environment():
+    """Load .env once per process rather than on every rerun"""
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
-# Log application start
-log_info("Disney Trip Planner application starting")
+# Connect to Firebase in the background while the page renders
+start_firebase_warmup()
+start_metrics_export()
 
-# Page configuration
-st.set_page_config(
-    page_title=f"{EMOJI['castle']} Disney Trip Planner",
-    page_icon=EMOJI['castle'],
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Every interaction reruns this script; logged only at DEBUG
+emit(APP_RERUN)
+
+# Served by Streamlit at app/static/ when server.enableStaticServing is on
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+
+
+@st.cache_resource(show_spinner=False)
+def theme_styles() -> str:
+    """Theme HTML, compiled once per process: a link to the hashed stylesheet, or inline CSS"""
+    static_url = None
+    if st.get_option('server.enableStaticServing'):
+        try:
+            static_url = f"app/static/{publish_stylesheet(STATIC_DIR)}"
+        except OSError as e:
+            log_warning("Could not publish stylesheet; inlining it", {'error': str(e)})
+    return apply_custom_styles(static_url)
+
+
+def set_up_page():
+    """Page configuration and theme; the first Streamlit calls of every rerun"""
+    st.set_page_config(
+        page_title=f"{EMOJI['castle']} Disney Trip Planner",
+        page_icon=EMOJI['castle'],
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # Apply custom styles from modular UI component
+    st.markdown(theme_styles(), unsafe_allow_html=True)
 
-# Apply custom styles from modular UI component
-log_info("Applying custom Disney castle theme")
-st.markdown(apply_custom_styles(), unsafe_allow_html=True)
+
+# Must run before the session setup below, which can already call st.warning
+# or st.error; Streamlit before 1.44 rejects set_page_config after those
+set_up_page()
 
 # Constants now imported from src.config.constants
 
 # Data persistence functions
 
-def save_trip_data():
-    """Save trip data to Firebase and local disk"""
-    # Limit chat history size to conserve memory
-    chat_history = st.session_state.chat_history
-    if len(chat_history) > MAX_CHAT_HISTORY:
-        chat_history = chat_history[-MAX_CHAT_HISTORY:]  # Keep only last 50 messages
-        st.session_state.chat_history = chat_history
+@traced('save_trip_data')
+def save_trip_data(op: str = None, replace: bool = False, **fields):
+    """
+    Save trip data to Firebase and local disk
+
+    Args:
+        op: Journal operation describing what changed (e.g. 'item_toggled').
+            When omitted, a full local snapshot is written instead.
+        replace: The whole trip was regenerated; overwrite the shared copy
+                 rather than merging with it
+        **fields: Operation payload recorded in the local journal
+    """
+    started = time.perf_counter()
+    mark_changed()
+    trip_code = st.session_state.get('trip_code')
+    firebase = get_firebase_manager()
+    cloud = bool(trip_code) and firebase.is_enabled()
+    from_cloud = st.session_state.get('trip_source') == 'cloud'
 
-    # Limit ideas list to conserve memory
-    ideas = st.session_state.ideas
-    if len(ideas) > MAX_IDEAS:
-        ideas = ideas[-MAX_IDEAS:]  # Keep only last 30 ideas
-        st.session_state.ideas = ideas
+    # Full snapshots, pickle files, a trip's first cloud save and queued
+    # changes need every section; other changes to a shared trip are
+    # written as small CRDT ops
+    if (op is None or LOCAL_PERSISTENCE_MODE != "journal"
+            or (cloud and (not from_cloud or st.session_state.get('unsynced_changes')))):
+        load_section(*SECTIONS)
 
     # Limit pending suggestions to conserve memory
-    pending_suggestions = st.session_state.get('pending_suggestions', [])
-    if len(pending_suggestions) > MAX_PENDING_SUGGESTIONS:
-        pending_suggestions = pending_suggestions[-MAX_PENDING_SUGGESTIONS:]
-        st.session_state.pending_suggestions = pending_suggestions
-
-    data = {
-        'trip_details': st.session_state.trip_details,
-        'checklist': st.session_state.checklist,
-        'ideas': ideas,
-        'chat_history': chat_history,
-        'rejected_items': st.session_state.get('rejected_items', set()),
-        'pending_suggestions': pending_suggestions
-    }
-
-    # Try Firebase first if trip code is set
-    trip_code = st.session_state.get('trip_code')
-    if trip_code:
-        firebase = get_firebase_manager()
-        if firebase.is_enabled():
-            try:
-                firebase.save_trip(trip_code, data)
-            except Exception as e:
-                pass  # Fail silently to avoid UI clutter
+    if is_hydrated('chat'):
+        pending_suggestions = st.session_state.pending_suggestions
+        if len(pending_suggestions) > MAX_PENDING_SUGGESTIONS:
+            st.session_state.pending_suggestions = pending_suggestions[-MAX_PENDING_SUGGESTIONS:]
+
+    data = trip_data_to_save()
+
+    # Try Firebase first if trip code is set. A change that cannot reach it
+    # (still starting, or the write failed) is queued and sent later.
+    if cloud:
+        if not (flush_unsynced(firebase, trip_code, data)
+                and try_save_to_cloud(firebase, trip_code, data, op, fields, replace and from_cloud)):
+            queue_unsynced(op, fields, replace and from_cloud)
+    elif trip_code and not firebase.is_ready():
+        queue_unsynced(op, fields, replace and from_cloud)
 
     # Always save locally as backup (but don't if it fails)
     try:
-        DATA_DIR.mkdir(exist_ok=True)
-        with open(DATA_FILE, 'wb') as f:
-            pickle.dump(data, f)
-    except Exception:
-        pass  # Fail silently
-
-def load_trip_data(trip_code: str = None):
-    """Load trip data from Firebase or local disk"""
-    # Try Firebase first if trip code is provided
-    if trip_code:
-        firebase = get_firebase_manager()
-        if firebase.is_enabled():
-            try:
-                data = firebase.load_trip(trip_code)
-                if data:
-                    return data
-            except Exception as e:
-                st.warning(f"Could not load from cloud: {e}")
+        with span('local_save', mode=LOCAL_PERSISTENCE_MODE):
+            if LOCAL_PERSISTENCE_MODE == "journal":
+                journal = get_trip_journal()
+                if op:
+                    journal.append(op, **fields)
+                else:
+                    journal.write_snapshot(data)
+            else:
+                DATA_DIR.mkdir(exist_ok=True)
+                with open(DATA_FILE, 'wb') as f:
+                    pickle.dump(data, f)
+    except Exception as e:
+        log_error("Local save failed", e, {'op': op})
+
+    emit(TRIP_SAVED, op=op or 'snapshot', cloud=cloud, ms=lambda: (time.perf_counter() - started) * 1000)
+
+def trip_data_to_save() -> dict:
+    """The loaded trip as it is written to storage"""
+    data = hydrated_trip_data()
+    # Chat lives in its own append-only log; once that log has been loaded
+    # (and any inline history migrated into it) the inline copy is dropped
+    if 'chat_log' in st.session_state:
+        data['chat_history'] = []
+    return data
+
+def queue_unsynced(op, fields: dict, replace: bool):
+    """Keep a change the shared trip has not received (it is already in the local journal)"""
+    queue = st.session_state.setdefault('unsynced_changes', [])
+    queue.append((op, fields, replace))
+    log_warning("Change not synced to the cloud; queued", {'op': op, 'queued': len(queue)})
+
+def try_save_to_cloud(firebase, trip_code: str, data: dict, op, fields: dict, replace: bool) -> bool:
+    try:
+        return save_to_cloud(firebase, trip_code, data, op, fields, replace)
+    except Exception as e:
+        log_error("Cloud save failed", e, {'op': op})
+        return False
+
+def flush_unsynced(firebase, trip_code: str, data: dict) -> bool:
+    """Send queued changes in order; returns False if any is still unsent"""
+    queue = st.session_state.get('unsynced_changes')
+    while queue:
+        op, fields, replace = queue[0]
+        if not try_save_to_cloud(firebase, trip_code, data, op, fields, replace):
+            return False
+        queue.pop(0)
+    return True
+
+def sync_unsynced_changes():
+    """Send changes saved while Firebase was still starting, once it is ready"""
+    queue = st.session_state.get('unsynced_changes')
+    trip_code = st.session_state.get('trip_code')
+    if not queue or not trip_code:
+        return
+    firebase = get_firebase_manager()
+    if firebase.is_ready():
+        if not firebase.is_enabled():
+            # Cloud sync turned out to be off; the local journal has every change
+            st.session_state.unsynced_changes = []
+            return
+        if st.session_state.get('trip_source') != 'cloud' or any(op is None for op, _, _ in queue):
+            load_section(*SECTIONS)
+        if flush_unsynced(firebase, trip_code, trip_data_to_save()):
+            log_info("Queued changes synced", {'trip_code': trip_code})
+            return
+    st.warning(f"☁️ {len(queue)} change(s) are saved on this device but not yet shared; "
+               "they will sync once cloud sync is available.")
+
+@traced('save_to_cloud')
+def save_to_cloud(firebase, trip_code: str, data: dict, op, fields: dict, replace: bool):
+    """
+    Write a change to the shared trip, conditional on the version last seen
+
+    Checklist, rejection and saved-flag edits become CRDT ops that other
+    members merge, so concurrent clicks never overwrite each other. Plain
+    fields are written only if nobody saved since this session last looked;
+    otherwise they are merged with the newer copy and retried.
+
+    Returns:
+        False if the write did not reach Firestore
+    """
+    expected = st.session_state.get('trip_version')
+    ops, loose, resolve = [], None, merge_fields
+    if replace:
+        # A regenerated plan starts a fresh op history
+        plain, resolve = dict(data, crdt={}), None
+    elif expected is None:
+        # First cloud save of this trip: create it
+        plain = dict(data)
+    elif op:
+        ops = ops_for_change(session_clock(), op, encode_trip(fields))
+        session_replica().apply_all(ops)
+        plain = {key: data[key] for key in document_fields_for_change(op) if key in data}
+    else:
+        plain = {key: value for key, value in data.items() if key not in CRDT_FIELDS}
 
-    # Fall back to local storage
+    if plain:
+        plain['summary'] = data['summary']
+    else:
+        # Summary counts are derived; they need no precondition
+        loose = {'summary': data['summary']}
+
+    result = firebase.write_trip(trip_code, plain, expected, ops=ops, loose=loose, resolve=resolve)
+    if result is None:
+        return False
+    st.session_state.trip_version, written = result
+
+    if replace:
+        firebase.clear_trip_ops(trip_code)
+    if replace or expected is None:
+        st.session_state.trip_source = 'cloud'
+        st.session_state.trip_crdt = TripCRDT.from_document(encode_trip(data))
+    # A conflict merge may have pulled in ideas other members added
+    if 'ideas' in written and written['ideas'] is not data.get('ideas'):
+        st.session_state.ideas = written['ideas']
+    return True
+
+def load_local_trip_data():
+    """Load trip data from local disk"""
     try:
+        if LOCAL_PERSISTENCE_MODE == "journal":
+            journal = get_trip_journal()
+            if journal.exists():
+                return journal.load()
+        # Legacy pickle file (also migrates older installs into journal mode)
         if DATA_FILE.exists():
             with open(DATA_FILE, 'rb') as f:
                 data = pickle.load(f)
-                return data
+            _rebase_local_journal(data)
+            return data
     except Exception as e:
         st.warning(f"Could not load locally: {e}")
 
     return None
 
+def _rebase_local_journal(data: dict):
+    """Snapshot externally loaded data so later journal ops apply to the right base"""
+    if LOCAL_PERSISTENCE_MODE != "journal":
+        return
+    try:
+        get_trip_journal().write_snapshot(data)
+    except Exception as e:
+        log_error("Could not snapshot loaded trip locally", e)
+
+@traced('fetch_trip_fields')
+def fetch_trip_fields(fields) -> dict:
+    """
+    Fetch some top-level trip fields from wherever this session's trip lives
+
+    Cloud trips are read with a field projection, merged with pending shared
+    edits, and folded into the local journal so the local backup fills in
+    section by section.
+    """
+    trip_code = st.session_state.get('trip_code')
+    if st.session_state.get('trip_source') == 'cloud' and trip_code:
+        result = get_firebase_manager().load_trip_synced(trip_code, fields)
+        if result is None:
+            raise RuntimeError(f"trip '{trip_code}' could not be read from the cloud")
+        data, replica = result.data, result.replica
+        if replica is not None:
+            merge_replica(replica)
+        if LOCAL_PERSISTENCE_MODE == "journal":
+            try:
+                get_trip_journal().append('fields_loaded', fields=encode_trip(data))
+            except Exception as e:
+                log_error("Could not record loaded fields locally", e)
+        return data
+
+    data = load_local_trip_data() or {}
+    return {field: data[field] for field in fields if field in data}
+
+@traced('pull_shared_edits')
+def pull_shared_edits():
+    """
+    Merge checklist, rejection and saved-flag edits other members made since
+    the last pull (at most every CRDT_PULL_INTERVAL seconds)
+    """
+    trip_code = st.session_state.get('trip_code')
+    if st.session_state.get('trip_source') != 'cloud' or not trip_code:
+        return
+    if not (is_hydrated('checklist') or is_hydrated('ideas')):
+        return
+    now = time.time()
+    if now - st.session_state.get('crdt_pulled_at', 0.0) < CRDT_PULL_INTERVAL:
+        return
+    st.session_state.crdt_pulled_at = now
+
+    replica = st.session_state.get('trip_crdt')
+    after = pull_cursor(replica.latest_ts, CRDT_PULL_OVERLAP) if replica is not None else None
+    ops = get_firebase_manager().pull_trip_ops(trip_code, after)
+    if ops and apply_remote_ops(ops):
+        emit(SHARED_EDITS_MERGED, ops=len(ops))
+
+@traced('load_section')
+def load_section(*sections):
+    """Load tab data on first access; stops this run if it cannot be fetched"""
+    started = time.perf_counter()
+    try:
+        if hydrate(fetch_trip_fields, *sections):
+            emit(SECTIONS_LOADED, sections=list(sections), ms=lambda: (time.perf_counter() - started) * 1000)
+    except Exception as e:
+        log_error("Could not load trip data", e, {'sections': list(sections)})
+        st.warning(f"Could not load trip data: {e}")
+        st.stop()
+
+def get_trip_chat_log() -> ChatLog:
+    """
+    Chat log for the current trip, loaded once per session and trip code
+
+    On first use the latest chat page replaces `chat_history`. Trips saved
+    before chat paging carry their history inline; it is migrated into the
+    log the first time it is opened.
+    """
+    trip_code = st.session_state.trip_code
+    if st.session_state.get('chat_log_code') != trip_code:
+        st.session_state.pop('chat_log', None)
+
+    if 'chat_log' not in st.session_state:
+        chat_log = get_chat_log(trip_code)
+        page, messages = chat_log.latest()
+        legacy_history = st.session_state.get('chat_history', [])
+        if page == 0 and legacy_history:
+            chat_log.extend(legacy_history)
+            page, messages = chat_log.latest()
+            log_info("Migrated inline chat history", {'messages': len(legacy_history)})
+        st.session_state.chat_history = messages
+        st.session_state.chat_oldest_page = page
+        st.session_state.pop('chat_window', None)
+        st.session_state.chat_log = chat_log
+        st.session_state.chat_log_code = trip_code
+
+    return st.session_state.chat_log
+
 # Get API key from Streamlit secrets or environment
 def get_api_key():
     """Get API key from secrets or environment"""
@@ -146,56 +402,397 @@ def get_api_key():
 if 'agent' not in st.session_state:
     api_key = get_api_key()
     if api_key:
+        # The agent imports openai on its first API call, not here
+        from src.agents.trip_planner_agent import TripPlannerAgent
         st.session_state.agent = TripPlannerAgent(api_key)
     else:
         st.session_state.agent = None
 
 if 'trip_details' not in st.session_state:
-    # Try to load saved data
-    saved_data = load_trip_data()
+    # Only trip details and summary counts load up front; each tab's data
+    # is fetched the first time that tab is opened (see load_section)
+    saved_data = load_local_trip_data()
     if saved_data:
-        st.session_state.trip_details = saved_data.get('trip_details')
-        st.session_state.checklist = saved_data.get('checklist', [])
+        start_session(saved_data, source='local')
+    else:
+        start_empty_session()
+
+
+# ============================================================================
+# FRAGMENTS
+# A widget inside an st.fragment reruns only that fragment. Their widgets act
+# through callbacks (the checklist grid through its event batches), applied
+# before the fragment re-renders, so one click costs one fragment's render
+# instead of the whole script.
+# ============================================================================
+def _position(field: str, item_id: str):
+    """Index of the item with `item_id` in a loaded list field, or None if it is gone"""
+    idx = list_index(field).positions.get(item_id)
+    items = st.session_state[field]
+    if idx is not None and idx < len(items) and items[idx].id == item_id:
+        return idx
+    return None
 
-        # Limit loaded data to conserve memory
-        ideas = saved_data.get('ideas', [])
-        st.session_state.ideas = ideas[-MAX_IDEAS:] if len(ideas) > MAX_IDEAS else ideas
 
-        chat_history = saved_data.get('chat_history', [])
-        st.session_state.chat_history = chat_history[-MAX_CHAT_HISTORY:] if len(chat_history) > MAX_CHAT_HISTORY else chat_history
+def edit_checklist(toggled: dict = None, deleted=()) -> int:
+    """
+    Apply many checklist edits with a single save
+
+    Args:
+        toggled: item id -> new completed flag
+        deleted: ids of items to delete (their texts are remembered as rejected)
+
+    Returns:
+        Number of items changed
+    """
+    checklist = st.session_state.checklist
+    deleted = {item_id for item_id in deleted if _position('checklist', item_id) is not None}
+    changes = {}
+    for item_id, completed in (toggled or {}).items():
+        idx = _position('checklist', item_id)
+        if idx is not None and item_id not in deleted and checklist[idx].completed != bool(completed):
+            checklist[idx].completed = changes[item_id] = bool(completed)
+    toggled = changes
+    rejected = []
+    if deleted:
+        rejected = [item.text.lower().strip() for item in checklist if item.id in deleted]
+        st.session_state.rejected_items.update(rejected)
+        st.session_state.checklist = [item for item in checklist if item.id not in deleted]
+
+    # A lone click keeps its own journal op; anything more is one 'items_edited' record
+    changed = len(toggled) + len(deleted)
+    if changed == 1 and toggled:
+        item_id, completed = next(iter(toggled.items()))
+        save_trip_data('item_toggled', item_id=item_id, completed=completed)
+    elif changed == 1:
+        save_trip_data('item_deleted', item_id=next(iter(deleted)), rejected=rejected[0])
+    elif changed:
+        save_trip_data('items_edited', toggled=toggled, deleted=sorted(deleted), rejected=rejected)
+    return changed
+
+
+def apply_grid_events(events):
+    """Apply a batch of toggles, deletes and page changes sent back by the checklist grid"""
+    toggled, deleted = {}, []
+    for event in events:
+        if event.get('type') == 'page':
+            st.session_state.checklist_page = int(event.get('page') or 0)
+        elif event.get('type') == 'toggle':
+            toggled[event.get('id')] = bool(event.get('completed'))
+        elif event.get('type') == 'delete':
+            deleted.append(event.get('id'))
+    edit_checklist(toggled, deleted)
+
+
+@st.fragment
+@instrumented_fragment
+def render_checklist_grid(show_completed: bool, priority_filter, category_filter):
+    """One page of the filtered checklist as a grid component; clicks in it rerun only this fragment"""
+    # Apply the browser's latest batch first so this run draws the result
+    apply_grid_events(grid_events("checklist_grid"))
+
+    # New filters start again from the first page
+    filters = (show_completed, tuple(priority_filter), tuple(category_filter))
+    if st.session_state.get('checklist_filters') != filters:
+        st.session_state.checklist_filters = filters
+        st.session_state.checklist_page = 0
+
+    selection = list_index('checklist').select(
+        completed={False} if not show_completed else {False, True},
+        priority=priority_filter,
+        category=category_filter,
+    )
+    page, pages, shown, prefetch = page_window(
+        selection, st.session_state.get('checklist_page', 0), CHECKLIST_PAGE_SIZE
+    )
+    st.session_state.checklist_page = page
+    checklist = st.session_state.checklist
+    checklist_grid(
+        [checklist[idx] for idx in shown], key="checklist_grid",
+        next_items=[checklist[idx] for idx in prefetch],
+        page=page, pages=pages, total=len(selection),
+    )
+
+
+def apply_bulk_edits():
+    """Save everything changed in the bulk-edit table as one batch"""
+    edits = st.session_state.get('checklist_bulk_editor') or {}
+    ids = st.session_state.get('checklist_bulk_ids', [])
+    toggled, deleted = {}, []
+    for row, changes in (edits.get('edited_rows') or {}).items():
+        row = int(row)
+        if row >= len(ids):
+            continue
+        if changes.get('delete'):
+            deleted.append(ids[row])
+        elif 'done' in changes:
+            toggled[ids[row]] = changes['done']
+    changed = edit_checklist(toggled, deleted)
+    # Start the next round of edits from the saved checklist
+    st.session_state.pop('checklist_bulk_editor', None)
+    st.session_state.bulk_notice = f"💾 Saved {changed} change{'s' if changed != 1 else ''}"
+
+
+def mark_category_done(category: str):
+    """Check off every open item in one category with a single save"""
+    open_items = list_index('checklist').select(category={category}, completed={False})
+    checklist = st.session_state.checklist
+    changed = edit_checklist({checklist[idx].id: True for idx in open_items})
+    st.session_state.bulk_notice = f"✅ Marked {changed} {category} item{'s' if changed != 1 else ''} done"
+
+
+def render_bulk_editor(show_completed: bool, priority_filter, category_filter):
+    """
+    Edit the filtered checklist as a table
+
+    Ticks and deletes are held in the table until "Save changes", which
+    applies them with one save and one rerun.
+    """
+    if 'bulk_notice' in st.session_state:
+        st.toast(st.session_state.pop('bulk_notice'))
+
+    categories = list_index('checklist').values('category')
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        category = st.selectbox("Category", categories, key="bulk_category", label_visibility="collapsed")
+    with col2:
+        st.button("✅ Mark category done", use_container_width=True, disabled=not categories,
+                  on_click=mark_category_done, args=(category,))
+
+    selection = list_index('checklist').select(
+        completed={False} if not show_completed else {False, True},
+        priority=priority_filter,
+        category=category_filter,
+    )
+    checklist = st.session_state.checklist
+    rows = [checklist[idx] for idx in selection]
+    st.session_state.checklist_bulk_ids = [item.id for item in rows]
+    with st.form("checklist_bulk_form", border=False):
+        st.data_editor(
+            [
+                {'done': item.completed, 'delete': False, 'item': item.text,
+                 'category': item.category, 'priority': item.priority}
+                for item in rows
+            ],
+            key="checklist_bulk_editor",
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            disabled=['item', 'category', 'priority'],
+            column_config={
+                'done': st.column_config.CheckboxColumn("Done", width="small"),
+                'delete': st.column_config.CheckboxColumn("🗑️ Delete", width="small"),
+                'item': st.column_config.TextColumn("Item", width="large"),
+                'category': "Category",
+                'priority': "Priority",
+            },
+        )
+        st.form_submit_button("💾 Save changes", use_container_width=True, on_click=apply_bulk_edits)
 
-        # Ensure rejected_items is always a set (Firebase returns it as a list)
-        rejected = saved_data.get('rejected_items', set())
-        st.session_state.rejected_items = set(rejected) if isinstance(rejected, (list, set)) else set()
 
-        pending_suggestions = saved_data.get('pending_suggestions', [])
-        st.session_state.pending_suggestions = pending_suggestions[-MAX_PENDING_SUGGESTIONS:] if len(pending_suggestions) > MAX_PENDING_SUGGESTIONS else pending_suggestions
-    else:
-        st.session_state.trip_details = None
-        st.session_state.checklist = []
-        st.session_state.ideas = []
-        st.session_state.chat_history = []
-        st.session_state.rejected_items = set()
-        st.session_state.pending_suggestions = []
-
-if 'checklist' not in st.session_state:
-    st.session_state.checklist = []
-
-if 'ideas' not in st.session_state:
-    st.session_state.ideas = []
-
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
-
-if 'rejected_items' not in st.session_state:
-    st.session_state.rejected_items = set()
-else:
-    # Ensure it's always a set, even if it somehow became a list
-    if not isinstance(st.session_state.rejected_items, set):
-        st.session_state.rejected_items = set(st.session_state.rejected_items)
-
-if 'pending_suggestions' not in st.session_state:
+def toggle_idea_saved(idea_id: str):
+    idx = _position('ideas', idea_id)
+    if idx is None:
+        return
+    idea = st.session_state.ideas[idx]
+    idea.saved = not idea.saved
+    save_trip_data('idea_saved', idea_id=idea_id, saved=idea.saved)
+
+
+def show_ideas_page(cursor: str):
+    st.session_state.ideas_cursor = cursor
+
+
+@st.fragment
+@instrumented_fragment
+def render_ideas_list():
+    """One page of idea cards, newest first; saving one or paging reruns only the list"""
+    ideas = st.session_state.ideas
+    visible, newer, older = page_ideas(ideas, st.session_state.get('ideas_cursor'),
+                                       positions=list_index('ideas').positions)
+    for idx in visible:
+        idea = ideas[idx]
+        st.markdown(f"""
+        <div class="idea-card">
+            <h3>{idea.title}</h3>
+            <p>{idea.description}</p>
+            <small>🏷️ {idea.category} | Tags: {', '.join(idea.tags)}</small>
+        </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2 = st.columns([6, 1])
+        with col2:
+            st.button("💾" if not idea.saved else "❤️", key=f"save_idea_{idea.id}",
+                      on_click=toggle_idea_saved, args=(idea.id,))
+
+    if newer or older:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("⬆️ Newer ideas", disabled=not newer, on_click=show_ideas_page, args=(newer,))
+        with col2:
+            first = len(ideas) - visible[0]
+            st.caption(f"Ideas {first}–{first + len(visible) - 1} of {len(ideas)}")
+        with col3:
+            st.button("⬇️ Older ideas", disabled=not older, on_click=show_ideas_page, args=(older,))
+
+
+def load_earlier_chat():
+    """Widen the chat window, reading older log pages only if it runs past them"""
+    window = st.session_state.get('chat_window', CHAT_WINDOW) + CHAT_WINDOW
+    while len(st.session_state.chat_history) < window and st.session_state.chat_oldest_page > 1:
+        oldest_page = st.session_state.chat_oldest_page
+        earlier = st.session_state.chat_log.load_page(oldest_page - 1)
+        st.session_state.chat_history = earlier + st.session_state.chat_history
+        st.session_state.chat_oldest_page = oldest_page - 1
+    st.session_state.chat_window = window
+
+
+def _pop_suggestion(text: str):
+    """Remove and return the pending suggestion with this text (None if already resolved)"""
+    pending = st.session_state.pending_suggestions
+    for idx, suggestion in enumerate(pending):
+        if suggestion['text'] == text:
+            return pending.pop(idx)
+    return None
+
+
+def add_suggestion(text: str):
+    load_section('checklist')
+    suggestion = _pop_suggestion(text)
+    if suggestion is None:
+        return
+    from src.utils.helpers import generate_checklist_id
+    new_item = ChecklistItem(
+        id=generate_checklist_id(),
+        text=suggestion['text'],
+        category=suggestion['category'],
+        priority=suggestion['priority'],
+        completed=False
+    )
+    st.session_state.checklist.append(new_item)
+    save_trip_data('suggestion_resolved', text=text, item=new_item)
+    st.session_state.chat_notice = f"✅ Added '{text}' to your checklist!"
+
+
+def skip_suggestion(text: str):
+    load_section('checklist')
+    if _pop_suggestion(text) is None:
+        return
+    rejected_text = text.lower().strip()
+    st.session_state.rejected_items.add(rejected_text)
+    save_trip_data('suggestion_resolved', text=text, rejected=rejected_text)
+
+
+def skip_all_suggestions():
+    load_section('checklist')
+    rejected_texts = []
+    for suggestion in st.session_state.pending_suggestions:
+        rejected_text = suggestion['text'].lower().strip()
+        st.session_state.rejected_items.add(rejected_text)
+        rejected_texts.append(rejected_text)
+
     st.session_state.pending_suggestions = []
+    save_trip_data('suggestions_cleared', rejected=rejected_texts)
+
+
+def answer_question(chat_log: ChatLog, user_question: str):
+    """Record a question and the assistant's answer; keep its checklist suggestions pending"""
+    # Suggestions are filtered against the checklist and rejected items
+    load_section('checklist')
+
+    # Add user message
+    user_message = chat_log.append(ChatLog.new_message("user", user_question))
+    st.session_state.chat_history.append(user_message)
+    with st.chat_message("user"):
+        st.markdown(message_markdown(user_message))
+
+    # Get AI response
+    with st.spinner("Thinking..."):
+        response = st.session_state.agent.get_personalized_suggestion(
+            st.session_state.trip_details,
+            user_question
+        )
+
+    # Parse response for suggested items
+    from src.agents.trip_planner_agent import TripPlannerAgent
+    cleaned_response, suggested_items = TripPlannerAgent.parse_item_suggestions(response)
+
+    # Filter out duplicates and rejected items
+    filtered_suggestions = None
+    if suggested_items:
+        existing_items = {item.text.lower().strip() for item in st.session_state.checklist}
+        filtered_suggestions = []
+
+        for suggestion in suggested_items:
+            suggestion_lower = suggestion['text'].lower().strip()
+            if suggestion_lower not in existing_items and suggestion_lower not in st.session_state.rejected_items:
+                filtered_suggestions.append(suggestion)
+                # Suggestion buttons are keyed by text, so keep each text once
+                existing_items.add(suggestion_lower)
+
+        # Store filtered suggestions in session state
+        st.session_state.pending_suggestions = filtered_suggestions
+
+    # Add cleaned assistant message (without [ADD_ITEM...] tags)
+    assistant_message = chat_log.append(ChatLog.new_message("assistant", cleaned_response))
+    st.session_state.chat_history.append(assistant_message)
+    with st.chat_message("assistant"):
+        st.markdown(message_markdown(assistant_message))
+
+    # Messages are already persisted by the chat log; only suggestions need saving
+    if filtered_suggestions is not None:
+        save_trip_data('suggestions_set', pending_suggestions=filtered_suggestions)
+
+
+@st.fragment
+@instrumented_fragment
+def render_chat_panel():
+    """Chat history, pending suggestions and input; chatting reruns only this panel"""
+    # Only the newest window of messages is drawn; older ones on demand
+    chat_log = get_trip_chat_log()
+    notice = st.session_state.pop('chat_notice', None)
+    if notice:
+        st.toast(notice)
+    window = st.session_state.get('chat_window', CHAT_WINDOW)
+    chat_history = st.session_state.chat_history
+    if len(chat_history) > window or st.session_state.get('chat_oldest_page', 0) > 1:
+        st.button("⬆️ Load earlier messages", on_click=load_earlier_chat)
+
+    # Filled after the input is read, so a new question and its answer show up in this run
+    history = st.container()
+    suggestions = st.container()
+    user_question = st.chat_input("Ask a question about your trip...")
+
+    with history:
+        render_messages(chat_history[-window:])
+        if user_question:
+            answer_question(chat_log, user_question)
+
+    # Display any pending suggested items from the last AI response
+    if not st.session_state.get('pending_suggestions'):
+        return
+    with suggestions:
+        st.markdown("---")
+        st.markdown("### ✨ Suggested Checklist Items")
+        st.write("The AI assistant has some suggestions for your checklist:")
+
+        priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+        for suggestion in st.session_state.pending_suggestions:
+            col1, col2, col3 = st.columns([4, 1, 1])
+            with col1:
+                emoji = priority_emoji.get(suggestion.get('priority', 'medium'), '🟡')
+                st.markdown(f"{emoji} **{suggestion['text']}**")
+                st.caption(f"Category: {suggestion['category']} | Priority: {suggestion['priority']}")
+            with col2:
+                st.button("➕ Add", key=f"add_suggestion_{suggestion['text']}",
+                          on_click=add_suggestion, args=(suggestion['text'],))
+            with col3:
+                st.button("❌ Skip", key=f"skip_suggestion_{suggestion['text']}",
+                          on_click=skip_suggestion, args=(suggestion['text'],))
+
+        st.button("❌ Skip All Suggestions", on_click=skip_all_suggestions)
+
+        st.markdown("---")
 
 
 def main():
@@ -278,19 +875,15 @@ def main():
                 if join_trip_code:
                     firebase = get_firebase_manager()
                     if firebase.is_enabled():
-                        if firebase.trip_exists(join_trip_code):
+                        # Single projected read of trip details and summary counts;
+                        # unknown codes hit the negative cache
+                        trip = firebase.join_trip(join_trip_code, fields=SUMMARY_FIELDS)
+                        if trip is not None:
                             st.session_state.trip_code = join_trip_code
-                            # Load the trip data
-                            trip_data = load_trip_data(join_trip_code)
-                            if trip_data:
-                                st.session_state.trip_details = trip_data.get('trip_details')
-                                st.session_state.checklist = trip_data.get('checklist', [])
-                                st.session_state.ideas = trip_data.get('ideas', [])
-                                st.session_state.chat_history = trip_data.get('chat_history', [])
-                                # Ensure rejected_items is always a set (Firebase returns it as a list)
-                                rejected = trip_data.get('rejected_items', set())
-                                st.session_state.rejected_items = set(rejected) if isinstance(rejected, (list, set)) else set()
-                                st.session_state.pending_suggestions = trip_data.get('pending_suggestions', [])
+                            start_session(trip.data, source='cloud')
+                            st.session_state.trip_version = trip.version
+                            _rebase_local_journal(trip.data)
+                            st.session_state.pop('chat_log', None)
                             st.success(f"✅ Joined trip: **{join_trip_code}**")
                             st.rerun()
                         else:
@@ -303,6 +896,11 @@ def main():
         st.markdown("---")
         return
 
+    # Send anything saved while Firebase was starting, then pick up what
+    # other members changed since the last rerun
+    sync_unsynced_changes()
+    pull_shared_edits()
+
     # Display current trip code - DIAMOND SHAPE!
     st.markdown(f"""
     <div class="trip-code-diamond">
@@ -379,11 +977,15 @@ def main():
 
         if st.button("✨ Create Your Magical Plan ✨", use_container_width=True):
             with st.spinner("Creating your magical trip plan..."):
+                # A new plan replaces the checklist and ideas but keeps
+                # everything else, so load the rest before overwriting
+                load_section(*SECTIONS)
+
                 # Convert dates to datetime
                 start_dt = datetime.combine(trip_date, datetime.min.time())
                 end_dt = datetime.combine(trip_end_date, datetime.min.time())
-                start_dt = pytz.UTC.localize(start_dt)
-                end_dt = pytz.UTC.localize(end_dt)
+                start_dt = start_dt.replace(tzinfo=timezone.utc)
+                end_dt = end_dt.replace(tzinfo=timezone.utc)
 
                 st.session_state.trip_details = TripDetails(
                     destination=destination,
@@ -407,7 +1009,7 @@ def main():
                 )
 
                 # Save data
-                save_trip_data()
+                save_trip_data(replace=True)
 
                 st.success("✅ Trip plan created and saved!")
                 st.rerun()
@@ -459,16 +1061,23 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    # Tabs for different sections - Magical Navigation
-    tab1, tab2, tab3, tab4 = st.tabs([
+    # Tabs for different sections - Magical Navigation. Only the selected
+    # section runs, so each one loads its data the first time it is opened
+    tabs = [
         "✅ Checklists",
         "💡 Magical Ideas",
         "🤖 AI Fairy Godmother",
         "📋 My Adventure"
-    ])
+    ]
+    if is_admin():
+        tabs.append("📊 Performance")
+    active_tab = st.radio(
+        "Section", tabs, horizontal=True, key="active_tab", label_visibility="collapsed"
+    )
 
     # Tab 1: Checklists
-    with tab1:
+    if active_tab == tabs[0]:
+        load_section('checklist')
         st.header("🏰 Trip Planning Checklist")
 
         # Top row: Subheader on left, Add Custom Item on right - MOBILE OPTIMIZED
@@ -495,7 +1104,7 @@ def main():
                         completed=False
                     )
                     st.session_state.checklist.append(new_item)
-                    save_trip_data()
+                    save_trip_data('item_added', item=new_item)
                     st.success(f"✅ Added: {new_item_text}")
                     st.rerun()
 
@@ -521,6 +1130,7 @@ def main():
                     if new_items:
                         # Add new items to checklist
                         from src.utils.helpers import generate_checklist_id
+                        added_items = []
                         for item_text in new_items:
                             new_item = ChecklistItem(
                                 id=generate_checklist_id(),
@@ -530,9 +1140,10 @@ def main():
                                 completed=False
                             )
                             st.session_state.checklist.append(new_item)
+                            added_items.append(new_item)
 
                         # Save data
-                        save_trip_data()
+                        save_trip_data('items_added', items=added_items)
 
                         st.success(f"✅ Added {len(new_items)} forgotten item{'s' if len(new_items) != 1 else ''} to your checklist!")
                         st.rerun()
@@ -551,75 +1162,23 @@ def main():
                     default=["high", "medium", "low"]
                 )
             with filter_col3:
+                categories = list_index('checklist').values('category')
                 category_filter = st.multiselect(
                     "Filter by Category",
-                    list(set([item.category for item in st.session_state.checklist])),
-                    default=list(set([item.category for item in st.session_state.checklist]))
+                    categories,
+                    default=categories
                 )
 
-        # Display checklist - 3 Cards Per Row Grid
-        filtered_items = []
-        for idx, item in enumerate(st.session_state.checklist):
-            if not show_completed and item.completed:
-                continue
-            if item.priority not in priority_filter:
-                continue
-            if item.category not in category_filter:
-                continue
-            filtered_items.append((idx, item))
-
-        # Display in rows of 3
-        for row_idx in range(0, len(filtered_items), 3):
-            cols = st.columns(3)
-
-            for col_idx in range(3):
-                if row_idx + col_idx < len(filtered_items):
-                    idx, item = filtered_items[row_idx + col_idx]
-
-                    with cols[col_idx]:
-                        completed_class = "completed" if item.completed else ""
-                        priority_class = f"priority-{item.priority}"
-
-                        # Card with checkbox inside
-                        st.markdown(f"""
-                        <div class="checklist-card {completed_class} {priority_class}">
-                            <div class="checklist-card-content">
-                                <strong>{item.text}</strong>
-                                <small>📁 {item.category} | ⭐ {item.priority.upper()}
-                                {f"| 📅 {item.deadline}" if item.deadline else ""}</small>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        # Checkbox and delete button below the card - wrapped for proper layout
-                        st.markdown('<div class="card-action-row">', unsafe_allow_html=True)
-
-                        action_col1, action_col2 = st.columns([20, 1], gap="small")
-                        with action_col1:
-                            checked = st.checkbox(
-                                "Complete",
-                                value=item.completed,
-                                key=f"check_{idx}",
-                                label_visibility="visible"
-                            )
-                            if checked != item.completed:
-                                st.session_state.checklist[idx].completed = checked
-                                save_trip_data()
-
-                        with action_col2:
-                            st.markdown('<div class="card-delete-btn">', unsafe_allow_html=True)
-                            if st.button("🗑️", key=f"delete_{idx}", use_container_width=False):
-                                deleted_text = st.session_state.checklist[idx].text.lower().strip()
-                                st.session_state.rejected_items.add(deleted_text)
-                                st.session_state.checklist.pop(idx)
-                                save_trip_data()
-                                st.rerun()
-                            st.markdown('</div>', unsafe_allow_html=True)
-
-                        st.markdown('</div>', unsafe_allow_html=True)
+        # Display checklist - 3 Cards Per Row Grid, or a table for many edits at once
+        if st.toggle("✏️ Bulk edit", key="checklist_bulk_mode",
+                     help="Tick or delete many items, then save them all at once"):
+            render_bulk_editor(show_completed, priority_filter, category_filter)
+        else:
+            render_checklist_grid(show_completed, priority_filter, category_filter)
 
     # Tab 2: Ideas & Suggestions
-    with tab2:
+    if active_tab == tabs[1]:
+        load_section('ideas')
         st.header("💡 Magical Trip Ideas")
 
         col1, col2 = st.columns([3, 1])
@@ -636,144 +1195,24 @@ def main():
                         st.session_state.trip_details,
                         focus=focus
                     )
-                    st.session_state.ideas.extend(new_ideas)
-                    save_trip_data()
+                    st.session_state.ideas = trim_ideas(st.session_state.ideas + new_ideas, MAX_IDEAS)
+                    save_trip_data('ideas_added', ideas=new_ideas)
                     st.rerun()
 
-        # Display ideas
-        for idx, idea in enumerate(st.session_state.ideas):
-            st.markdown(f"""
-            <div class="idea-card">
-                <h3>{idea.title}</h3>
-                <p>{idea.description}</p>
-                <small>🏷️ {idea.category} | Tags: {', '.join(idea.tags)}</small>
-            </div>
-            """, unsafe_allow_html=True)
-
-            col1, col2 = st.columns([6, 1])
-            with col2:
-                if st.button("💾" if not idea.saved else "❤️", key=f"save_idea_{idx}"):
-                    st.session_state.ideas[idx].saved = not idea.saved
-                    save_trip_data()
-                    st.rerun()
+        # Display ideas - newest first, older pages on demand
+        render_ideas_list()
 
     # Tab 3: AI Assistant
-    with tab3:
+    if active_tab == tabs[2]:
+        load_section('chat')
         st.header("🧚 Your AI Fairy Godmother")
         st.write("*Bibbidi-Bobbidi-Boo!* Ask me anything about your magical Disney journey!")
         st.info("✨ **Magic tip:** I can add items to your checklist! Just tell me what you need, and I'll help make your wishes come true!")
 
-        # Chat interface
-        for message in st.session_state.chat_history:
-            with st.chat_message(message["role"]):
-                st.write(message["content"])
-
-        # Display any pending suggested items from the last AI response
-        if 'pending_suggestions' in st.session_state and st.session_state.pending_suggestions:
-            st.markdown("---")
-            st.markdown("### ✨ Suggested Checklist Items")
-            st.write("The AI assistant has some suggestions for your checklist:")
-
-            for idx, suggestion in enumerate(st.session_state.pending_suggestions):
-                col1, col2, col3 = st.columns([4, 1, 1])
-                with col1:
-                    priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}
-                    emoji = priority_emoji.get(suggestion.get('priority', 'medium'), '🟡')
-                    st.markdown(f"{emoji} **{suggestion['text']}**")
-                    st.caption(f"Category: {suggestion['category']} | Priority: {suggestion['priority']}")
-                with col2:
-                    if st.button("➕ Add", key=f"add_suggestion_{idx}"):
-                        # Add to checklist
-                        from src.utils.helpers import generate_checklist_id
-                        new_item = ChecklistItem(
-                            id=generate_checklist_id(),
-                            text=suggestion['text'],
-                            category=suggestion['category'],
-                            priority=suggestion['priority'],
-                            completed=False
-                        )
-                        st.session_state.checklist.append(new_item)
-
-                        # Remove this suggestion from pending
-                        st.session_state.pending_suggestions.pop(idx)
-
-                        # Save data
-                        save_trip_data()
-
-                        st.success(f"✅ Added '{suggestion['text']}' to your checklist!")
-                        st.rerun()
-                with col3:
-                    if st.button("❌ Skip", key=f"skip_suggestion_{idx}"):
-                        # Add to rejected items
-                        rejected_text = suggestion['text'].lower().strip()
-                        st.session_state.rejected_items.add(rejected_text)
-
-                        # Remove this suggestion from pending
-                        st.session_state.pending_suggestions.pop(idx)
-
-                        # Save data
-                        save_trip_data()
-                        st.rerun()
-
-            if st.button("❌ Skip All Suggestions"):
-                # Add all to rejected items
-                for suggestion in st.session_state.pending_suggestions:
-                    rejected_text = suggestion['text'].lower().strip()
-                    st.session_state.rejected_items.add(rejected_text)
-
-                st.session_state.pending_suggestions = []
-                save_trip_data()
-                st.rerun()
-
-            st.markdown("---")
-
-        # User input
-        user_question = st.chat_input("Ask a question about your trip...")
-
-        if user_question:
-            # Add user message
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": user_question
-            })
-
-            # Get AI response
-            with st.spinner("Thinking..."):
-                response = st.session_state.agent.get_personalized_suggestion(
-                    st.session_state.trip_details,
-                    user_question
-                )
-
-            # Parse response for suggested items
-            from src.agents.trip_planner_agent import TripPlannerAgent
-            cleaned_response, suggested_items = TripPlannerAgent.parse_item_suggestions(response)
-
-            # Filter out duplicates and rejected items
-            if suggested_items:
-                existing_items = {item.text.lower().strip() for item in st.session_state.checklist}
-                filtered_suggestions = []
-
-                for suggestion in suggested_items:
-                    suggestion_lower = suggestion['text'].lower().strip()
-                    if suggestion_lower not in existing_items and suggestion_lower not in st.session_state.rejected_items:
-                        filtered_suggestions.append(suggestion)
-
-                # Store filtered suggestions in session state
-                st.session_state.pending_suggestions = filtered_suggestions
-
-            # Add cleaned assistant message (without [ADD_ITEM...] tags)
-            st.session_state.chat_history.append({
-                "role": "assistant",
-                "content": cleaned_response
-            })
-
-            # Save chat history
-            save_trip_data()
-
-            st.rerun()
+        render_chat_panel()
 
     # Tab 4: Trip Summary
-    with tab4:
+    if active_tab == tabs[3]:
         st.header("📋 Your Magical Adventure Summary")
 
         col1, col2 = st.columns(2)
@@ -790,8 +1229,13 @@ def main():
 
         with col2:
             st.subheader("✨ Planning Progress")
-            total_items = len(st.session_state.checklist)
-            completed_items = sum(1 for item in st.session_state.checklist if item.completed)
+            # Stored summary counts; the checklist is only loaded for trips saved without one
+            summary = current_summary()
+            if 'checklist_total' not in summary:
+                load_section('checklist')
+                summary = current_summary()
+            total_items = summary['checklist_total']
+            completed_items = summary['checklist_completed']
             progress = (completed_items / total_items * 100) if total_items > 0 else 0
 
             st.metric("Checklist Progress", f"{progress:.0f}%")
@@ -817,15 +1261,30 @@ def main():
                 st.success("✨ Trip data saved!")
         with col2:
             if st.button("🧹 Start Fresh"):
-                st.session_state.trip_details = None
-                st.session_state.checklist = []
-                st.session_state.ideas = []
-                st.session_state.chat_history = []
+                trip_version = st.session_state.get('trip_version')
+                start_empty_session(st.session_state.get('trip_source', 'local'))
+                if trip_version is not None:
+                    st.session_state.trip_version = trip_version
+                if st.session_state.get('chat_log') is not None:
+                    st.session_state.chat_log.clear()
+                    st.session_state.chat_oldest_page = 0
                 if DATA_FILE.exists():
                     DATA_FILE.unlink()
+                get_trip_journal().reset()
                 st.success("All data cleared! Ready for a new adventure!")
                 st.rerun()
 
+    # Tab 5 (admins only): Performance dashboard
+    if len(tabs) > 4 and active_tab == tabs[4]:
+        render_perf_dashboard()
+
+    # Shed cached and saved data from this session if it has outgrown its budget
+    on_screen = {tabs[0]: ('checklist',), tabs[1]: ('ideas',), tabs[2]: ('chat', 'checklist')}
+    enforce_memory_budget(st.session_state, keep=on_screen.get(active_tab, ()))
+
 
 if __name__ == "__main__":
-    main()
+    # The samplers stop however the run ends: exception, st.stop() or a rerun interrupt
+    with instrumented_rerun('script', sys._getframe()):
+        with span('main'):
+            main()
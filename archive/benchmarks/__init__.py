@@ -0,0 +1 @@
+"""Offline benchmarks for Disney Trip Planner (run with `python -m benchmarks.<name>`)"""
@@ -0,0 +1,113 @@
+"""
+Trip codec benchmark.
+
+Compares the original FirebaseManager serialization path (isinstance chains,
+model_dump per item, fully validated rebuild on load) with src.storage.codec
+for trips with 30, 300 and 3000 checklist items.
+
+Usage:
+    python -m benchmarks.codec_bench
+    python -m benchmarks.codec_bench --sizes 30,300 --repeat 50
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from benchmarks.workload import make_trip
+from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
+from src.storage import codec
+
+
+# ============================================================================
+# BASELINE (the pre-codec FirebaseManager implementation)
+# ============================================================================
+def legacy_encode(data: Dict[str, Any]) -> Dict[str, Any]:
+    serializable = {}
+    for key, value in data.items():
+        if value is None:
+            serializable[key] = None
+        elif isinstance(value, TripDetails):
+            serializable[key] = value.model_dump(mode='json')
+        elif isinstance(value, list):
+            serializable[key] = [
+                item.model_dump(mode='json') if hasattr(item, 'model_dump') else item
+                for item in value
+            ]
+        elif isinstance(value, set):
+            serializable[key] = list(value)
+        elif isinstance(value, datetime):
+            serializable[key] = value.isoformat()
+        else:
+            serializable[key] = value
+    return serializable
+
+
+def legacy_decode(data: Dict[str, Any]) -> Dict[str, Any]:
+    prepared = {}
+    for key, value in data.items():
+        if key == 'trip_details' and value:
+            prepared[key] = TripDetails(**value)
+        elif key == 'checklist' and value:
+            prepared[key] = [ChecklistItem(**item) for item in value]
+        elif key == 'ideas' and value:
+            prepared[key] = [IdeaSuggestion(**item) for item in value]
+        elif key == 'rejected_items' and value:
+            prepared[key] = set(value)
+        else:
+            prepared[key] = value
+    return prepared
+
+
+# ============================================================================
+# HARNESS
+# ============================================================================
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall time in milliseconds over `repeat` runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes, repeat: int):
+    print(f"{'items':>6} {'path':<28} {'encode ms':>10} {'decode ms':>10} {'bytes':>9}")
+    for size in sizes:
+        trip = make_trip(num_items=size, num_ideas=max(10, size // 10), seed=size)
+        document = legacy_encode(trip)
+        json_bytes = len(json.dumps(document, separators=(',', ':')).encode('utf-8'))
+        blob = codec.dumps_compact(trip)
+        assert codec.decode_trip(codec.encode_trip(trip))['checklist'] == trip['checklist']
+
+        rows = [
+            ('legacy (validated)',
+             best_of(lambda: legacy_encode(trip), repeat),
+             best_of(lambda: legacy_decode(document), repeat), json_bytes),
+            ('codec (validated)',
+             best_of(lambda: codec.encode_trip(trip), repeat),
+             best_of(lambda: codec.decode_trip(document, trusted=False), repeat), json_bytes),
+            ('codec (trusted, sampled)',
+             best_of(lambda: codec.encode_trip(trip), repeat),
+             best_of(lambda: codec.decode_trip(document), repeat), json_bytes),
+            ('codec compact wire format',
+             best_of(lambda: codec.dumps_compact(trip), repeat),
+             best_of(lambda: codec.loads_compact(blob), repeat), len(blob)),
+        ]
+        for name, enc, dec, nbytes in rows:
+            print(f"{size:>6} {name:<28} {enc:>10.3f} {dec:>10.3f} {nbytes:>9}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='30,300,3000', help="Comma-separated checklist sizes")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+    run([int(s) for s in args.sizes.split(',')], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
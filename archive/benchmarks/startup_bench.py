@@ -0,0 +1,117 @@
+"""
+Startup benchmark.
+
+Measures, in fresh Python processes (the cost an autoscaled container pays
+on a cold start):
+- import: importing everything app.py imports at module level
+- first render: running app.py once for a new visitor (empty home dir)
+
+Fails (exit status 1) when the median of either exceeds its budget, so it
+can gate CI or a deploy.
+
+Usage:
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --runs 5 --import-budget 800 --render-budget 2500
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / 'app.py'
+
+# Default budgets (milliseconds, median of cold runs)
+IMPORT_BUDGET_MS = 1000.0
+RENDER_BUDGET_MS = 3000.0
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec(compile(sys.argv[1], 'app-imports', 'exec'), {})
+print(json.dumps({'ms': (time.perf_counter() - started) * 1000,
+                  'modules': sorted(m for m in ('openai', 'firebase_admin', 'grpc', 'pytz', 'dotenv')
+                                    if m in sys.modules)}))
+"""
+
+RENDER_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+print(json.dumps({'ms': (time.perf_counter() - started) * 1000,
+                  'exceptions': [str(e.value) for e in at.exception]}))
+"""
+
+
+def app_imports() -> str:
+    """Module-level import statements of app.py, as source"""
+    tree = ast.parse(APP.read_text(encoding='utf-8'))
+    return '\n'.join(ast.unparse(node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def run_probe(probe: str, arg: str, home: str) -> Dict:
+    env = dict(os.environ, HOME=home, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-c', probe, arg],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    # The last stdout line is the probe's report; anything before it is app logging
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> Dict[str, List[Dict]]:
+    imports = app_imports()
+    samples = {'import': [], 'first render': []}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as home:
+            samples['import'].append(run_probe(IMPORT_PROBE, imports, home))
+        with tempfile.TemporaryDirectory() as home:
+            samples['first render'].append(run_probe(RENDER_PROBE, str(APP), home))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help="Cold processes per measurement")
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS,
+                        help="Max median import time (ms)")
+    parser.add_argument('--render-budget', type=float, default=RENDER_BUDGET_MS,
+                        help="Max median first-render time (ms)")
+    args = parser.parse_args()
+
+    samples = measure(args.runs)
+    budgets = {'import': args.import_budget, 'first render': args.render_budget}
+
+    print(f"{'phase':<14}{'median ms':>12}{'min ms':>10}{'max ms':>10}{'budget ms':>12}")
+    over = []
+    for phase, runs in samples.items():
+        times = [run['ms'] for run in runs]
+        median = statistics.median(times)
+        print(f"{phase:<14}{median:>12.0f}{min(times):>10.0f}{max(times):>10.0f}{budgets[phase]:>12.0f}")
+        if median > budgets[phase]:
+            over.append(phase)
+
+    eager = samples['import'][-1]['modules']
+    if eager:
+        print(f"\nHeavy modules imported eagerly: {', '.join(eager)}")
+    errors = {err for run in samples['first render'] for err in run['exceptions']}
+    for err in errors:
+        print(f"First render raised: {err}")
+
+    if over or errors:
+        print(f"\nFAIL: over budget: {', '.join(over) or 'none'}")
+        sys.exit(1)
+    print("\nOK: within startup budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Storage backend benchmark.
+
+Runs the same mixed workload against each TripStore backend and reports
+ops/sec and p50/p99 latency per operation, so deployments can be sized offline.
+
+Usage:
+    python -m benchmarks.storage_bench
+    python -m benchmarks.storage_bench --backends memory,sqlite --trips 50 --ops 5000
+    python -m benchmarks.storage_bench --backends firestore-fake --latency 0.02
+"""
+import argparse
+import random
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.workload import make_trip, summarize
+from src.storage import create_store, TripStore
+
+# Operation mix mirrors app.py: most interactions load or toggle a single item
+OPERATION_MIX = [
+    ('load', 0.40),
+    ('update', 0.30),
+    ('save', 0.15),
+    ('exists', 0.10),
+    ('list', 0.05),
+]
+
+
+def run_workload(store: TripStore, trips: int, ops: int, items: int, seed: int = 42) -> Dict[str, dict]:
+    """Populate `trips` trips then execute `ops` mixed operations; returns per-op summaries"""
+    rng = random.Random(seed)
+    codes = [f"bench-{i:05d}" for i in range(trips)]
+    documents = {code: make_trip(num_items=items, seed=i) for i, code in enumerate(codes)}
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    for code in codes:
+        start = time.perf_counter()
+        store.save(code, documents[code])
+        latencies['save'].append(time.perf_counter() - start)
+
+    names = [name for name, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+    for _ in range(ops):
+        op = rng.choices(names, weights)[0]
+        code = rng.choice(codes)
+        start = time.perf_counter()
+        if op == 'load':
+            store.load(code)
+        elif op == 'update':
+            checklist = documents[code]['checklist']
+            item = rng.choice(checklist)
+            item.completed = not item.completed
+            store.update(code, {'checklist': checklist})
+        elif op == 'save':
+            store.save(code, documents[code])
+        elif op == 'exists':
+            store.exists(code if rng.random() < 0.8 else f"missing-{code}")
+        elif op == 'list':
+            store.list_trips(limit=100)
+        latencies[op].append(time.perf_counter() - start)
+
+    report = {op: summarize(values) for op, values in latencies.items()}
+    report['all'] = summarize([v for values in latencies.values() for v in values])
+    return report
+
+
+def build_store(backend: str, workdir: Path, latency: float) -> TripStore:
+    if backend == 'local':
+        return create_store('local', root=workdir / 'trips')
+    if backend == 'sqlite':
+        return create_store('sqlite', path=str(workdir / 'trips.sqlite3'))
+    if backend == 'firestore-fake':
+        return create_store('firestore-fake', latency=latency)
+    return create_store(backend)
+
+
+def print_report(backend: str, report: Dict[str, dict]):
+    print(f"\n== {backend} ==")
+    print(f"{'op':<8} {'count':>7} {'ops/sec':>11} {'p50 ms':>9} {'p99 ms':>9}")
+    for op in [name for name, _ in OPERATION_MIX] + ['all']:
+        if op not in report:
+            continue
+        r = report[op]
+        print(f"{op:<8} {r['count']:>7} {r['ops_per_sec']:>11.1f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default='memory,local,sqlite,firestore-fake',
+                        help="Comma-separated backends (memory, local, sqlite, firestore, firestore-fake)")
+    parser.add_argument('--trips', type=int, default=20, help="Number of trips to populate")
+    parser.add_argument('--ops', type=int, default=2000, help="Number of mixed operations")
+    parser.add_argument('--items', type=int, default=30, help="Checklist items per trip")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Simulated per-RPC latency for firestore-fake (seconds)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends.split(','):
+            backend = backend.strip()
+            store = build_store(backend, Path(tmp) / backend, args.latency)
+            try:
+                print_report(backend, run_workload(store, args.trips, args.ops, args.items))
+            finally:
+                store.close()
+
+
+if __name__ == '__main__':
+    main()
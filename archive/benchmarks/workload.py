@@ -0,0 +1,79 @@
+"""
+Shared synthetic workload helpers for the benchmark scripts.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
+
+CATEGORIES = ["packing", "shopping", "health", "tech", "home-prep", "travel-day"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+def make_trip(num_items: int = 30, num_ideas: int = 10, num_messages: int = 20,
+              seed: int = 0) -> Dict[str, Any]:
+    """Build a realistic application-format trip with the given sizes"""
+    rng = random.Random(seed)
+    start = datetime(2027, 3, 1, tzinfo=timezone.utc)
+    return {
+        'trip_details': TripDetails(
+            destination="Walt Disney World",
+            start_date=start,
+            end_date=start + timedelta(days=5),
+            party_size=4,
+            ages=[8, 10, 35, 37],
+            interests=["Character Meet & Greets", "Fireworks & Parades"],
+            budget_range="Moderate",
+            special_needs=[]
+        ),
+        'checklist': [
+            ChecklistItem(
+                id=f"item-{seed}-{i}",
+                text=f"Checklist item {i} - pack the magical thing number {i}",
+                completed=rng.random() < 0.3,
+                category=rng.choice(CATEGORIES),
+                priority=rng.choice(PRIORITIES),
+                deadline=None if rng.random() < 0.7 else "2 weeks before"
+            )
+            for i in range(num_items)
+        ],
+        'ideas': [
+            IdeaSuggestion(
+                id=f"idea-{seed}-{i}",
+                title=f"Idea {i}",
+                description="Book a character dining experience early to guarantee a spot.",
+                category=rng.choice(["dining", "activities", "photos", "surprises", "tips"]),
+                tags=["family", "magic"],
+                saved=rng.random() < 0.2
+            )
+            for i in range(num_ideas)
+        ],
+        'chat_history': [
+            {"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"Message {i}: what should we do on day {i % 5 + 1}?"}
+            for i in range(num_messages)
+        ],
+        'rejected_items': {f"rejected {i}" for i in range(5)},
+        'pending_suggestions': []
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) as ops/sec and p50/p99 in milliseconds"""
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'ops_per_sec': len(values) / total if total else 0.0,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+    }
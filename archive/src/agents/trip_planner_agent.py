@@ -4,10 +4,9 @@ Disney Trip Planning Agent - AI-powered trip planning assistant
 import os
 import json
 import re
+import time
 from typing import List, Dict, Any, Tuple
-from openai import OpenAI
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
 
 from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
 from src.utils.helpers import get_trip_phase, generate_checklist_id
@@ -21,6 +20,8 @@ from src.config.prompts import (
 )
 from src.config.constants import DEFAULT_MODEL, DEFAULT_TEMPERATURE, MAX_TOKENS
 from src.utils.logger import log_api_call, log_error, safe_execute
+from src.utils.metrics import LLM_FALLBACKS, record_llm_call
+from src.utils.tracing import span, traced
 
 
 class TripPlannerAgent:
@@ -40,17 +41,55 @@ class TripPlannerAgent:
             api_key: OpenAI API key
             model: Model to use (defaults to DEFAULT_MODEL from config)
         """
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
         self.model = model or DEFAULT_MODEL
         self.system_prompt = SYSTEM_PROMPT
 
+    @property
+    def client(self):
+        """OpenAI client, created (and the openai package imported) on first API call"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    def _complete(self, method: str, **request):
+        """
+        One chat completion, traced and metered
+
+        Records latency, outcome, token usage and estimated cost per method
+        and model (src.utils.metrics). Errors are recorded and re-raised.
+        """
+        started = time.perf_counter()
+        with span('llm_call', model=self.model, method=method) as call:
+            try:
+                response = self.client.chat.completions.create(model=self.model, **request)
+            except Exception as e:
+                record_llm_call(method, self.model, time.perf_counter() - started, error=e)
+                raise
+            seconds = time.perf_counter() - started
+            usage = getattr(response, 'usage', None)
+            record_llm_call(method, self.model, seconds, usage)
+            call.set(prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+                     completion_tokens=getattr(usage, 'completion_tokens', 0) or 0)
+        log_api_call('OpenAI', 'chat.completions', {
+            'model': self.model,
+            'purpose': method,
+            'latency_ms': round(seconds * 1000),
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+            'completion_tokens': getattr(usage, 'completion_tokens', None),
+        })
+        return response
+
+    @traced('agent.generate_checklist')
     def generate_comprehensive_checklist(self, trip_details: TripDetails) -> List[ChecklistItem]:
         """
         Generate a comprehensive checklist based on trip details
         Includes obvious items and easily forgotten ones
         """
         phase = get_trip_phase(trip_details.start_date)
-        days_until = (trip_details.start_date - datetime.now(pytz.UTC)).days
+        days_until = (trip_details.start_date - datetime.now(timezone.utc)).days
 
         # Build prompt from template
         prompt = CHECKLIST_PROMPT_TEMPLATE.format(
@@ -66,10 +105,8 @@ class TripPlannerAgent:
         )
 
         try:
-            log_api_call('OpenAI', 'chat.completions', {'model': self.model, 'purpose': 'checklist_generation'})
-
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._complete(
+                'generate_comprehensive_checklist',
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
@@ -81,7 +118,8 @@ class TripPlannerAgent:
 
             content = response.choices[0].message.content
             # Parse the response - handle both direct array and object with items key
-            data = json.loads(content)
+            with span('json_parse', chars=len(content or '')):
+                data = json.loads(content)
             if isinstance(data, dict) and "items" in data:
                 items_data = data["items"]
             elif isinstance(data, list):
@@ -89,24 +127,27 @@ class TripPlannerAgent:
             else:
                 items_data = list(data.values())[0] if data else []
 
-            checklist = []
-            for item in items_data:
-                checklist.append(ChecklistItem(
-                    id=generate_checklist_id(),
-                    text=item.get("text", ""),
-                    category=item.get("category", "general"),
-                    priority=item.get("priority", "medium"),
-                    deadline=item.get("deadline"),
-                    completed=False
-                ))
+            with span('model_build', items=len(items_data)):
+                checklist = []
+                for item in items_data:
+                    checklist.append(ChecklistItem(
+                        id=generate_checklist_id(),
+                        text=item.get("text", ""),
+                        category=item.get("category", "general"),
+                        priority=item.get("priority", "medium"),
+                        deadline=item.get("deadline"),
+                        completed=False
+                    ))
 
             log_api_call('OpenAI', 'chat.completions', response_summary=f"{len(checklist)} items generated")
             return checklist
 
         except Exception as e:
             log_error("Error generating checklist", e, {'trip_destination': trip_details.destination})
+            LLM_FALLBACKS.inc('generate_comprehensive_checklist')
             return self._get_fallback_checklist()
 
+    @traced('agent.brainstorm_ideas')
     def brainstorm_ideas(self, trip_details: TripDetails, focus: str = "general") -> List[IdeaSuggestion]:
         """
         Brainstorm creative ideas and suggestions for the trip
@@ -126,10 +167,8 @@ class TripPlannerAgent:
         )
 
         try:
-            log_api_call('OpenAI', 'chat.completions', {'model': self.model, 'purpose': 'brainstorming'})
-
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._complete(
+                'brainstorm_ideas',
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
@@ -140,32 +179,36 @@ class TripPlannerAgent:
             )
 
             content = response.choices[0].message.content
-            data = json.loads(content)
+            with span('json_parse', chars=len(content or '')):
+                data = json.loads(content)
             ideas_data = data.get("ideas", [])
 
-            ideas = []
-            for idea in ideas_data:
-                ideas.append(IdeaSuggestion(
-                    id=generate_checklist_id(),
-                    title=idea.get("title", ""),
-                    description=idea.get("description", ""),
-                    category=idea.get("category", "general"),
-                    tags=idea.get("tags", []),
-                    saved=False
-                ))
+            with span('model_build', items=len(ideas_data)):
+                ideas = []
+                for idea in ideas_data:
+                    ideas.append(IdeaSuggestion(
+                        id=generate_checklist_id(),
+                        title=idea.get("title", ""),
+                        description=idea.get("description", ""),
+                        category=idea.get("category", "general"),
+                        tags=idea.get("tags", []),
+                        saved=False
+                    ))
 
             log_api_call('OpenAI', 'chat.completions', response_summary=f"{len(ideas)} ideas generated")
             return ideas
 
         except Exception as e:
             log_error("Error brainstorming ideas", e, {'trip_destination': trip_details.destination})
+            LLM_FALLBACKS.inc('brainstorm_ideas')
             return []
 
+    @traced('agent.personalized_suggestion')
     def get_personalized_suggestion(self, trip_details: TripDetails, question: str) -> str:
         """
         Get a personalized suggestion or answer to a specific question
         """
-        days_until = (trip_details.start_date - datetime.now(pytz.UTC)).days
+        days_until = (trip_details.start_date - datetime.now(timezone.utc)).days
 
         # Build prompt from template
         prompt = PERSONALIZED_SUGGESTION_PROMPT_TEMPLATE.format(
@@ -180,10 +223,8 @@ class TripPlannerAgent:
         )
 
         try:
-            log_api_call('OpenAI', 'chat.completions', {'model': self.model, 'purpose': 'personalized_suggestion'})
-
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._complete(
+                'get_personalized_suggestion',
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
@@ -196,8 +237,10 @@ class TripPlannerAgent:
 
         except Exception as e:
             log_error("Error getting personalized suggestion", e)
+            LLM_FALLBACKS.inc('get_personalized_suggestion')
             return f"I apologize, but I encountered an error. Please try again later."
 
+    @traced('agent.forgotten_items')
     def suggest_forgotten_items(self, current_checklist: List[ChecklistItem]) -> List[str]:
         """
         Analyze current checklist and suggest commonly forgotten items
@@ -220,8 +263,8 @@ Return as a simple JSON array of strings:
 {{"forgotten_items": ["item 1", "item 2"]}}"""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._complete(
+                'suggest_forgotten_items',
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
@@ -231,11 +274,13 @@ Return as a simple JSON array of strings:
             )
 
             content = response.choices[0].message.content
-            data = json.loads(content)
+            with span('json_parse', chars=len(content or '')):
+                data = json.loads(content)
             return data.get("forgotten_items", [])
 
         except Exception as e:
             print(f"Error suggesting forgotten items: {e}")
+            LLM_FALLBACKS.inc('suggest_forgotten_items')
             return []
 
     @staticmethod
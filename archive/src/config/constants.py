@@ -8,14 +8,117 @@ from pathlib import Path
 # MEMORY LIMITS (Critical for Streamlit Cloud free tier - 1GB RAM)
 # ============================================================================
 MAX_CHAT_HISTORY = 50           # Max chat messages to retain
-MAX_IDEAS = 30                   # Max idea suggestions to retain
+MAX_IDEAS = 200                  # Ideas kept per trip (they share its 1 MiB Firestore document)
+IDEAS_PAGE_SIZE = 12             # Ideas shown per page (older ones load on demand)
+CHECKLIST_PAGE_SIZE = 60         # Checklist cards per grid page (the next page is prefetched)
+INDEX_SELECTION_CACHE = 16       # Filtered selections cached per list index
 MAX_PENDING_SUGGESTIONS = 20     # Max pending AI suggestions
+SESSION_MEMORY_BUDGET = 8 * 1024 * 1024     # Bytes of session state before a session sheds data
+PROCESS_MEMORY_BUDGET = 512 * 1024 * 1024   # Session state across all active sessions (of the 1GB)
+MEMORY_CHECK_INTERVAL = 30.0     # Seconds between measurements of one session's state
 
 # ============================================================================
 # FILE PATHS
 # ============================================================================
 DATA_DIR = Path.home() / '.disney_trip_planner'
 DATA_FILE = DATA_DIR / 'trip_data.pkl'
+JOURNAL_FILE = DATA_DIR / 'trip_journal.jsonl'
+SNAPSHOT_FILE = DATA_DIR / 'trip_snapshot.json'
+CHAT_DIR = DATA_DIR / 'chat'
+
+# ============================================================================
+# LOCAL PERSISTENCE
+# ============================================================================
+LOCAL_PERSISTENCE_MODE = "journal"   # "journal" (append-only ops) or "pickle" (full rewrite)
+JOURNAL_FSYNC_BATCH = 16             # fsync after this many appended records...
+JOURNAL_FSYNC_INTERVAL = 1.0         # ...or after this many seconds, whichever first
+JOURNAL_COMPACT_BYTES = 256 * 1024   # Fold journal into snapshot once it exceeds this size
+JOURNAL_COMPACT_INTERVAL = 30.0      # Seconds between background compaction checks
+
+# ============================================================================
+# CLOUD SYNC
+# ============================================================================
+TRIP_CODE_CACHE_TTL = 30.0           # Seconds a known-existing trip code stays cached
+TRIP_CODE_NEGATIVE_TTL = 5.0         # Seconds an unknown trip code stays cached (absorbs typos)
+VERSION_CONFLICT_RETRIES = 3         # Merge-and-retry attempts when a conditional save loses a race
+FIREBASE_INIT_TIMEOUT = 20.0         # Max seconds a request waits for background Firebase start-up
+
+# ============================================================================
+# COLLABORATIVE EDITING (CRDT op log)
+# ============================================================================
+CRDT_PULL_INTERVAL = 2.0             # Min seconds between pulls of other members' ops
+CRDT_PULL_OVERLAP = 5.0              # Re-read ops this far behind the newest seen (clock skew)
+CRDT_COMPACT_OPS = 200               # Fold the op log into the trip document past this many ops
+CRDT_COMPACT_MIN_AGE = 60.0          # Only delete folded ops older than this (seconds)
+
+# ============================================================================
+# BULK ADMIN OPERATIONS
+# ============================================================================
+FIRESTORE_BATCH_LIMIT = 500          # Max writes per Firestore batch commit
+FIRESTORE_BATCH_BYTES = 9 * 1024 * 1024  # Stay under Firestore's 10 MiB request limit
+BULK_READ_CHUNK = 100                # Documents per get_all() multi-read
+BULK_PAGE_SIZE = 1000                # Document references per collection-scan page
+BULK_WORKERS = 8                     # Parallel chunk workers for export/import
+
+# ============================================================================
+# CHAT HISTORY
+# ============================================================================
+CHAT_PAGE_SIZE = 25                  # Messages per chat page (the chat tab loads one page)
+CHAT_HOT_PAGES = 2                   # Pages kept uncompressed; older pages are archived
+CHAT_WINDOW = 20                     # Newest messages drawn; "Load earlier" widens by this much
+CHAT_RENDER_CACHE_SIZE = 5000        # Rendered messages cached per process (by message id)
+
+# ============================================================================
+# STORAGE CODEC
+# ============================================================================
+CODEC_VALIDATION_SAMPLE_RATE = 0.02  # Fraction of trusted items fully validated on load
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+LOG_FILE_FORMAT = "json"             # "json" (one object per line) or "text"
+LOG_MAX_BYTES = 5 * 1024 * 1024      # Rotate the log file past this size...
+LOG_ROTATE_WHEN = "midnight"         # ...or at this interval (TimedRotatingFileHandler `when`)
+LOG_BACKUP_COUNT = 7                 # Rotated files kept
+LOG_QUEUE_SIZE = 10000               # Records buffered for the writer thread (excess is dropped)
+EVENT_SAMPLE_RATES = {}              # Event name -> fraction kept, overriding src.utils.events defaults
+EVENT_RATE_LIMITS = {}               # Event name -> max kept per second, overriding defaults
+EVENT_VALIDATE_FIELDS = False        # Type-check event fields on emit (development aid)
+
+# ============================================================================
+# TRACING
+# ============================================================================
+TRACE_ENV_VAR = "DISNEY_TRACE"       # Set to 1 to record spans
+TRACE_DIR = DATA_DIR / 'traces'
+TRACE_MAX_SPANS = 5000               # Spans kept per trace (excess counted as dropped)
+TRACE_RECENT = 20                    # Finished traces kept in memory for Chrome export
+TRACE_FILE_MAX_BYTES = 20 * 1024 * 1024  # Roll traces.otlp.jsonl over past this size
+
+# ============================================================================
+# METRICS
+# ============================================================================
+HISTOGRAM_SUB_BUCKETS = 128          # Linear sub-buckets per power of two (~1.5% quantile error)
+METRICS_FILE = DATA_DIR / 'metrics' / 'disney_trip_planner.prom'
+METRICS_EXPORT_INTERVAL = 15.0       # Seconds between rewrites of METRICS_FILE
+METRICS_PORT_ENV_VAR = "DISNEY_METRICS_PORT"  # Serve /metrics on this port when set
+METRICS_WINDOW_SLOT = 10.0           # Seconds per rolling-window slot of each histogram
+METRICS_WINDOW_SLOTS = 30            # Slots kept (30 x 10 s = last 5 minutes)
+SESSION_ACTIVE_WINDOW = 300.0        # Sessions with a rerun this recent count as active
+PERF_DASHBOARD_REFRESH = 5.0         # Seconds between dashboard refreshes when auto-refresh is on
+
+# ============================================================================
+# PROFILING & ADMIN
+# ============================================================================
+ADMIN_TOKEN_ENV_VAR = "DISNEY_ADMIN_TOKEN"  # ?admin=<token> unlocks diagnostics (or secrets admin_token)
+PROFILE_ENV_VAR = "DISNEY_PROFILE"   # Set to 1 to profile every rerun
+PROFILE_DIR = DATA_DIR / 'profiles'
+PROFILE_INTERVAL = 0.001             # Seconds between stack samples
+PROFILE_KEEP = 50                    # Reruns kept in PROFILE_DIR
+PROFILE_TOP_N = 15                   # Functions listed in each rerun summary
+SLOW_RERUN_THRESHOLD = 2.0           # Seconds before the watchdog starts sampling a rerun
+SLOW_RERUN_SAMPLE_INTERVAL = 0.05    # Seconds between stack samples of a slow rerun
+SLOW_RERUN_TOP_STACKS = 5            # Stacks included in each slow-rerun warning
+SLOW_RERUN_STATE_KEYS = 10           # Largest session-state entries included in the warning
 
 # ============================================================================
 # OPENAI CONFIGURATION
@@ -24,6 +127,16 @@ DEFAULT_MODEL = "gpt-4-turbo-preview"
 DEFAULT_TEMPERATURE = 0.7
 MAX_TOKENS = 2000
 
+# USD per 1M tokens (prompt, completion), for cost estimates only
+MODEL_PRICING = {
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
 # ============================================================================
 # UI THEME COLORS - Disney Magical Kingdom Palette
 # ============================================================================
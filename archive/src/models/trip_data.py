@@ -2,7 +2,7 @@
 Data models for the Disney Trip Planning Agent
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -44,3 +44,26 @@ class TripPlan(BaseModel):
     checklists: List[ChecklistItem] = Field(default_factory=list)
     ideas: List[IdeaSuggestion] = Field(default_factory=list)
     notes: List[str] = Field(default_factory=list)
+
+
+def trim_ideas(ideas: List[Any], limit: int) -> List[Any]:
+    """
+    Drop the oldest ideas beyond `limit`, unsaved ones first
+
+    Works on models and encoded dicts alike; the order of what is kept is unchanged.
+    """
+    excess = len(ideas) - limit
+    if excess <= 0:
+        return ideas
+
+    def saved(idea) -> bool:
+        return bool(idea.get('saved') if isinstance(idea, dict) else idea.saved)
+
+    dropped = set()
+    for keep_saved in (True, False):
+        for index, idea in enumerate(ideas):
+            if len(dropped) == excess:
+                break
+            if index not in dropped and not (keep_saved and saved(idea)):
+                dropped.add(index)
+    return [idea for index, idea in enumerate(ideas) if index not in dropped]
@@ -0,0 +1,39 @@
+"""Pluggable trip storage backends for Disney Trip Planner"""
+from .base import TripStore
+from .memory import InMemoryTripStore
+from .local import LocalFileTripStore
+from .sqlite import SQLiteTripStore
+from .firestore import FirestoreTripStore
+
+
+def create_store(backend: str, **kwargs) -> TripStore:
+    """
+    Create a trip store by name
+
+    Args:
+        backend: 'memory', 'local', 'sqlite', 'firestore' or 'firestore-fake'
+        **kwargs: Passed to the backend constructor
+    """
+    if backend == 'memory':
+        return InMemoryTripStore()
+    if backend == 'local':
+        return LocalFileTripStore(**kwargs)
+    if backend == 'sqlite':
+        return SQLiteTripStore(**kwargs)
+    if backend == 'firestore':
+        from src.utils.firebase_config import get_firebase_manager
+        firebase = get_firebase_manager()
+        if not firebase.is_enabled():
+            raise RuntimeError("Firebase is not configured")
+        return FirestoreTripStore(firebase.db, **kwargs)
+    if backend == 'firestore-fake':
+        from .fake_firestore import FakeFirestoreClient
+        latency = kwargs.pop('latency', 0.0)
+        return FirestoreTripStore(FakeFirestoreClient(latency=latency), **kwargs)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+__all__ = [
+    'TripStore', 'InMemoryTripStore', 'LocalFileTripStore',
+    'SQLiteTripStore', 'FirestoreTripStore', 'create_store'
+]
@@ -0,0 +1,91 @@
+"""
+Storage backend interface for trip data.
+
+Every backend stores one document per trip code and speaks application-format
+data (Pydantic models, sets) at its public boundary, so `app.py` and the
+benchmark harness can swap backends without touching serialization.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from src.storage.codec import encode_trip, decode_trip
+
+
+class TripStore(ABC):
+    """Abstract trip storage backend"""
+
+    #: Short identifier used in logs and benchmark reports
+    name: str = "abstract"
+
+    @abstractmethod
+    def load(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a trip
+
+        Args:
+            trip_code: Unique trip identifier
+
+        Returns:
+            Trip data in application format, or None if not found
+        """
+
+    def load_fields(self, trip_code: str, fields) -> Optional[Dict[str, Any]]:
+        """
+        Load only some top-level fields of a trip
+
+        Backends that can project server-side override this; the default
+        loads the whole trip and filters it.
+
+        Returns:
+            The requested fields that exist (application format), or None if not found
+        """
+        trip_data = self.load(trip_code)
+        if trip_data is None:
+            return None
+        return {key: trip_data[key] for key in fields if key in trip_data}
+
+    @abstractmethod
+    def save(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
+        """
+        Replace a trip's document
+
+        Returns:
+            True if successful, False otherwise
+        """
+
+    @abstractmethod
+    def exists(self, trip_code: str) -> bool:
+        """Check whether a trip exists"""
+
+    @abstractmethod
+    def update(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        """
+        Update a subset of top-level fields of an existing trip
+
+        Args:
+            trip_code: Unique trip identifier
+            fields: Top-level keys to overwrite (e.g. {'checklist': [...]})
+
+        Returns:
+            True if the trip existed and was updated, False otherwise
+        """
+
+    @abstractmethod
+    def list_trips(self, limit: Optional[int] = None) -> List[str]:
+        """Return stored trip codes (sorted, up to `limit`)"""
+
+    def delete(self, trip_code: str) -> bool:
+        """Delete a trip (optional; used by benchmarks and admin tooling)"""
+        raise NotImplementedError(f"{self.name} store does not support delete")
+
+    def close(self):
+        """Release any held resources"""
+
+    # Shared serialization helpers so backends stay consistent
+    @staticmethod
+    def encode(trip_data: Dict[str, Any]) -> Dict[str, Any]:
+        return encode_trip(trip_data)
+
+    @staticmethod
+    def decode(document: Dict[str, Any]) -> Dict[str, Any]:
+        return decode_trip(document)
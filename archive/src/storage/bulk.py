@@ -0,0 +1,303 @@
+"""
+Bulk trip operations for backups, migrations and inspection.
+
+Everything here streams: collection scans are paged, documents are read with
+`get_all` in fixed-size chunks by a pool of workers, and at most
+`workers * 2` chunks are in flight at once, so memory stays bounded no matter
+how many trips the collection holds. Exports are gzip-compressed JSONL with
+one record per trip:
+    {"code": ..., "data": {...}, "subcollections": {"chat_pages": {<doc id>: {...}}, "ops": {...}}}
+Byte values (archived chat pages) are written as {"__bytes__": <base64>}.
+"""
+import base64
+import gzip
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.config.constants import (
+    FIRESTORE_BATCH_LIMIT, FIRESTORE_BATCH_BYTES,
+    BULK_READ_CHUNK, BULK_PAGE_SIZE, BULK_WORKERS
+)
+from src.storage.chat_log import CHAT_PAGES_COLLECTION
+from src.storage.firestore import OPS_COLLECTION, TRIPS_COLLECTION
+from src.utils.logger import log_info
+from src.utils.tracing import traced, wrap
+
+# Per-trip subcollections that travel with the trip document
+TRIP_SUBCOLLECTIONS = (CHAT_PAGES_COLLECTION, OPS_COLLECTION)
+
+# (code, trip document, {subcollection: {doc id: document}})
+TripRecord = Tuple[str, Dict[str, Any], Dict[str, Dict[str, Dict[str, Any]]]]
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk export or import"""
+    trips: int = 0
+    bytes: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def trips_per_sec(self) -> float:
+        return self.trips / self.seconds if self.seconds else 0.0
+
+
+# ============================================================================
+# SCANNING
+# ============================================================================
+def iter_trip_refs(db, collection: str = TRIPS_COLLECTION,
+                   page_size: int = BULK_PAGE_SIZE) -> Iterator[Any]:
+    """Paged scan of document references (IDs only, no document bodies)"""
+    return iter(db.collection(collection).list_documents(page_size=page_size))
+
+
+def list_trip_codes(db, collection: str = TRIPS_COLLECTION,
+                    limit: Optional[int] = None) -> Iterator[str]:
+    """Stream trip codes from a paged collection scan"""
+    for count, ref in enumerate(iter_trip_refs(db, collection)):
+        if limit is not None and count >= limit:
+            return
+        yield ref.id
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _bounded_map(func, chunks: Iterable[Any], workers: int) -> Iterator[Any]:
+    """Like executor.map, but never holds more than `workers * 2` pending chunks"""
+    max_pending = workers * 2
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trip-bulk') as pool:
+        pending = set()
+        for chunk in chunks:
+            # Workers run in the caller's context, so their spans nest under its span
+            pending.add(pool.submit(wrap(func), chunk))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def _read_subcollections(ref) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    subcollections = {}
+    for name in TRIP_SUBCOLLECTIONS:
+        documents = {snap.id: snap.to_dict() for snap in ref.collection(name).stream()}
+        if documents:
+            subcollections[name] = documents
+    return subcollections
+
+
+@traced('bulk.read_chunk')
+def _read_chunk(db, refs: List[Any]) -> List[TripRecord]:
+    """Read one chunk of trip documents in a single get_all round trip, plus their subcollections"""
+    return [(snap.id, snap.to_dict(), _read_subcollections(snap.reference))
+            for snap in db.get_all(refs) if snap.exists]
+
+
+def iter_trip_documents(db, collection: str = TRIPS_COLLECTION,
+                        chunk_size: int = BULK_READ_CHUNK,
+                        workers: int = BULK_WORKERS) -> Iterator[TripRecord]:
+    """Stream (code, encoded document, subcollections) using parallel get_all chunks"""
+    refs = iter_trip_refs(db, collection)
+    for documents in _bounded_map(lambda chunk: _read_chunk(db, chunk),
+                                  _chunks(refs, chunk_size), workers):
+        yield from documents
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {'__bytes__'}:
+            return base64.b64decode(value['__bytes__'])
+        return {key: _from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    return value
+
+
+# ============================================================================
+# EXPORT / IMPORT
+# ============================================================================
+@traced('bulk.export')
+def export_trips(db, output_path: Path, collection: str = TRIPS_COLLECTION,
+                 chunk_size: int = BULK_READ_CHUNK, workers: int = BULK_WORKERS,
+                 compresslevel: int = 6) -> BulkResult:
+    """
+    Export every trip, with its chat pages and ops, to gzip-compressed JSONL
+
+    Args:
+        db: Firestore client
+        output_path: Destination file (conventionally *.jsonl.gz)
+        chunk_size: Documents per get_all() call
+        workers: Parallel chunk readers
+
+    Returns:
+        BulkResult with counts and timing
+    """
+    result = BulkResult()
+    start = time.perf_counter()
+
+    with gzip.open(output_path, 'wt', encoding='utf-8', compresslevel=compresslevel) as out:
+        for code, document, subcollections in iter_trip_documents(db, collection, chunk_size, workers):
+            record = {'code': code, 'data': document}
+            if subcollections:
+                record['subcollections'] = subcollections
+            line = json.dumps(_to_json(record), separators=(',', ':'), ensure_ascii=False, default=str)
+            out.write(line + '\n')
+            result.trips += 1
+            result.bytes += len(line) + 1
+
+    result.seconds = time.perf_counter() - start
+    log_info("Trips exported", {'trips': result.trips, 'seconds': round(result.seconds, 2)})
+    return result
+
+
+def iter_export_file(input_path: Path) -> Iterator[TripRecord]:
+    """Stream (code, document, subcollections) back out of an export file"""
+    with gzip.open(input_path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = _from_json(json.loads(line))
+                yield record['code'], record['data'], record.get('subcollections') or {}
+
+
+def _write_count(subcollections: Dict[str, Dict[str, Any]]) -> int:
+    return 1 + sum(len(documents) for documents in subcollections.values())
+
+
+def _write_batches(records: Iterable[TripRecord], max_writes: int,
+                   max_bytes: int) -> Iterator[List[Tuple[str, Dict[str, Any], Dict[str, Any], int]]]:
+    """Group whole trips into batches that respect Firestore's write and size limits"""
+    batch, batch_writes, batch_bytes = [], 0, 0
+    for code, document, subcollections in records:
+        size = len(json.dumps(_to_json([document, subcollections]), separators=(',', ':'), default=str))
+        writes = _write_count(subcollections)
+        if batch and (batch_writes + writes > max_writes or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_writes, batch_bytes = [], 0, 0
+        batch.append((code, document, subcollections, size))
+        batch_writes += writes
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+@traced('bulk.import')
+def import_trips(db, input_path: Path, collection: str = TRIPS_COLLECTION,
+                 workers: int = BULK_WORKERS, overwrite: bool = True,
+                 batch_limit: int = FIRESTORE_BATCH_LIMIT) -> BulkResult:
+    """
+    Import trips, with their chat pages and ops, from an export file using batched writes
+
+    A trip with more subcollection documents than `batch_limit` is written
+    in several commits.
+
+    Args:
+        db: Firestore client
+        input_path: File produced by export_trips()
+        workers: Parallel batch committers
+        overwrite: When False, trips that already exist are skipped
+        batch_limit: Max writes per batch commit (Firestore caps this at 500)
+
+    Returns:
+        BulkResult with counts and timing
+    """
+    result = BulkResult()
+    start = time.perf_counter()
+    trips_ref = db.collection(collection)
+
+    @traced('bulk.commit')
+    def commit(batch: List[Tuple[str, Dict[str, Any], Dict[str, Any], int]]) -> Tuple[int, int, Optional[str]]:
+        if not overwrite:
+            refs = [trips_ref.document(code) for code, _, _, _ in batch]
+            existing = {snap.id for snap in db.get_all(refs) if snap.exists}
+            batch = [entry for entry in batch if entry[0] not in existing]
+            if not batch:
+                return 0, 0, None
+        writes = []
+        for code, document, subcollections, _ in batch:
+            ref = trips_ref.document(code)
+            writes.append((ref, document))
+            for name, documents in subcollections.items():
+                writes.extend((ref.collection(name).document(doc_id), data) for doc_id, data in documents.items())
+        try:
+            for start in range(0, len(writes), batch_limit):
+                write_batch = db.batch()
+                for ref, data in writes[start:start + batch_limit]:
+                    write_batch.set(ref, data)
+                write_batch.commit()
+        except Exception as e:
+            return 0, 0, f"{batch[0][0]}..{batch[-1][0]}: {e}"
+        return len(batch), sum(size for _, _, _, size in batch), None
+
+    batches = _write_batches(iter_export_file(input_path), batch_limit, FIRESTORE_BATCH_BYTES)
+    for written, size, error in _bounded_map(commit, batches, workers):
+        result.batches += 1
+        result.trips += written
+        result.bytes += size
+        if error:
+            result.errors.append(error)
+
+    result.seconds = time.perf_counter() - start
+    log_info("Trips imported", {
+        'trips': result.trips, 'batches': result.batches,
+        'errors': len(result.errors), 'seconds': round(result.seconds, 2)
+    })
+    return result
+
+
+# ============================================================================
+# STATS
+# ============================================================================
+@traced('bulk.stats')
+def trip_stats(db, collection: str = TRIPS_COLLECTION,
+               chunk_size: int = BULK_READ_CHUNK, workers: int = BULK_WORKERS) -> Dict[str, Any]:
+    """Aggregate collection statistics from a streaming scan"""
+    stats = {
+        'trips': 0, 'checklist_items': 0, 'completed_items': 0,
+        'ideas': 0, 'chat_messages': 0, 'ops': 0, 'total_bytes': 0, 'largest_trip': None,
+        'largest_bytes': 0,
+    }
+    for code, document, subcollections in iter_trip_documents(db, collection, chunk_size, workers):
+        checklist = document.get('checklist') or []
+        size = len(json.dumps(_to_json([document, subcollections]), separators=(',', ':'), default=str))
+        chat_pages = subcollections.get(CHAT_PAGES_COLLECTION, {})
+        stats['trips'] += 1
+        stats['checklist_items'] += len(checklist)
+        stats['completed_items'] += sum(1 for item in checklist if item.get('completed'))
+        stats['ideas'] += len(document.get('ideas') or [])
+        # Legacy inline history plus paged chat (archived messages are counted, not decompressed)
+        stats['chat_messages'] += len(document.get('chat_history') or []) + sum(
+            (page.get('count', 0) if page.get('archive') else 0) + len(page.get('m') or {})
+            for page_id, page in chat_pages.items() if page_id != 'meta'
+        )
+        stats['ops'] += len(subcollections.get(OPS_COLLECTION, {}))
+        stats['total_bytes'] += size
+        if size > stats['largest_bytes']:
+            stats['largest_trip'], stats['largest_bytes'] = code, size
+    stats['avg_bytes'] = stats['total_bytes'] / stats['trips'] if stats['trips'] else 0
+    return stats
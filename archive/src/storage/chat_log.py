@@ -0,0 +1,377 @@
+"""
+Append-only, paged chat history.
+
+Chat messages no longer live inline in the trip document. Each message is an
+immutable record appended to the current *page* (CHAT_PAGE_SIZE messages).
+Appending never rewrites an existing message: on Firestore it is one read of
+the small meta document plus one batched write (the message, merged into the
+page, and a server-side increment of the head page's count); locally it is a
+line appended to the head page file. When the log rolls
+over to a new page, the page CHAT_HOT_PAGES behind the head is compressed into
+an archive blob (zstd when installed, gzip otherwise).
+
+Readers load only the head page up front and fetch older pages on demand, so
+history is never thrown away to save memory.
+
+Firestore layout:
+    trips/{code}/chat_pages/meta          {'head': <page number>, 'count': <messages on it>}
+    trips/{code}/chat_pages/p000001       {'m': {<key>: message, ...},
+                                           'archive': <bytes>, 'codec': 'gzip'}
+Local layout:
+    {CHAT_DIR}/{code}/page-000001.jsonl   (hot page, one message per line)
+    {CHAT_DIR}/{code}/page-000001.gz      (archived page)
+"""
+import gzip
+import json
+import shutil
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.config.constants import CHAT_DIR, CHAT_HOT_PAGES, CHAT_PAGE_SIZE, VERSION_CONFLICT_RETRIES
+from src.storage.local import trip_file_name
+from src.utils.logger import log_error, log_info
+from src.utils.metrics import STORAGE_LATENCY, timed
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+def compress_messages(messages: List[Dict[str, Any]]) -> Tuple[bytes, str]:
+    """Compress a page of messages, returning (blob, codec name)"""
+    raw = json.dumps(messages, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(raw), 'zstd'
+    return gzip.compress(raw, compresslevel=9), 'gzip'
+
+
+def decompress_messages(blob: bytes, codec: str) -> List[Dict[str, Any]]:
+    """Inverse of compress_messages()"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Chat archive is zstd-compressed but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = gzip.decompress(blob)
+    return json.loads(raw)
+
+
+def _message_key(index: int, message: Dict[str, Any]) -> str:
+    # Sortable by position in the page, unique across concurrent writers
+    return f"{index:05d}-{message['id']}"
+
+
+# ============================================================================
+# PAGE BACKENDS
+# ============================================================================
+class ChatPageStore(ABC):
+    """Where chat pages physically live"""
+
+    @abstractmethod
+    def head(self) -> int:
+        """Highest page number written so far (0 if the log is empty)"""
+
+    @abstractmethod
+    def set_head(self, page: int):
+        """Record that `page` is now the head page"""
+
+    @abstractmethod
+    def append(self, page: int, index: int, message: Dict[str, Any]):
+        """Append one message (the `index`-th on its page) without rewriting existing ones"""
+
+    @abstractmethod
+    def read(self, page: int) -> List[Dict[str, Any]]:
+        """Return all messages on a page in order (archived or not)"""
+
+    def count(self, page: int) -> int:
+        """Messages on a page"""
+        return len(self.read(page))
+
+    def head_and_count(self) -> Tuple[int, int]:
+        """Head page number and the messages on it"""
+        head = self.head()
+        return head, (self.count(head) if head else 0)
+
+    @abstractmethod
+    def archive(self, page: int):
+        """Compress a page that is no longer written to"""
+
+    @abstractmethod
+    def clear(self):
+        """Delete every page"""
+
+
+CHAT_PAGES_COLLECTION = 'chat_pages'
+
+
+class FirestoreChatPages(ChatPageStore):
+    """Pages as documents in a `chat_pages` subcollection of the trip"""
+
+    def __init__(self, db, trip_code: str, collection: str = 'trips'):
+        self.db = db
+        self.pages = db.collection(collection).document(trip_code).collection(CHAT_PAGES_COLLECTION)
+
+    @staticmethod
+    def _page_id(page: int) -> str:
+        return f"p{page:06d}"
+
+    def head(self) -> int:
+        doc = self.pages.document('meta').get()
+        return (doc.to_dict() or {}).get('head', 0) if doc.exists else 0
+
+    def head_and_count(self) -> Tuple[int, int]:
+        # The meta doc carries the head page's count, so the page itself is not read
+        doc = self.pages.document('meta').get()
+        meta = (doc.to_dict() or {}) if doc.exists else {}
+        head = meta.get('head', 0)
+        if not head:
+            return 0, 0
+        if 'count' not in meta:
+            # Meta written before the counter existed: count once and store it
+            meta['count'] = self.count(head)
+            self.pages.document('meta').set({'count': meta['count']}, merge=True)
+        return head, meta['count']
+
+    def set_head(self, page: int):
+        self.pages.document('meta').set({'head': page, 'count': 0}, merge=True)
+
+    def append(self, page: int, index: int, message: Dict[str, Any]):
+        from src.storage.firestore import increment
+
+        # merge=True merges into the 'm' map, so this never reads or rewrites old
+        # messages; the head counter is bumped in the same atomic batch
+        batch = self.db.batch()
+        batch.set(self.pages.document(self._page_id(page)),
+                  {'m': {_message_key(index, message): message}}, merge=True)
+        batch.set(self.pages.document('meta'), {'count': increment(1)}, merge=True)
+        batch.commit()
+
+    @staticmethod
+    def _messages(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        messages = []
+        if data.get('archive'):
+            messages.extend(decompress_messages(bytes(data['archive']), data.get('codec', 'gzip')))
+        live = data.get('m') or {}
+        messages.extend(live[key] for key in sorted(live))
+        return messages
+
+    def read(self, page: int) -> List[Dict[str, Any]]:
+        doc = self.pages.document(self._page_id(page)).get()
+        if not doc.exists:
+            return []
+        return self._messages(doc.to_dict() or {})
+
+    def count(self, page: int) -> int:
+        # Archived messages are counted without decompressing them
+        doc = self.pages.document(self._page_id(page)).get()
+        data = (doc.to_dict() or {}) if doc.exists else {}
+        return (data.get('count', 0) if data.get('archive') else 0) + len(data.get('m') or {})
+
+    def archive(self, page: int, retries: int = VERSION_CONFLICT_RETRIES):
+        """
+        Fold the page's live messages into its archive blob
+
+        The rewrite is conditional on the page being unchanged since it was
+        read, so a message another session appends meanwhile is never lost:
+        the write fails, and the page is read again and retried.
+        """
+        from src.storage.firestore import firestore_errors
+
+        ref = self.pages.document(self._page_id(page))
+        for attempt in range(retries + 1):
+            doc = ref.get()
+            data = (doc.to_dict() or {}) if doc.exists else {}
+            if not data.get('m'):
+                return
+            messages = self._messages(data)
+            blob, codec = compress_messages(messages)
+            try:
+                ref.update({'archive': blob, 'codec': codec, 'count': len(messages), 'm': {}},
+                           option=self.db.write_option(last_update_time=doc.update_time))
+                return
+            except firestore_errors().FailedPrecondition:
+                if attempt == retries:
+                    raise
+
+    def clear(self):
+        for ref in self.pages.list_documents():
+            ref.delete()
+
+
+# Sessions share one process, so this keeps an append from landing on a
+# hot page between archive() reading it and deleting it
+_local_lock = threading.Lock()
+
+
+class LocalChatPages(ChatPageStore):
+    """Pages as JSONL files (hot) and compressed files (archived) in a directory"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _hot(self, page: int) -> Path:
+        return self.root / f"page-{page:06d}.jsonl"
+
+    def _cold(self, page: int) -> Path:
+        return self.root / f"page-{page:06d}.gz"
+
+    def head(self) -> int:
+        pages = [int(p.name[5:11]) for p in self.root.glob('page-*')]
+        return max(pages) if pages else 0
+
+    def set_head(self, page: int):
+        self._hot(page).touch()
+
+    def append(self, page: int, index: int, message: Dict[str, Any]):
+        with _local_lock, open(self._hot(page), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(message, separators=(',', ':'), ensure_ascii=False) + '\n')
+
+    def read(self, page: int) -> List[Dict[str, Any]]:
+        messages = []
+        cold = self._cold(page)
+        if cold.exists():
+            header, blob = cold.read_bytes().split(b'\n', 1)
+            messages.extend(decompress_messages(blob, header.decode('ascii')))
+        hot = self._hot(page)
+        if hot.exists():
+            with open(hot, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.endswith('\n'):  # Skip a torn final line
+                        messages.append(json.loads(line))
+        return messages
+
+    def archive(self, page: int):
+        with _local_lock:
+            hot = self._hot(page)
+            if not hot.exists():
+                return
+            blob, codec = compress_messages(self.read(page))
+            tmp = self._cold(page).with_suffix('.tmp')
+            tmp.write_bytes(codec.encode('ascii') + b'\n' + blob)
+            tmp.replace(self._cold(page))
+            hot.unlink()
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+
+# ============================================================================
+# CHAT LOG
+# ============================================================================
+class ChatLog:
+    """
+    Paged, append-only chat history for one trip.
+
+    Keeps only the head page number and its size in memory; message bodies
+    are returned to the caller and never cached here. Other members append
+    to the same log, so both are read again from the store (the meta doc
+    on Firestore) before each append decides whether the page is full.
+    """
+
+    def __init__(self, pages: ChatPageStore, page_size: int = CHAT_PAGE_SIZE,
+                 hot_pages: int = CHAT_HOT_PAGES):
+        self.pages = pages
+        self.page_size = page_size
+        self.hot_pages = hot_pages
+        self.head_page = 0
+        self._head_count = 0
+
+    @staticmethod
+    def new_message(role: str, content: str) -> Dict[str, Any]:
+        """Build an immutable chat message record"""
+        return {
+            'id': uuid.uuid4().hex[:12],
+            'role': role,
+            'content': content,
+            'ts': round(time.time(), 3),
+        }
+
+    @property
+    def head_count(self) -> int:
+        """Messages on the head page"""
+        return self._head_count
+
+    @timed(STORAGE_LATENCY, 'chat.latest')
+    def latest(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """Load the head page: returns (page number, messages)"""
+        self.head_page = self.pages.head()
+        if self.head_page == 0:
+            self._head_count = 0
+            return 0, []
+        messages = self.pages.read(self.head_page)
+        self._head_count = len(messages)
+        return self.head_page, messages
+
+    @timed(STORAGE_LATENCY, 'chat.load_page')
+    def load_page(self, page: int) -> List[Dict[str, Any]]:
+        """Load an older page on demand (pages are numbered from 1)"""
+        if page < 1:
+            return []
+        return self.pages.read(page)
+
+    @timed(STORAGE_LATENCY, 'chat.append')
+    def append(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Append one message; rolls over to a new page when the head is full"""
+        if 'id' not in message or 'ts' not in message:
+            message = {**self.new_message(message.get('role', 'user'), message.get('content', '')),
+                       **message}
+
+        self._sync_head()
+        if self.head_page == 0 or self._head_count >= self.page_size:
+            self._roll_over()
+
+        self.pages.append(self.head_page, self._head_count, message)
+        self._head_count += 1
+        return message
+
+    def extend(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.append(m) for m in messages]
+
+    def clear(self):
+        self.pages.clear()
+        self.head_page = 0
+        self._head_count = 0
+
+    def _sync_head(self):
+        self.head_page, self._head_count = self.pages.head_and_count()
+
+    def _roll_over(self):
+        self.head_page += 1
+        self._head_count = 0
+        self.pages.set_head(self.head_page)
+
+        cold_page = self.head_page - self.hot_pages
+        if cold_page >= 1:
+            try:
+                self.pages.archive(cold_page)
+                log_info("Chat page archived", {'page': cold_page})
+            except Exception as e:
+                # Archiving is an optimization; the page stays readable uncompressed
+                log_error("Chat page archive failed", e, {'page': cold_page})
+
+
+def get_chat_log(trip_code: str, db=None) -> ChatLog:
+    """
+    Create the chat log for a trip
+
+    Uses Firestore when cloud sync is enabled (or `db` is given), otherwise
+    local pages under CHAT_DIR.
+    """
+    if db is None:
+        from src.utils.firebase_config import get_firebase_manager
+        firebase = get_firebase_manager()
+        if firebase.is_enabled():
+            db = firebase.db
+    if db is not None:
+        return ChatLog(FirestoreChatPages(db, trip_code))
+    return ChatLog(LocalChatPages(CHAT_DIR / trip_file_name(trip_code)))
@@ -0,0 +1,259 @@
+"""
+Trip codec: fast conversion between application-format trips and storage documents.
+
+Encoding dispatches on the exact type of each value through a lookup table
+instead of an isinstance chain, and builds item dictionaries straight from the
+model's field storage instead of calling model_dump() per item.
+
+Decoding dispatches on the document key. Data read back from our own stores is
+trusted by default: items are rebuilt model_construct()-style (no validation),
+and a small random sample is fully validated so schema drift still gets noticed.
+If a sample fails, that list is re-decoded with full validation.
+
+A compact wire format (`dumps_compact` / `loads_compact`) stores checklist and
+idea items as positional rows, then compresses the JSON with zlib.
+"""
+import json
+import math
+import random
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.constants import CODEC_VALIDATION_SAMPLE_RATE
+from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
+from src.utils.logger import log_warning
+from src.utils.metrics import STORAGE_LATENCY, timed
+from src.utils.tracing import traced
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+def _encode_checklist_item(item: ChecklistItem) -> Dict[str, Any]:
+    # All ChecklistItem fields are JSON scalars, so the field dict is already wire-ready
+    return dict(item.__dict__)
+
+
+def _encode_idea(idea: IdeaSuggestion) -> Dict[str, Any]:
+    encoded = dict(idea.__dict__)
+    encoded['tags'] = list(encoded['tags'])
+    return encoded
+
+
+def _encode_model(model) -> Dict[str, Any]:
+    return model.model_dump(mode='json')
+
+
+def _encode_list(values: list) -> list:
+    if not values:
+        return []
+    encoder = _ENCODERS.get(type(values[0]))
+    if encoder is not None and all(type(v) is type(values[0]) for v in values):
+        return [encoder(v) for v in values]
+    return [encode_value(v) for v in values]
+
+
+_ENCODERS: Dict[type, Callable[[Any], Any]] = {
+    ChecklistItem: _encode_checklist_item,
+    IdeaSuggestion: _encode_idea,
+    TripDetails: _encode_model,
+    list: _encode_list,
+    tuple: _encode_list,
+    set: list,
+    frozenset: list,
+    datetime: datetime.isoformat,
+    # JSON scalars and plain dicts (chat messages, suggestions) pass through
+    str: None, int: None, float: None, bool: None, dict: None, type(None): None,
+}
+
+
+def encode_value(value: Any) -> Any:
+    """Encode a single value via the type dispatch table"""
+    kind = type(value)
+    if kind in _ENCODERS:
+        encoder = _ENCODERS[kind]
+        return value if encoder is None else encoder(value)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    return value
+
+
+@traced('codec.encode')
+@timed(STORAGE_LATENCY, 'codec.encode')
+def encode_trip(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert application-format trip data to a storage document
+
+    Handles Pydantic models, sets, tuples and datetimes at any top-level key.
+    """
+    return {key: encode_value(value) for key, value in data.items()}
+
+
+# ============================================================================
+# DECODING
+# ============================================================================
+_BUILDERS: Dict[type, Callable[[dict], Any]] = {}
+
+
+def _make_trusted_builder(model) -> Callable[[dict], Any]:
+    """
+    Build a constructor that does what model_construct() does, minus its overhead
+
+    model_construct() re-walks every field in Python on each call and ends up
+    slower than validation itself under pydantic-core. Our own documents always
+    carry every field, so the fast path copies the dict straight in and only
+    fills defaults when keys are missing. The result is verified against
+    model_construct() once; any mismatch falls back to model_construct().
+    """
+    fields = model.model_fields
+    field_names = frozenset(fields)
+    defaults = {
+        name: info.get_default(call_default_factory=True)
+        for name, info in fields.items() if not info.is_required()
+    }
+    new = model.__new__
+    set_attr = object.__setattr__
+
+    def build(raw: dict):
+        if raw.keys() == field_names:
+            values = dict(raw)
+            fields_set = set(field_names)
+        else:
+            values = {
+                name: raw[name] if name in raw else defaults.get(name)
+                for name in fields
+            }
+            fields_set = set(raw) & field_names
+        instance = new(model)
+        set_attr(instance, '__dict__', values)
+        set_attr(instance, '__pydantic_fields_set__', fields_set)
+        set_attr(instance, '__pydantic_extra__', None)
+        set_attr(instance, '__pydantic_private__', None)
+        return instance
+
+    try:
+        probe = {name: defaults.get(name, '') for name in fields}
+        if build(probe) == model.model_construct(**probe):
+            return build
+    except Exception:
+        pass
+    return lambda raw: model.model_construct(**raw)
+
+
+def _trusted_builder(model) -> Callable[[dict], Any]:
+    builder = _BUILDERS.get(model)
+    if builder is None:
+        builder = _BUILDERS[model] = _make_trusted_builder(model)
+    return builder
+
+
+def _decode_items(model, raw_items: List[dict], trusted: bool, sample_rate: float) -> list:
+    if not trusted:
+        return [model(**item) for item in raw_items]
+
+    if sample_rate > 0 and raw_items:
+        sample_size = min(len(raw_items), math.ceil(len(raw_items) * sample_rate))
+        try:
+            for raw in random.sample(raw_items, sample_size):
+                model.model_validate(raw)
+        except Exception as e:
+            log_warning(f"Codec sample validation failed for {model.__name__}; revalidating",
+                        {'error': str(e)})
+            return [model(**item) for item in raw_items]
+
+    build = _trusted_builder(model)
+    return [build(item) for item in raw_items]
+
+
+def _decode_trip_details(value, trusted, sample_rate):
+    # One object per trip and it carries datetimes, so always validate
+    return TripDetails(**value)
+
+
+def _decode_checklist(value, trusted, sample_rate):
+    return _decode_items(ChecklistItem, value, trusted, sample_rate)
+
+
+def _decode_ideas(value, trusted, sample_rate):
+    return _decode_items(IdeaSuggestion, value, trusted, sample_rate)
+
+
+def _decode_rejected(value, trusted, sample_rate):
+    return set(value)
+
+
+_DECODERS: Dict[str, Callable[[Any, bool, float], Any]] = {
+    'trip_details': _decode_trip_details,
+    'checklist': _decode_checklist,
+    'ideas': _decode_ideas,
+    'rejected_items': _decode_rejected,
+}
+
+
+@traced('codec.decode')
+@timed(STORAGE_LATENCY, 'codec.decode')
+def decode_trip(document: Dict[str, Any], trusted: bool = True,
+                sample_rate: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Convert a storage document back to application format
+
+    Args:
+        document: Encoded trip document
+        trusted: Skip per-item validation (data written by this app)
+        sample_rate: Fraction of items to fully validate on the trusted path
+                     (defaults to CODEC_VALIDATION_SAMPLE_RATE)
+    """
+    if sample_rate is None:
+        sample_rate = CODEC_VALIDATION_SAMPLE_RATE
+
+    prepared = {}
+    for key, value in document.items():
+        decoder = _DECODERS.get(key)
+        if decoder is not None and value:
+            prepared[key] = decoder(value, trusted, sample_rate)
+        else:
+            prepared[key] = value
+    return prepared
+
+
+# ============================================================================
+# COMPACT WIRE FORMAT
+# ============================================================================
+COMPACT_VERSION = 1
+_CHECKLIST_FIELDS = ('id', 'text', 'completed', 'category', 'priority', 'deadline')
+_IDEA_FIELDS = ('id', 'title', 'description', 'category', 'tags', 'saved')
+_ROW_FIELDS = {'checklist': _CHECKLIST_FIELDS, 'ideas': _IDEA_FIELDS}
+
+
+def pack_document(document: Dict[str, Any], level: int = 6) -> bytes:
+    """Pack an encoded trip document into the compact format (positional rows + zlib)"""
+    packed = dict(document)
+    for key, fields in _ROW_FIELDS.items():
+        if packed.get(key):
+            packed[key] = [[item.get(f) for f in fields] for item in packed[key]]
+    payload = json.dumps({'v': COMPACT_VERSION, 'd': packed},
+                         separators=(',', ':'), ensure_ascii=False, default=str)
+    return zlib.compress(payload.encode('utf-8'), level)
+
+
+def unpack_document(blob: bytes) -> Dict[str, Any]:
+    """Unpack a compact blob back into an encoded trip document"""
+    payload = json.loads(zlib.decompress(blob))
+    if payload.get('v') != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact trip format: {payload.get('v')}")
+    document = payload['d']
+    for key, fields in _ROW_FIELDS.items():
+        if document.get(key):
+            document[key] = [dict(zip(fields, row)) for row in document[key]]
+    return document
+
+
+def dumps_compact(data: Dict[str, Any], level: int = 6) -> bytes:
+    """Serialize an application-format trip to the compact format"""
+    return pack_document(encode_trip(data), level)
+
+
+def loads_compact(blob: bytes, trusted: bool = True) -> Dict[str, Any]:
+    """Deserialize a trip written by dumps_compact()"""
+    return decode_trip(unpack_document(blob), trusted=trusted)
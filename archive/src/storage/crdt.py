@@ -0,0 +1,365 @@
+"""
+Op-based CRDT for the collaboratively edited parts of a shared trip.
+
+Whole-document last-writer-wins meant two family members ticking items at
+the same time overwrote each other. Instead, every edit to the checklist,
+the idea "saved" flags and the rejected set is written as a small, immutable
+op record, and clients merge ops locally. Ops commute, so concurrent edits
+never need a read-modify-write transaction and never have to be retried.
+
+Data types:
+- Checklist: LWW-element map keyed by item id. Each item has an add and a
+  remove timestamp (present while add > remove) and a last-writer-wins
+  `completed` register, so one person's tick never hides another's delete.
+- Idea saved flags: one LWW register per idea id.
+- Rejected items: add-wins observed-remove set. Every add carries a unique
+  tag and a remove only cancels the tags it has seen, so a concurrent
+  re-reject survives.
+
+Timestamps come from a hybrid logical clock, encoded as strings that sort in
+causal order ('<wall ms>-<counter>-<actor>'). Items already in a trip
+document without CRDT metadata are treated as written at BASE_TS.
+
+Document layout:
+    trips/{code}                checklist, ideas, rejected_items (materialized)
+                                crdt: {'items': {...}, 'flags': {...}, 'rejected': {...}}
+    trips/{code}/ops/{op id}    {'id', 'ts', 'type', ...payload}
+"""
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+BASE_TS = '0'
+
+
+# ============================================================================
+# HYBRID LOGICAL CLOCK
+# ============================================================================
+def ts_wall(ts: str) -> float:
+    """Wall-clock seconds encoded in a timestamp (0 for BASE_TS)"""
+    return int(ts.split('-', 1)[0]) / 1000.0
+
+
+def pull_cursor(ts: str, overlap: float) -> Optional[str]:
+    """Lower bound for fetching new ops: `overlap` seconds before `ts` (None: fetch all)"""
+    if ts == BASE_TS:
+        return None
+    wall = int(ts.split('-', 1)[0]) - int(overlap * 1000)
+    return f"{max(wall, 0):013d}"
+
+
+class HybridClock:
+    """Monotonic timestamps that stay ahead of every timestamp observed"""
+
+    def __init__(self, actor: Optional[str] = None):
+        self.actor = actor or uuid.uuid4().hex[:8]
+        self._wall = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def now(self) -> str:
+        with self._lock:
+            wall = int(time.time() * 1000)
+            if wall > self._wall:
+                self._wall, self._counter = wall, 0
+            else:
+                self._counter += 1
+            return f"{self._wall:013d}-{self._counter:04d}-{self.actor}"
+
+    def observe(self, ts: str):
+        """Move past a timestamp seen on another client's op"""
+        if ts == BASE_TS:
+            return
+        wall, counter, _ = ts.split('-', 2)
+        with self._lock:
+            wall, counter = int(wall), int(counter)
+            if (wall, counter) > (self._wall, self._counter):
+                self._wall, self._counter = wall, counter
+
+
+# ============================================================================
+# OPS
+# ============================================================================
+def make_op(clock: HybridClock, op_type: str, **payload) -> Dict[str, Any]:
+    """Build an op record; its id doubles as the add-wins tag for rejections"""
+    op = {'id': uuid.uuid4().hex, 'ts': clock.now(), 'type': op_type}
+    op.update(payload)
+    return op
+
+
+def ops_for_change(clock: HybridClock, change: str, fields: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Translate an app change (the journal op name and payload) into CRDT ops
+
+    Item and idea payloads must already be encoded (plain dicts). Changes
+    that touch no CRDT-managed field return an empty list.
+    """
+    ops = []
+    if change == 'item_added':
+        ops.append(make_op(clock, 'item_added', item=fields['item']))
+    elif change == 'items_added':
+        ops.extend(make_op(clock, 'item_added', item=item) for item in fields['items'])
+    elif change == 'item_toggled':
+        ops.append(make_op(clock, 'item_toggled', item_id=fields['item_id'], completed=fields['completed']))
+    elif change == 'item_deleted':
+        ops.append(make_op(clock, 'item_deleted', item_id=fields['item_id']))
+        if fields.get('rejected'):
+            ops.append(make_op(clock, 'rejected_added', text=fields['rejected']))
+    elif change == 'items_edited':
+        ops.extend(make_op(clock, 'item_toggled', item_id=item_id, completed=completed)
+                   for item_id, completed in fields.get('toggled', {}).items())
+        ops.extend(make_op(clock, 'item_deleted', item_id=item_id) for item_id in fields.get('deleted', []))
+        ops.extend(make_op(clock, 'rejected_added', text=text) for text in fields.get('rejected', []) if text)
+    elif change == 'idea_saved':
+        ops.append(make_op(clock, 'idea_saved', idea_id=fields['idea_id'], saved=fields['saved']))
+    elif change == 'suggestion_resolved':
+        if fields.get('item'):
+            ops.append(make_op(clock, 'item_added', item=fields['item']))
+        if fields.get('rejected'):
+            ops.append(make_op(clock, 'rejected_added', text=fields['rejected']))
+    elif change == 'suggestions_cleared':
+        ops.extend(make_op(clock, 'rejected_added', text=text) for text in fields.get('rejected', []) if text)
+    return ops
+
+
+# Trip fields whose edits only ever travel as ops
+CRDT_FIELDS = ('checklist', 'rejected_items')
+
+# Plain (non-CRDT) document fields each app change rewrites alongside its ops
+_DOCUMENT_FIELDS = {
+    'ideas_added': ('ideas',),
+    'suggestions_set': ('pending_suggestions',),
+    'suggestion_resolved': ('pending_suggestions',),
+    'suggestions_cleared': ('pending_suggestions',),
+}
+
+
+def document_fields_for_change(change: str) -> Tuple[str, ...]:
+    """Plain document fields to write alongside a change's ops"""
+    return _DOCUMENT_FIELDS.get(change, ())
+
+
+# ============================================================================
+# REPLICA
+# ============================================================================
+class TripCRDT:
+    """
+    One replica of a trip's CRDT state
+
+    Applying an op is idempotent and order-independent, and merge() of two
+    replicas gives the same state as applying both op sets.
+    """
+
+    def __init__(self):
+        # item id -> {'item': dict|None, 'added': ts, 'removed': ts|None, 'done': [bool, ts]}
+        self.items: Dict[str, Dict[str, Any]] = {}
+        # idea id -> [saved, ts]
+        self.flags: Dict[str, list] = {}
+        # text -> (add tags, removed tags)
+        self.rejected: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self.latest_ts = BASE_TS
+        # Ops applied to this replica (tells readers when the log needs compacting)
+        self.ops_applied = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> 'TripCRDT':
+        """
+        Build a replica from an encoded trip document
+
+        Uses the document's `crdt` metadata where present; items, flags and
+        rejections without metadata (legacy trips) get BASE_TS.
+        """
+        replica = cls()
+        replica.load_state(document.get('crdt') or {})
+        for item in document.get('checklist') or []:
+            entry = replica.items.setdefault(item['id'], cls._new_item(BASE_TS))
+            entry['item'] = dict(item)
+            if entry['done'][1] == BASE_TS:
+                entry['done'][0] = bool(item.get('completed'))
+        for idea in document.get('ideas') or []:
+            replica.flags.setdefault(idea['id'], [bool(idea.get('saved')), BASE_TS])
+        for text in document.get('rejected_items') or []:
+            if text not in replica.rejected:
+                replica.rejected[text] = ({f'base:{text}'}, set())
+        return replica
+
+    def load_state(self, state: Dict[str, Any]):
+        """Merge serialized CRDT metadata (see to_state) into this replica"""
+        other = TripCRDT()
+        for item_id, (added, removed, done, done_ts) in state.get('items', {}).items():
+            other.items[item_id] = {'item': None, 'added': added, 'removed': removed,
+                                    'done': [done, done_ts]}
+        for idea_id, (saved, ts) in state.get('flags', {}).items():
+            other.flags[idea_id] = [saved, ts]
+        for text, (adds, removes) in state.get('rejected', {}).items():
+            other.rejected[text] = (set(adds), set(removes))
+        other.latest_ts = state.get('latest_ts', BASE_TS)
+        self.merge(other)
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize CRDT metadata (item bodies live in the checklist field)"""
+        return {
+            'items': {
+                item_id: [e['added'], e['removed'], e['done'][0], e['done'][1]]
+                for item_id, e in self.items.items()
+            },
+            'flags': {idea_id: list(flag) for idea_id, flag in self.flags.items()},
+            'rejected': {
+                text: [sorted(adds), sorted(removes)]
+                for text, (adds, removes) in self.rejected.items()
+            },
+            'latest_ts': self.latest_ts,
+        }
+
+    # ------------------------------------------------------------------
+    # Applying ops
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _new_item(ts: str) -> Dict[str, Any]:
+        return {'item': None, 'added': ts, 'removed': None, 'done': [False, BASE_TS]}
+
+    def apply(self, op: Dict[str, Any]) -> bool:
+        """Apply one op; returns True if the visible state may have changed"""
+        ts = op['ts']
+        if ts > self.latest_ts:
+            self.latest_ts = ts
+        kind = op['type']
+
+        if kind == 'item_added':
+            item = op['item']
+            entry = self.items.get(item['id'])
+            if entry is None:
+                entry = self.items[item['id']] = self._new_item(ts)
+                entry['done'] = [bool(item.get('completed')), ts]
+            elif ts > entry['added']:
+                entry['added'] = ts
+            elif entry['item'] is not None:
+                return False
+            entry['item'] = dict(item)
+            return True
+
+        if kind == 'item_deleted':
+            entry = self.items.setdefault(op['item_id'], self._new_item(BASE_TS))
+            if entry['removed'] is None or ts > entry['removed']:
+                entry['removed'] = ts
+                return True
+            return False
+
+        if kind == 'item_toggled':
+            entry = self.items.setdefault(op['item_id'], self._new_item(BASE_TS))
+            if ts > entry['done'][1]:
+                entry['done'] = [bool(op['completed']), ts]
+                return True
+            return False
+
+        if kind == 'idea_saved':
+            flag = self.flags.get(op['idea_id'])
+            if flag is None or ts > flag[1]:
+                self.flags[op['idea_id']] = [bool(op['saved']), ts]
+                return True
+            return False
+
+        if kind == 'rejected_added':
+            adds, _ = self.rejected.setdefault(op['text'], (set(), set()))
+            if op['id'] in adds:
+                return False
+            adds.add(op['id'])
+            return True
+
+        if kind == 'rejected_removed':
+            adds, removes = self.rejected.setdefault(op['text'], (set(), set()))
+            before = len(removes)
+            removes.update(op.get('tags') or adds)
+            return len(removes) != before
+
+        return False
+
+    def apply_all(self, ops: Iterable[Dict[str, Any]]) -> bool:
+        changed = False
+        for op in ops:
+            changed = self.apply(op) or changed
+            self.ops_applied += 1
+        return changed
+
+    def merge(self, other: 'TripCRDT'):
+        """State-based merge (used when folding stored metadata)"""
+        for item_id, theirs in other.items.items():
+            mine = self.items.get(item_id)
+            if mine is None:
+                self.items[item_id] = {
+                    'item': dict(theirs['item']) if theirs['item'] else None,
+                    'added': theirs['added'], 'removed': theirs['removed'],
+                    'done': list(theirs['done']),
+                }
+                continue
+            if theirs['added'] > mine['added']:
+                mine['added'] = theirs['added']
+            if mine['item'] is None and theirs['item'] is not None:
+                mine['item'] = dict(theirs['item'])
+            if theirs['removed'] is not None and (mine['removed'] is None or theirs['removed'] > mine['removed']):
+                mine['removed'] = theirs['removed']
+            if theirs['done'][1] > mine['done'][1]:
+                mine['done'] = list(theirs['done'])
+        for idea_id, flag in other.flags.items():
+            if idea_id not in self.flags or flag[1] > self.flags[idea_id][1]:
+                self.flags[idea_id] = list(flag)
+        for text, (adds, removes) in other.rejected.items():
+            my_adds, my_removes = self.rejected.setdefault(text, (set(), set()))
+            my_adds.update(adds)
+            my_removes.update(removes)
+        if other.latest_ts > self.latest_ts:
+            self.latest_ts = other.latest_ts
+
+    # ------------------------------------------------------------------
+    # Materializing
+    # ------------------------------------------------------------------
+    def checklist(self) -> List[Dict[str, Any]]:
+        """Visible checklist items (encoded dicts), in order of addition"""
+        live = [
+            (entry['added'], order, entry)
+            for order, entry in enumerate(self.items.values())
+            if entry['item'] is not None
+            and (entry['removed'] is None or entry['added'] > entry['removed'])
+        ]
+        live.sort(key=lambda row: (row[0], row[1]))
+        items = []
+        for _, _, entry in live:
+            item = dict(entry['item'])
+            item['completed'] = entry['done'][0]
+            items.append(item)
+        return items
+
+    def rejected_items(self) -> Set[str]:
+        return {text for text, (adds, removes) in self.rejected.items() if adds - removes}
+
+    def apply_flags(self, ideas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Overlay saved flags onto encoded ideas"""
+        flagged = []
+        for idea in ideas:
+            flag = self.flags.get(idea['id'])
+            if flag is not None and flag[0] != idea.get('saved'):
+                idea = dict(idea, saved=flag[0])
+            flagged.append(idea)
+        return flagged
+
+    def materialize(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply this replica to an encoded document's CRDT-managed fields
+
+        Only fields present in `document` are touched, so partial (projected)
+        documents stay partial.
+        """
+        merged = dict(document)
+        if 'checklist' in merged:
+            merged['checklist'] = self.checklist()
+        if 'rejected_items' in merged:
+            merged['rejected_items'] = sorted(self.rejected_items())
+        if 'ideas' in merged:
+            merged['ideas'] = self.apply_flags(merged['ideas'] or [])
+        merged.pop('crdt', None)
+        return merged
+
@@ -0,0 +1,332 @@
+"""
+In-process fake of the subset of the Firestore client API used by this app.
+
+Lets FirestoreTripStore (and FirebaseManager) run without credentials or the
+emulator. Documents are deep-copied on every read and write to mimic the wire
+boundary, and an optional per-RPC latency simulates network round trips.
+"""
+import copy
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.storage.firestore import AlreadyExists, FailedPrecondition, NotFound
+
+# Firestore rejects batched writes with more operations than this
+MAX_BATCH_WRITES = 500
+
+
+def _is_increment(value: Any) -> bool:
+    # firestore.Increment or its fallback (see src.storage.firestore.increment)
+    return type(value).__name__ in ('Increment', '_FallbackIncrement') and hasattr(value, 'value')
+
+
+def _resolve(existing: Dict[str, Any], key: str, value: Any) -> Any:
+    if _is_increment(value):
+        current = existing.get(key)
+        return (current if isinstance(current, (int, float)) else 0) + value.value
+    if isinstance(value, dict):
+        return {k: _resolve({}, k, v) for k, v in value.items()}
+    return value
+
+
+def _deep_merge(existing: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge nested maps the way Firestore's set(..., merge=True) does"""
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(existing.get(key), dict):
+            _deep_merge(existing[key], value)
+        else:
+            existing[key] = _resolve(existing, key, value)
+    return existing
+
+
+def _apply_update(existing: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Top-level field replacement (update()), resolving transforms such as Increment"""
+    for key, value in updates.items():
+        existing[key] = _resolve(existing, key, value)
+    return existing
+
+
+def _new_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _apply_update({}, data)
+
+
+class FakeWriteResult:
+    """Result of a single write (carries the new update time)"""
+
+    def __init__(self, update_time):
+        self.update_time = update_time
+
+
+class FakeWriteOption:
+    """Write precondition from FakeFirestoreClient.write_option()"""
+
+    def __init__(self, last_update_time=None, exists=None):
+        self.last_update_time = last_update_time
+        self.exists = exists
+
+    def check(self, path: str, entry):
+        if self.exists is not None and (entry is not None) != self.exists:
+            raise FailedPrecondition(f"Document existence precondition failed: {path}")
+        if self.last_update_time is not None and (entry is None or entry[1] != self.last_update_time):
+            raise FailedPrecondition(f"Document was updated concurrently: {path}")
+
+
+class FakeDocumentSnapshot:
+    """Result of DocumentReference.get()"""
+
+    def __init__(self, reference, data: Optional[Dict[str, Any]], update_time=None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    """Reference to a single document in a fake collection"""
+
+    def __init__(self, client, path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def get(self, field_paths: Optional[List[str]] = None) -> FakeDocumentSnapshot:
+        self._client._rpc()
+        with self._client._lock:
+            entry = self._client._docs.get(self.path)
+            data, update_time = entry if entry else (None, None)
+            if data is not None and field_paths is not None:
+                data = {key: data[key] for key in field_paths if key in data}
+            return FakeDocumentSnapshot(self, copy.deepcopy(data), update_time)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> FakeWriteResult:
+        self._client._rpc()
+        with self._client._lock:
+            data = copy.deepcopy(document_data)
+            entry = self._client._docs.get(self.path)
+            if merge and entry is not None:
+                data = _deep_merge(entry[0], data)
+            else:
+                data = _new_document(data)
+            self._client._docs[self.path] = (data, self._client._now())
+            return FakeWriteResult(self._client._docs[self.path][1])
+
+    def create(self, document_data: Dict[str, Any]) -> FakeWriteResult:
+        self._client._rpc()
+        with self._client._lock:
+            if self.path in self._client._docs:
+                raise AlreadyExists(f"Document already exists: {self.path}")
+            self._client._docs[self.path] = (_new_document(copy.deepcopy(document_data)), self._client._now())
+            return FakeWriteResult(self._client._docs[self.path][1])
+
+    def update(self, field_updates: Dict[str, Any], option: Optional[FakeWriteOption] = None) -> FakeWriteResult:
+        self._client._rpc()
+        with self._client._lock:
+            entry = self._client._docs.get(self.path)
+            if option is not None:
+                option.check(self.path, entry)
+            if entry is None:
+                raise NotFound(f"No document to update: {self.path}")
+            data = _apply_update(entry[0], copy.deepcopy(field_updates))
+            self._client._docs[self.path] = (data, self._client._now())
+            return FakeWriteResult(self._client._docs[self.path][1])
+
+    def delete(self):
+        self._client._rpc()
+        with self._client._lock:
+            self._client._docs.pop(self.path, None)
+
+    def collection(self, name: str) -> 'FakeCollectionReference':
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+
+class FakeCollectionReference:
+    """Reference to a fake collection (top-level or nested under a document)"""
+
+    def __init__(self, client, path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, f"{self.path}/{document_id}")
+
+    def _paths(self):
+        prefix = self.path + '/'
+        with self._client._lock:
+            return sorted(
+                p for p in self._client._docs
+                if p.startswith(prefix) and '/' not in p[len(prefix):]
+            )
+
+    def list_documents(self, page_size: Optional[int] = None) -> Iterator[FakeDocumentReference]:
+        paths = self._paths()
+        page_size = page_size or len(paths) or 1
+        for index, path in enumerate(paths):
+            if index % page_size == 0:
+                self._client._rpc()  # One round trip per page
+            yield FakeDocumentReference(self._client, path)
+
+    def stream(self) -> Iterator[FakeDocumentSnapshot]:
+        self._client._rpc()
+        for path in self._paths():
+            with self._client._lock:
+                data, update_time = self._client._docs[path]
+            yield FakeDocumentSnapshot(
+                FakeDocumentReference(self._client, path), copy.deepcopy(data), update_time
+            )
+
+    def where(self, field_path: str, op_string: str, value: Any) -> 'FakeQuery':
+        return FakeQuery(self).where(field_path, op_string, value)
+
+    def order_by(self, field_path: str) -> 'FakeQuery':
+        return FakeQuery(self).order_by(field_path)
+
+
+_COMPARISONS = {
+    '==': lambda a, b: a == b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class FakeQuery:
+    """Filtered, ordered view of a fake collection (single-field filters only)"""
+
+    def __init__(self, collection: FakeCollectionReference, filters=(), order=None, limit=None):
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._order = order
+        self._limit = limit
+
+    def where(self, field_path: str, op_string: str, value: Any) -> 'FakeQuery':
+        return FakeQuery(self._collection, self._filters + ((field_path, _COMPARISONS[op_string], value),),
+                         self._order, self._limit)
+
+    def order_by(self, field_path: str) -> 'FakeQuery':
+        return FakeQuery(self._collection, self._filters, field_path, self._limit)
+
+    def limit(self, count: int) -> 'FakeQuery':
+        return FakeQuery(self._collection, self._filters, self._order, count)
+
+    def stream(self) -> Iterator[FakeDocumentSnapshot]:
+        snapshots = [
+            snap for snap in self._collection.stream()
+            if all(field in snap.to_dict() and compare(snap.to_dict()[field], value)
+                   for field, compare, value in self._filters)
+        ]
+        if self._order is not None:
+            snapshots.sort(key=lambda snap: snap.to_dict().get(self._order))
+        return iter(snapshots[:self._limit] if self._limit is not None else snapshots)
+
+
+class FakeWriteBatch:
+    """Collects writes and applies them atomically on commit()"""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def set(self, reference: FakeDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._writes.append(('merge' if merge else 'set', reference.path, copy.deepcopy(document_data), None))
+
+    def create(self, reference: FakeDocumentReference, document_data: Dict[str, Any]):
+        self._writes.append(('create', reference.path, copy.deepcopy(document_data), None))
+
+    def update(self, reference: FakeDocumentReference, field_updates: Dict[str, Any],
+               option: Optional[FakeWriteOption] = None):
+        self._writes.append(('update', reference.path, copy.deepcopy(field_updates), option))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(('delete', reference.path, None, None))
+
+    def commit(self) -> List[FakeWriteResult]:
+        if len(self._writes) > MAX_BATCH_WRITES:
+            raise ValueError(f"Batch exceeds {MAX_BATCH_WRITES} writes")
+        self._client._rpc()
+        with self._client._lock:
+            docs = self._client._docs
+            # Check every precondition before applying anything (batches are atomic)
+            for kind, path, data, option in self._writes:
+                if option is not None:
+                    option.check(path, docs.get(path))
+                if kind == 'update' and path not in docs:
+                    raise NotFound(f"No document to update: {path}")
+                if kind == 'create' and path in docs:
+                    raise AlreadyExists(f"Document already exists: {path}")
+            now = self._client._now()
+            for kind, path, data, option in self._writes:
+                if kind in ('set', 'create'):
+                    docs[path] = (_new_document(data), now)
+                elif kind == 'merge':
+                    docs[path] = (_deep_merge(docs[path][0], data) if path in docs else _new_document(data), now)
+                elif kind == 'update':
+                    docs[path] = (_apply_update(docs[path][0], data), now)
+                else:
+                    docs.pop(path, None)
+            results = [FakeWriteResult(now) for _ in self._writes]
+        self._writes = []
+        return results
+
+
+class FakeFirestoreClient:
+    """Drop-in stand-in for google.cloud.firestore.Client"""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds to sleep per simulated RPC (0 for none)
+        """
+        self.latency = latency
+        self.rpc_count = 0
+        self._docs: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+        self._last_time = None
+
+    def _rpc(self):
+        with self._lock:
+            self.rpc_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _now(self) -> datetime:
+        # Strictly increasing, so update-time preconditions see every write
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if self._last_time is not None and now <= self._last_time:
+                now = self._last_time + timedelta(microseconds=1)
+            self._last_time = now
+            return now
+
+    def write_option(self, last_update_time=None, exists=None) -> FakeWriteOption:
+        """Precondition for update()/delete(), like Client.write_option()"""
+        return FakeWriteOption(last_update_time=last_update_time, exists=exists)
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def get_all(self, references) -> Iterator[FakeDocumentSnapshot]:
+        """Multi-document read: one round trip for all references"""
+        references = list(references)
+        self._rpc()
+        with self._lock:
+            entries = [(ref, self._docs.get(ref.path)) for ref in references]
+        for ref, entry in entries:
+            data, update_time = entry if entry else (None, None)
+            yield FakeDocumentSnapshot(ref, copy.deepcopy(data), update_time)
@@ -0,0 +1,342 @@
+"""
+Firestore trip store.
+
+Wraps a Firestore client (real, emulator or the in-process fake from
+`src.storage.fake_firestore`) behind the TripStore interface.
+
+Checklist, rejected-item and idea-saved edits on shared trips are written as
+op records in a `trips/{code}/ops` subcollection (see src.storage.crdt) and
+merged into the document on every read.
+
+Emulator usage:
+    export FIRESTORE_EMULATOR_HOST=localhost:8080
+    store = FirestoreTripStore.for_emulator(project='demo-disney')
+"""
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config.constants import (
+    CRDT_COMPACT_MIN_AGE, FIRESTORE_BATCH_LIMIT, VERSION_CONFLICT_RETRIES
+)
+from src.storage.base import TripStore
+from src.storage.crdt import TripCRDT, ts_wall
+from src.utils.metrics import STORAGE_LATENCY, timed
+from src.utils.tracing import traced
+from src.storage.versioning import (
+    VERSION_FIELD, DocVersion, VersionConflict, merge_fields, version_of
+)
+
+
+
+class _FallbackErrors:
+    """Stand-ins for google.api_core.exceptions when google-cloud is not installed"""
+
+    class NotFound(Exception):
+        """Raised when updating a document that does not exist"""
+
+    class AlreadyExists(Exception):
+        """Raised when creating a document that already exists"""
+
+    class FailedPrecondition(Exception):
+        """Raised when a write's last-update-time precondition does not hold"""
+
+
+@lru_cache(maxsize=1)
+def firestore_errors():
+    """
+    Module holding NotFound, AlreadyExists and FailedPrecondition
+
+    google.api_core.exceptions pulls in grpc, so it is imported on first
+    use rather than when the app starts.
+    """
+    try:
+        from google.api_core import exceptions
+        return exceptions
+    except ImportError:
+        return _FallbackErrors
+
+
+class _FallbackIncrement:
+    """Stand-in for google.cloud.firestore.Increment when google-cloud is not installed"""
+
+    def __init__(self, value: int):
+        self.value = value
+
+
+@lru_cache(maxsize=1)
+def _increment_type():
+    try:
+        from google.cloud.firestore import Increment
+        return Increment
+    except ImportError:
+        return _FallbackIncrement
+
+
+def increment(value: int = 1):
+    """Server-side increment of a numeric field (firestore.Increment)"""
+    return _increment_type()(value)
+
+
+def __getattr__(name: str):
+    # `from src.storage.firestore import NotFound` keeps working, lazily
+    if name in ('NotFound', 'AlreadyExists', 'FailedPrecondition'):
+        return getattr(firestore_errors(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+TRIPS_COLLECTION = 'trips'
+OPS_COLLECTION = 'ops'
+
+# Fields whose stored value is only a base that pending ops are merged onto
+_OP_MERGED_FIELDS = frozenset({'checklist', 'rejected_items', 'ideas'})
+
+
+class FirestoreTripStore(TripStore):
+    """Firestore backend, one document per trip in the `trips` collection"""
+
+    name = "firestore"
+
+    def __init__(self, db, collection: str = TRIPS_COLLECTION):
+        """
+        Args:
+            db: Firestore client (google.cloud.firestore.Client or FakeFirestoreClient)
+            collection: Collection holding trip documents
+        """
+        self.db = db
+        self.collection = collection
+
+    @classmethod
+    def for_emulator(cls, project: str = 'demo-disney', collection: str = TRIPS_COLLECTION):
+        """Create a store against the Firestore emulator (FIRESTORE_EMULATOR_HOST must be set)"""
+        if not os.getenv('FIRESTORE_EMULATOR_HOST'):
+            raise RuntimeError("FIRESTORE_EMULATOR_HOST is not set")
+        from google.cloud import firestore as gcloud_firestore
+        return cls(gcloud_firestore.Client(project=project), collection)
+
+    def _doc(self, trip_code: str):
+        return self.db.collection(self.collection).document(trip_code)
+
+    def fetch(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        """Read the raw (encoded) document in a single round trip"""
+        doc = self._doc(trip_code).get()
+        return doc.to_dict() if doc.exists else None
+
+    @traced('firestore.read')
+    @timed(STORAGE_LATENCY, 'firestore.read')
+    def read_merged(self, trip_code: str, fields: Optional[Sequence[str]] = None
+                    ) -> Optional[Tuple[Dict[str, Any], Optional[TripCRDT], DocVersion]]:
+        """
+        Read the encoded document (or a projection of it) with pending ops merged in
+
+        Returns:
+            (document, replica, version), or None if the trip does not exist.
+            The replica is None when no op-merged field was requested.
+        """
+        merged = fields is None or not _OP_MERGED_FIELDS.isdisjoint(fields)
+        ref = self._doc(trip_code)
+        if fields is None:
+            doc = ref.get()
+        else:
+            # Field-path projection: only the requested fields cross the wire
+            extra = [VERSION_FIELD] + (['crdt'] if merged else [])
+            doc = ref.get(field_paths=list(fields) + extra)
+        if not doc.exists:
+            return None
+
+        document = doc.to_dict() or {}
+        version = version_of(document, doc.update_time)
+        if not merged:
+            return document, None, version
+        replica = TripCRDT.from_document(document)
+        replica.apply_all(self.load_ops(trip_code))
+        return replica.materialize(document), replica, version
+
+    def load(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        result = self.read_merged(trip_code)
+        return self.decode(result[0]) if result is not None else None
+
+    def load_fields(self, trip_code: str, fields) -> Optional[Dict[str, Any]]:
+        result = self.read_merged(trip_code, fields)
+        return self.decode(result[0]) if result is not None else None
+
+    def save(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
+        # A replaced document starts a fresh op history
+        self._doc(trip_code).set(self.encode(trip_data))
+        self.clear_ops(trip_code)
+        return True
+
+    def exists(self, trip_code: str) -> bool:
+        return self._doc(trip_code).get().exists
+
+    def update(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        # Firestore's update() only touches the given top-level fields and
+        # fails if the document is missing, so no read is needed first
+        try:
+            self._doc(trip_code).update(self.encode(fields))
+            return True
+        except firestore_errors().NotFound:
+            return False
+
+    def list_trips(self, limit: Optional[int] = None) -> List[str]:
+        codes = []
+        for ref in self.db.collection(self.collection).list_documents(page_size=500):
+            codes.append(ref.id)
+        codes.sort()
+        return codes[:limit] if limit is not None else codes
+
+    def delete(self, trip_code: str) -> bool:
+        ref = self._doc(trip_code)
+        existed = ref.get().exists
+        self.clear_ops(trip_code)
+        ref.delete()
+        return existed
+
+    # ------------------------------------------------------------------
+    # Op log
+    # ------------------------------------------------------------------
+    def _ops(self, trip_code: str):
+        return self._doc(trip_code).collection(OPS_COLLECTION)
+
+    @traced('firestore.load_ops')
+    @timed(STORAGE_LATENCY, 'firestore.load_ops')
+    def load_ops(self, trip_code: str, after: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Ops in timestamp order, optionally only those newer than `after`"""
+        query = self._ops(trip_code)
+        if after is not None:
+            query = query.where('ts', '>', after)
+        return [snap.to_dict() for snap in query.order_by('ts').stream()]
+
+    @traced('firestore.write')
+    @timed(STORAGE_LATENCY, 'firestore.write')
+    def write_versioned(self, trip_code: str, fields: Dict[str, Any],
+                        expected: Optional[DocVersion], ops: Sequence[Dict[str, Any]] = (),
+                        loose: Optional[Dict[str, Any]] = None,
+                        resolve=merge_fields,
+                        retries: int = VERSION_CONFLICT_RETRIES
+                        ) -> Tuple[DocVersion, Dict[str, Any]]:
+        """
+        Write fields conditionally on the version last seen, plus ops, in one batch
+
+        Nothing is read up front. If another writer got in first, only the
+        conflicting fields are read back, merged with `resolve` and retried.
+
+        Args:
+            trip_code: Unique trip identifier
+            fields: Application-format fields guarded by the precondition
+            expected: Version the caller last saw; None creates the document
+            ops: CRDT op records (they commute, so they need no precondition)
+            loose: Derived fields (e.g. summary counts) written without a
+                   precondition when `fields` is empty
+            resolve: merge(local, remote) on conflict; None keeps the local values
+            retries: Merge-and-retry attempts before giving up
+
+        Returns:
+            (version after the write, fields as written after any merges).
+            A loose-only write returns `expected` unchanged.
+
+        Raises:
+            VersionConflict: Every retry lost to a concurrent writer
+        """
+        ref = self._doc(trip_code)
+        ops_ref = self._ops(trip_code)
+        ops = list(ops)
+        # Ops beyond one batch go out first; applying them early is harmless
+        while len(ops) > FIRESTORE_BATCH_LIMIT - 1:
+            chunk, ops = ops[:FIRESTORE_BATCH_LIMIT], ops[FIRESTORE_BATCH_LIMIT:]
+            batch = self.db.batch()
+            for op in chunk:
+                batch.set(ops_ref.document(op['id']), op)
+            batch.commit()
+
+        for attempt in range(retries + 1):
+            batch = self.db.batch()
+            for op in ops:
+                batch.set(ops_ref.document(op['id']), op)
+
+            conditional = expected is None or bool(fields)
+            if expected is None:
+                document = self.encode({**(loose or {}), **fields})
+                document[VERSION_FIELD] = 1
+                batch.create(ref, document)
+            elif fields:
+                update = self.encode({**(loose or {}), **fields})
+                update[VERSION_FIELD] = expected.version + 1
+                batch.update(ref, update, option=self.db.write_option(last_update_time=expected.update_time))
+            elif loose:
+                batch.set(ref, self.encode(loose), merge=True)
+
+            try:
+                results = batch.commit() if len(batch) else []
+            except (firestore_errors().FailedPrecondition, firestore_errors().AlreadyExists):
+                if attempt == retries:
+                    break
+                # Fast merge path: read back only what we are writing
+                snap = ref.get(field_paths=list(fields) + [VERSION_FIELD])
+                if not snap.exists:
+                    expected = None
+                    continue
+                remote = snap.to_dict() or {}
+                if resolve is not None:
+                    fields = resolve(fields, self.decode({k: v for k, v in remote.items() if k in fields}))
+                expected = version_of(remote, snap.update_time)
+                continue
+
+            if not conditional:
+                return expected, fields
+            version = (expected.version if expected else 0) + 1
+            return DocVersion(version, results[-1].update_time), fields
+
+        raise VersionConflict(f"Trip '{trip_code}' kept changing during save")
+
+    def clear_ops(self, trip_code: str) -> int:
+        """Delete the whole op log; returns the number of ops deleted"""
+        return self._delete_refs(list(self._ops(trip_code).list_documents()))
+
+    @traced('firestore.compact_ops')
+    @timed(STORAGE_LATENCY, 'firestore.compact_ops')
+    def compact_ops(self, trip_code: str, min_age: float = CRDT_COMPACT_MIN_AGE) -> int:
+        """
+        Fold the op log into the trip document
+
+        The merged checklist, ideas and rejected set are written back together
+        with the CRDT metadata, then ops older than `min_age` seconds are
+        deleted. Younger ops stay in the log, so a concurrent compaction that
+        missed them cannot drop them, and merging them twice is harmless.
+        The write-back is conditional on the document being unchanged since
+        it was read; if someone saved in between, compaction is skipped.
+
+        Returns:
+            Number of ops deleted
+        """
+        doc = self._doc(trip_code).get()
+        if not doc.exists:
+            return 0
+        document = doc.to_dict() or {}
+        ops = self.load_ops(trip_code)
+        if not ops:
+            return 0
+
+        replica = TripCRDT.from_document(document)
+        replica.apply_all(ops)
+        merged = replica.materialize({
+            key: document.get(key) or [] for key in ('checklist', 'rejected_items', 'ideas')
+        })
+        merged['crdt'] = replica.to_state()
+        merged[VERSION_FIELD] = version_of(document, None).version + 1
+        try:
+            self._doc(trip_code).update(merged, option=self.db.write_option(last_update_time=doc.update_time))
+        except firestore_errors().FailedPrecondition:
+            return 0
+
+        cutoff = time.time() - min_age
+        folded = [self._ops(trip_code).document(op['id']) for op in ops if ts_wall(op['ts']) < cutoff]
+        return self._delete_refs(folded)
+
+    def _delete_refs(self, refs) -> int:
+        for start in range(0, len(refs), FIRESTORE_BATCH_LIMIT):
+            batch = self.db.batch()
+            for ref in refs[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.delete(ref)
+            batch.commit()
+        return len(refs)
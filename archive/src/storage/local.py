@@ -0,0 +1,98 @@
+"""
+Local-file trip store.
+
+One JSON document per trip under a directory. Writes go to a temp file that is
+atomically renamed over the old document, so a crash never leaves a half-written trip.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, unquote
+
+from src.config.constants import DATA_DIR
+from src.storage.base import TripStore
+
+
+def trip_file_name(trip_code: str) -> str:
+    """
+    File-system-safe name for a trip code, reversible with trip_code_from_file_name()
+
+    Trip codes are user-entered, so every character outside [A-Za-z0-9_.-~]
+    is percent-encoded. Nothing can escape the directory, and distinct
+    codes never share a file.
+    """
+    name = quote(trip_code, safe='')
+    # '.' and '..' are the only all-unreserved names that mean something to the OS
+    return name.replace('.', '%2E') if name in ('.', '..') else name
+
+
+def trip_code_from_file_name(name: str) -> str:
+    return unquote(name)
+
+
+class LocalFileTripStore(TripStore):
+    """Directory-of-JSON-files backend for single-host deployments"""
+
+    name = "local"
+
+    def __init__(self, root: Path = DATA_DIR / 'trips', fsync: bool = True):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+    def _path(self, trip_code: str) -> Path:
+        return self.root / f"{trip_file_name(trip_code)}.json"
+
+    def _read(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        path = self._path(trip_code)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, trip_code: str, document: Dict[str, Any]):
+        path = self._path(trip_code)
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(document, f, separators=(',', ':'), ensure_ascii=False)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        document = self._read(trip_code)
+        return self.decode(document) if document is not None else None
+
+    def save(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
+        document = self.encode(trip_data)
+        with self._lock:
+            self._write(trip_code, document)
+        return True
+
+    def exists(self, trip_code: str) -> bool:
+        return self._path(trip_code).exists()
+
+    def update(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        encoded = self.encode(fields)
+        with self._lock:
+            document = self._read(trip_code)
+            if document is None:
+                return False
+            document.update(encoded)
+            self._write(trip_code, document)
+        return True
+
+    def list_trips(self, limit: Optional[int] = None) -> List[str]:
+        codes = sorted(trip_code_from_file_name(p.stem) for p in self.root.glob('*.json'))
+        return codes[:limit] if limit is not None else codes
+
+    def delete(self, trip_code: str) -> bool:
+        path = self._path(trip_code)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
@@ -0,0 +1,55 @@
+"""
+In-memory trip store.
+
+Documents are kept in encoded (JSON-compatible) form and copied on the way in
+and out, so callers can't mutate stored state by accident and benchmark numbers
+include the same serialization work as the real backends.
+"""
+import copy
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.storage.base import TripStore
+
+
+class InMemoryTripStore(TripStore):
+    """Process-local dictionary backend (tests, benchmarks, offline mode)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            doc = self._docs.get(trip_code)
+            doc = copy.deepcopy(doc) if doc is not None else None
+        return self.decode(doc) if doc is not None else None
+
+    def save(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
+        doc = self.encode(trip_data)
+        with self._lock:
+            self._docs[trip_code] = copy.deepcopy(doc)
+        return True
+
+    def exists(self, trip_code: str) -> bool:
+        with self._lock:
+            return trip_code in self._docs
+
+    def update(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        encoded = copy.deepcopy(self.encode(fields))
+        with self._lock:
+            if trip_code not in self._docs:
+                return False
+            self._docs[trip_code].update(encoded)
+        return True
+
+    def list_trips(self, limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            codes = sorted(self._docs)
+        return codes[:limit] if limit is not None else codes
+
+    def delete(self, trip_code: str) -> bool:
+        with self._lock:
+            return self._docs.pop(trip_code, None) is not None
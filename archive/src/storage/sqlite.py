@@ -0,0 +1,119 @@
+"""
+SQLite trip store.
+
+Single-file relational backend: one row per trip holding the encoded document
+as JSON text. WAL mode lets concurrent Streamlit sessions read while one writes.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.config.constants import DATA_DIR
+from src.storage.base import TripStore
+from src.storage.codec import pack_document, unpack_document
+
+
+class SQLiteTripStore(TripStore):
+    """SQLite backend (use ':memory:' for an ephemeral database)"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = str(DATA_DIR / 'trips.sqlite3'), compact: bool = False):
+        """
+        Args:
+            path: Database file, or ':memory:'
+            compact: Store documents in the codec's compact wire format (zlib BLOBs)
+                     instead of JSON text. Both formats are readable either way.
+        """
+        self.compact = compact
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS trips ("
+            " code TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+
+    def _dumps(self, document: Dict[str, Any]):
+        if self.compact:
+            return pack_document(document)
+        return json.dumps(document, separators=(',', ':'), ensure_ascii=False)
+
+    @staticmethod
+    def _loads(payload) -> Dict[str, Any]:
+        if isinstance(payload, bytes):
+            return unpack_document(payload)
+        return json.loads(payload)
+
+    def load(self, trip_code: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM trips WHERE code = ?", (trip_code,)
+            ).fetchone()
+        return self.decode(self._loads(row[0])) if row else None
+
+    def save(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
+        payload = self._dumps(self.encode(trip_data))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO trips (code, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(code) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (trip_code, payload, time.time())
+            )
+        return True
+
+    def exists(self, trip_code: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM trips WHERE code = ?", (trip_code,)
+            ).fetchone()
+        return row is not None
+
+    def update(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        encoded = self.encode(fields)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM trips WHERE code = ?", (trip_code,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                document = self._loads(row[0])
+                document.update(encoded)
+                self._conn.execute(
+                    "UPDATE trips SET data = ?, updated_at = ? WHERE code = ?",
+                    (self._dumps(document), time.time(), trip_code)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def list_trips(self, limit: Optional[int] = None) -> List[str]:
+        query = "SELECT code FROM trips ORDER BY code"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def delete(self, trip_code: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM trips WHERE code = ?", (trip_code,))
+        return cursor.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
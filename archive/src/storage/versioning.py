@@ -0,0 +1,65 @@
+"""
+Optimistic concurrency for trip documents.
+
+Every conditional write carries a monotonically increasing `version` field
+and a precondition on the document's last update time, so a stale session
+can never silently overwrite newer data, and saving needs no read first.
+
+When the precondition fails, the writer reads only the fields it is writing,
+merges them with the remote values (MERGE_POLICIES) and retries against the
+new update time. A conflict costs one projected read, not a full reload.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src.config.constants import MAX_IDEAS
+from src.models.trip_data import trim_ideas
+
+VERSION_FIELD = 'version'
+
+
+class DocVersion(NamedTuple):
+    """What a session last saw of a trip document"""
+    version: int
+    update_time: Any    # Firestore timestamp (None for documents not yet written)
+
+
+class VersionConflict(Exception):
+    """A conditional write kept losing to concurrent writers"""
+
+
+def version_of(document: Optional[Dict[str, Any]], update_time) -> DocVersion:
+    return DocVersion(int((document or {}).get(VERSION_FIELD) or 0), update_time)
+
+
+# ============================================================================
+# MERGE POLICIES
+# ============================================================================
+def _merge_by_id(local: List[Any], remote: List[Any]) -> List[Any]:
+    """Union of two model lists by id: remote order, then local-only entries"""
+    merged = list(remote or [])
+    seen = {item.id for item in merged}
+    merged.extend(item for item in local or [] if item.id not in seen)
+    return merged
+
+
+def _merge_ideas(local: List[Any], remote: List[Any]) -> List[Any]:
+    return trim_ideas(_merge_by_id(local, remote), MAX_IDEAS)
+
+
+# field -> merge(local value, remote value). Fields not listed keep the local
+# value: they are explicit user input (trip details) or per-session state
+# (pending suggestions). Checklist, rejections and saved flags never conflict
+# here because they are merged through CRDT ops (see src.storage.crdt).
+MERGE_POLICIES: Dict[str, Callable[[Any, Any], Any]] = {
+    'ideas': _merge_ideas,
+}
+
+
+def merge_fields(local: Dict[str, Any], remote: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve a write conflict field by field (application-format values)"""
+    merged = dict(local)
+    for field, value in local.items():
+        policy = MERGE_POLICIES.get(field)
+        if policy is not None and field in remote:
+            merged[field] = policy(value, remote[field])
+    return merged
@@ -0,0 +1,49 @@
+"""
+Chat message rendering.
+
+The chat tab shows only the newest CHAT_WINDOW messages. "Load earlier"
+widens the window, and older log pages are read only when the window
+needs them. A rerun therefore draws at most the window, however long the
+conversation is.
+
+Chat messages never change once written, so each one's display markdown
+is prepared once per process and cached by message id. Preparing it means
+escaping the `$` signs in ticket and dining prices, which Streamlit would
+otherwise typeset as LaTeX.
+"""
+import re
+from typing import Any, Dict, Sequence
+
+import streamlit as st
+
+from src.config.constants import CHAT_RENDER_CACHE_SIZE
+from src.utils.cache import TTLCache
+from src.utils.metrics import gauge
+
+_DOLLAR = re.compile(r'(?<!\\)\$')
+
+# Entries never go stale (messages are immutable); the LRU bound is what evicts
+_rendered = TTLCache(default_ttl=float('inf'), max_entries=CHAT_RENDER_CACHE_SIZE)
+
+gauge('chat_render_cache_hit_ratio', "Chat messages drawn from the markdown cache",
+      lambda: _rendered.hit_ratio)
+
+
+def message_markdown(message: Dict[str, Any]) -> str:
+    """Display markdown for a chat message (cached by message id)"""
+    message_id = message.get('id')
+    if message_id is not None:
+        found, markdown = _rendered.lookup(message_id)
+        if found:
+            return markdown
+    markdown = _DOLLAR.sub(r'\\$', message.get('content') or '').strip()
+    if message_id is not None:
+        _rendered.set(message_id, markdown)
+    return markdown
+
+
+def render_messages(messages: Sequence[Dict[str, Any]]):
+    """Draw messages as chat bubbles, oldest first"""
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message_markdown(message))
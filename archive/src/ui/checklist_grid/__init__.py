@@ -0,0 +1,78 @@
+"""
+Checklist grid custom component.
+
+The filtered checklist goes to the browser as one compact payload: a list
+of [id, text, category, priority, completed, deadline] rows plus a content
+hash (`rev`). The frontend (frontend/index.html, plain JS, no build
+step) renders the cards itself. On each render it diffs the rows by item
+id, so only changed cards touch the DOM, and an unchanged `rev` is skipped
+entirely. A rerun adds one element however long the checklist is.
+
+The grid shows one page at a time. The rows of the following page ride along
+(`next_items`), so the frontend's Next button flips at once. Pages already
+seen are kept in the browser for Prev. Either way the page change is also
+sent back as an event, and the server answers with the authoritative page.
+
+Clicks are batched on the client and sent back as one value:
+    {'batch': '<mount>-<n>', 'events': [{'type': 'toggle', 'id': ..., 'completed': True},
+                                        {'type': 'delete', 'id': ...},
+                                        {'type': 'page', 'page': 2}]}
+A component keeps its last value across reruns, so grid_events() returns
+each batch once.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = Path(__file__).parent / 'frontend'
+
+_component = components.declare_component('checklist_grid', path=str(FRONTEND_DIR))
+
+
+def grid_payload(items: Sequence[Any]) -> List[list]:
+    """Compact rows for the frontend, in display order"""
+    return [
+        [item.id, item.text, item.category, item.priority, bool(item.completed), str(item.deadline or '')]
+        for item in items
+    ]
+
+
+def grid_events(key: str) -> List[Dict[str, Any]]:
+    """
+    Events from the latest batch the browser sent, or [] if already handled
+
+    Reads the component's value from session state, so it can run before
+    the grid is drawn and the same run renders the updated checklist.
+    """
+    value = st.session_state.get(key)
+    if not isinstance(value, dict) or not value.get('batch'):
+        return []
+    seen_key = f"{key}_batch"
+    if st.session_state.get(seen_key) == value['batch']:
+        return []
+    st.session_state[seen_key] = value['batch']
+    return list(value.get('events') or [])
+
+
+def checklist_grid(items: Sequence[Any], key: str, next_items: Sequence[Any] = (),
+                   page: int = 0, pages: int = 1, total: Optional[int] = None, columns: int = 3):
+    """
+    Draw one page of the grid
+
+    Args:
+        items: ChecklistItem-like objects on this page
+        next_items: Items on the following page (prefetched, not drawn)
+        page: Zero-based page number of `items`, out of `pages`
+        total: Items across all pages (default: len(items))
+    """
+    rows = grid_payload(items)
+    next_rows = grid_payload(next_items)
+    total = len(items) if total is None else total
+    rev = hashlib.sha1(json.dumps([rows, next_rows, page, pages, total], ensure_ascii=False)
+                       .encode('utf-8')).hexdigest()[:16]
+    _component(items=rows, next_items=next_rows, page=page, pages=pages, total=total,
+               rev=rev, columns=columns, key=key, default=None)
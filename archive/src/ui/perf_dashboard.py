@@ -0,0 +1,116 @@
+"""
+Performance dashboard (admin-only tab).
+
+Reads the in-process telemetry: latency histograms from src.utils.metrics,
+event sampling and rate-limiter state from src.utils.events, session
+sizes from src.utils.sessions and byte budgets from src.utils.memory.
+Nothing is collected for the dashboard itself. Percentiles over the chosen window are merged from the
+histograms' time slots, and session sizes are measured, only while this
+tab is rendering.
+"""
+from typing import Dict, List, Optional
+
+import streamlit as st
+
+from src.config.constants import (
+    PERF_DASHBOARD_REFRESH, PROCESS_MEMORY_BUDGET, SESSION_ACTIVE_WINDOW, SESSION_MEMORY_BUDGET
+)
+from src.utils.events import event_stats
+from src.utils.memory import EVICTIONS, session_budget, session_sizes
+from src.utils.metrics import LLM_LATENCY, REGISTRY, STORAGE_LATENCY, Histogram
+from src.utils.sessions import session_memory
+from src.utils.watchdog import RERUN_SECONDS, SLOW_RERUNS
+
+WINDOWS = {
+    "Last minute": 60.0,
+    "Last 5 minutes": 300.0,
+    "Since start": None,
+}
+
+
+def _latency_rows(family: Histogram, window: Optional[float]) -> List[Dict]:
+    rows = []
+    for labels, child in family.items():
+        histogram = child.window(window)
+        if not histogram.count:
+            continue
+        rows.append(dict(
+            labels,
+            calls=histogram.count,
+            p50_ms=round(histogram.percentile(50) * 1000, 1),
+            p95_ms=round(histogram.percentile(95) * 1000, 1),
+            p99_ms=round(histogram.percentile(99) * 1000, 1),
+            max_ms=round((histogram.max or 0.0) * 1000, 1),
+        ))
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+
+def _render_panels(window: Optional[float]):
+    memory = session_memory()
+    reruns = RERUN_SECONDS.labels().window(window)
+    slow = SLOW_RERUNS.labels().value
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Active sessions", len(memory), help=f"A rerun in the last {SESSION_ACTIVE_WINDOW:.0f} s")
+    col2.metric("Reruns", reruns.count)
+    col3.metric("Rerun p50 / p95", f"{reruns.percentile(50) * 1000:.0f} / {reruns.percentile(95) * 1000:.0f} ms")
+    col4.metric("Slow reruns (all time)", f"{slow:.0f}")
+
+    st.subheader("🤖 Agent methods")
+    rows = _latency_rows(LLM_LATENCY, window)
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No LLM calls in this window.")
+
+    st.subheader("💾 Storage operations")
+    rows = _latency_rows(STORAGE_LATENCY, window)
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No storage operations in this window.")
+
+    st.subheader("🎯 Cache hit ratios")
+    ratios = [(family.name, child.value) for family in list(REGISTRY.values())
+              if family.kind == 'gauge' and family.name.endswith('hit_ratio')
+              for _, child in family.items()]
+    for col, (name, value) in zip(st.columns(max(1, len(ratios))), ratios):
+        col.metric(name.replace('_hit_ratio', '').replace('_', ' '), f"{value:.0%}")
+
+    st.subheader("🚦 Event sampling & rate limits")
+    st.dataframe(
+        [dict(event=name, **stats) for name, stats in event_stats().items()],
+        use_container_width=True, hide_index=True,
+    )
+
+    st.subheader("🧠 Session memory")
+    measured = {session_id[:8]: size for session_id, size in session_sizes().items()}
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Measured total", f"{sum(measured.values()) / 1024 ** 2:,.1f} MB",
+                help=f"Budget {PROCESS_MEMORY_BUDGET / 1024 ** 2:,.0f} MB across active sessions")
+    col2.metric("Per-session budget", f"{session_budget() / 1024 ** 2:,.1f} MB",
+                help=f"{SESSION_MEMORY_BUDGET / 1024 ** 2:,.0f} MB until the process is over its budget")
+    col3.metric("Evictions", f"{sum(child.value for _, child in EVICTIONS.items()):.0f}",
+                help=", ".join(f"{labels['kind']}: {child.value:.0f}" for labels, child in EVICTIONS.items()))
+    if memory:
+        for row in memory:
+            row['measured_bytes'] = measured.get(row['session'])
+        st.dataframe(memory, use_container_width=True, hide_index=True)
+        st.caption(f"Current total across active sessions: {sum(row['bytes'] for row in memory) / 1024:,.0f} KB "
+                   "(measured sizes are from each session's last budget check)")
+    else:
+        st.caption("No active sessions.")
+
+
+def render_perf_dashboard():
+    """Render the dashboard; callers check is_admin() first"""
+    st.header("📊 Performance")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        label = st.radio("Window", list(WINDOWS), horizontal=True, key="perf_window")
+    with col2:
+        live = st.toggle("Auto-refresh", key="perf_auto_refresh",
+                         help=f"Refresh every {PERF_DASHBOARD_REFRESH:.0f} s")
+
+    # Only the panels refresh on the timer, not the whole script
+    st.fragment(_render_panels, run_every=PERF_DASHBOARD_REFRESH if live else None)(WINDOWS[label])
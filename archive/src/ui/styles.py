@@ -2,32 +2,33 @@
 Disney Trip Planning Agent - Royal Princess Theme
 Elegant, magical design fit for a princess family
 Built from scratch with sophisticated aesthetics
-"""
-
-
-def apply_custom_styles() -> str:
-    """
-    Returns elegant princess-themed CSS styling with magical touches.
 
-    Design Philosophy:
-    - Royal color palette: Lavenders, rose golds, soft pinks, pearls
-    - Elegant typography with Playfair Display
-    - Magical effects: Gradients, sparkles, glass morphism
-    - Sophisticated yet warm and inviting
-
-    Returns:
-        str: Complete CSS within <style> tags
-    """
-    return """
-<style>
+The stylesheet is compiled once per process: minified and versioned by a
+hash of its content. app.py serves it as a static file
+(static/theme.<hash>.css, with server.enableStaticServing) and falls back to
+a single inline <style>. Fonts load through their own <link> tags, not a CSS
+@import, so they never hold up the stylesheet.
+"""
+import hashlib
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+FONTS_URL = ("https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;500;600;700;800;900"
+             "&family=Cormorant+Garamond:wght@300;400;500;600;700"
+             "&family=Montserrat:wght@300;400;500;600;700&display=swap")
+
+# Royal color palette: Lavenders, rose golds, soft pinks, pearls
+# Elegant typography with Playfair Display
+# Magical effects: Gradients, sparkles, glass morphism
+THEME_CSS = """
     /* ============================================================================
        ROYAL PRINCESS THEME - DISNEY MAGIC
        Elegant, sophisticated design for a princess family
     ============================================================================ */
 
-    /* Import elegant fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;500;600;700;800;900&family=Cormorant+Garamond:wght@300;400;500;600;700&family=Montserrat:wght@300;400;500;600;700&display=swap');
-
     /* ============================================================================
        ROOT RESET
     ============================================================================ */
@@ -875,5 +876,92 @@ def apply_custom_styles() -> str:
         50% { transform: translateY(-10px); }
     }
 
-</style>
 """
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+class Stylesheet(NamedTuple):
+    css: str          # Minified CSS
+    version: str      # Content hash (first 12 hex digits of SHA-256)
+
+    @property
+    def filename(self) -> str:
+        return f"theme.{self.version}.css"
+
+
+_STRING_OR_COMMENT = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.S)
+_TIGHT = re.compile(r"\s*([{};,>])\s*")
+
+
+def _squeeze(css: str) -> str:
+    css = re.sub(r"\s+", " ", css)
+    css = _TIGHT.sub(r"\1", css)
+    return re.sub(r":\s+", ":", css).replace(";}", "}")
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and redundant whitespace; quoted strings are left untouched"""
+    out = []
+    position = 0
+    for match in _STRING_OR_COMMENT.finditer(css):
+        out.append(_squeeze(css[position:match.start()]))
+        if match.group(1):
+            out.append(match.group(1))
+        position = match.end()
+    out.append(_squeeze(css[position:]))
+    return "".join(out).strip()
+
+
+@lru_cache(maxsize=1)
+def compiled_stylesheet() -> Stylesheet:
+    """THEME_CSS minified and versioned; built once per process"""
+    css = minify_css(THEME_CSS)
+    return Stylesheet(css, hashlib.sha256(css.encode('utf-8')).hexdigest()[:12])
+
+
+def publish_stylesheet(static_dir: Path) -> str:
+    """
+    Write the compiled stylesheet to `static_dir` (if not already there)
+
+    Older theme.*.css versions are removed.
+
+    Returns:
+        str: File name of the current version
+    """
+    sheet = compiled_stylesheet()
+    static_dir.mkdir(parents=True, exist_ok=True)
+    target = static_dir / sheet.filename
+    if not target.exists():
+        tmp = target.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(sheet.css, encoding='utf-8')
+        os.replace(tmp, target)
+    for old in static_dir.glob('theme.*.css'):
+        if old.name != sheet.filename:
+            old.unlink(missing_ok=True)
+    return sheet.filename
+
+
+def font_links() -> str:
+    return (
+        '<link rel="preconnect" href="https://fonts.googleapis.com">'
+        '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+        f'<link rel="stylesheet" href="{FONTS_URL}">'
+    )
+
+
+def apply_custom_styles(static_url: Optional[str] = None) -> str:
+    """
+    Returns the HTML that installs the princess theme.
+
+    Args:
+        static_url: URL of the published stylesheet (see publish_stylesheet);
+                    without one the minified CSS is inlined in <style> tags
+
+    Returns:
+        str: Font <link> tags plus a stylesheet <link> or <style> block
+    """
+    if static_url:
+        return f'{font_links()}<link rel="stylesheet" href="{static_url}">'
+    return f'{font_links()}<style>{compiled_stylesheet().css}</style>'
@@ -0,0 +1,35 @@
+"""
+Admin access for diagnostic views.
+
+Admins add `?admin=<token>` to the app URL once per session; the token is
+compared with `admin_token` in Streamlit secrets or the DISNEY_ADMIN_TOKEN
+environment variable. With no token configured nobody is an admin.
+"""
+import hmac
+import os
+from typing import Optional
+
+import streamlit as st
+
+from src.config.constants import ADMIN_TOKEN_ENV_VAR
+
+
+def _admin_token() -> Optional[str]:
+    try:
+        if 'admin_token' in st.secrets:
+            return str(st.secrets['admin_token'])
+    except Exception:
+        pass
+    return os.getenv(ADMIN_TOKEN_ENV_VAR)
+
+
+def is_admin() -> bool:
+    """True once this session has presented the admin token"""
+    if st.session_state.get('is_admin'):
+        return True
+    supplied = st.query_params.get('admin')
+    expected = _admin_token()
+    if supplied and expected and hmac.compare_digest(str(supplied), expected):
+        st.session_state.is_admin = True
+        return True
+    return False
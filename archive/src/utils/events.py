@@ -0,0 +1,152 @@
+"""
+Structured event logging for hot paths.
+
+An event type is declared once with a name, a level, typed fields and an
+optional sampling policy:
+
+    TRIP_SAVED = define_event('trip_saved', {'op': str, 'cloud': bool, 'ms': float},
+                              sample_rate=0.1)
+
+and emitted with keyword fields:
+
+    emit(TRIP_SAVED, op=op, cloud=cloud, ms=lambda: (time.perf_counter() - start) * 1000)
+
+emit() checks the level before doing anything else, so a disabled event
+costs one method call and a level lookup. Field values may be zero-argument
+callables; they are only evaluated for events that are actually logged.
+The fields dict rides on the log record and is serialized by the logging
+listener thread (see src.utils.logger), never on the caller's thread.
+
+Sampling, per event type (overridable in EVENT_SAMPLE_RATES / EVENT_RATE_LIMITS):
+    sample_rate: probability an event is kept (recorded on the entry)
+    per_second:  token bucket cap on kept events per second
+Both count what they drop, so totals can be scaled back up.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from src.config.constants import EVENT_RATE_LIMITS, EVENT_SAMPLE_RATES, EVENT_VALIDATE_FIELDS
+from src.utils.logger import configure_logging
+
+event_logger = logging.getLogger('DisneyTripPlanner.events')
+
+
+class EventType:
+    """A named, typed event with its level and sampling policy"""
+
+    __slots__ = ('name', 'level', 'fields', 'sample_rate', 'per_second',
+                 'emitted', 'sampled_out', 'rate_limited', '_tokens', '_refilled', '_lock')
+
+    def __init__(self, name: str, fields: Dict[str, Type], level: int = logging.INFO,
+                 sample_rate: float = 1.0, per_second: Optional[float] = None):
+        self.name = name
+        self.level = level
+        self.fields = fields
+        self.sample_rate = EVENT_SAMPLE_RATES.get(name, sample_rate)
+        self.per_second = EVENT_RATE_LIMITS.get(name, per_second)
+        self.emitted = 0
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._tokens = self.per_second or 0.0
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.per_second, self._tokens + (now - self._refilled) * self.per_second)
+            self._refilled = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def tokens(self) -> Optional[float]:
+        """Tokens the bucket would hold now (None without a rate limit)"""
+        if self.per_second is None:
+            return None
+        elapsed = time.monotonic() - self._refilled
+        return min(self.per_second, self._tokens + elapsed * self.per_second)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'emitted': self.emitted, 'sampled_out': self.sampled_out,
+                'rate_limited': self.rate_limited, 'sample_rate': self.sample_rate,
+                'per_second': self.per_second, 'tokens': self.tokens()}
+
+    def __repr__(self) -> str:
+        return f"EventType({self.name!r})"
+
+
+# name -> EventType, for stats and admin views
+EVENTS: Dict[str, EventType] = {}
+
+
+def define_event(name: str, fields: Dict[str, Type], level: int = logging.INFO,
+                 sample_rate: float = 1.0, per_second: Optional[float] = None) -> EventType:
+    """Declare (or fetch the existing) event type `name`"""
+    event = EVENTS.get(name)
+    if event is None:
+        event = EVENTS[name] = EventType(name, fields, level, sample_rate, per_second)
+    return event
+
+
+def is_enabled(event: EventType) -> bool:
+    """Would an event of this type be logged at the current level?"""
+    configure_logging()
+    return event_logger.isEnabledFor(event.level)
+
+
+def emit(event: EventType, **fields: Any):
+    """
+    Log one event
+
+    Args:
+        event: Event type from define_event()
+        **fields: Declared fields; callables are evaluated only if the event is kept
+    """
+    if not is_enabled(event):
+        return
+    if event.sample_rate < 1.0 and random.random() >= event.sample_rate:
+        event.sampled_out += 1
+        return
+    if event.per_second is not None and not event._take_token():
+        event.rate_limited += 1
+        return
+    event.emitted += 1
+
+    for key, value in fields.items():
+        if callable(value):
+            fields[key] = value()
+    if EVENT_VALIDATE_FIELDS:
+        _validate(event, fields)
+    if event.sample_rate < 1.0:
+        fields['sample_rate'] = event.sample_rate
+    event_logger.log(event.level, event.name, extra={'context': fields, 'event': event.name})
+
+
+def _validate(event: EventType, fields: Dict[str, Any]):
+    for key, value in fields.items():
+        expected = event.fields.get(key)
+        if expected is None:
+            raise ValueError(f"Event '{event.name}' has no field '{key}'")
+        if value is not None and not isinstance(value, expected):
+            raise TypeError(f"Event '{event.name}' field '{key}' expects {expected.__name__}, "
+                            f"got {type(value).__name__}")
+
+
+def event_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-event emitted / sampled-out / rate-limited counts and token-bucket state"""
+    return {name: event.stats() for name, event in EVENTS.items()}
+
+
+# ============================================================================
+# APP EVENTS
+# ============================================================================
+APP_RERUN = define_event('app_rerun', {}, level=logging.DEBUG)
+API_CALL = define_event('api_call', {'api': str, 'endpoint': str, 'params': dict, 'response': str})
+TRIP_SAVED = define_event('trip_saved', {'op': str, 'cloud': bool, 'ms': float}, sample_rate=0.1)
+SECTIONS_LOADED = define_event('sections_loaded', {'sections': list, 'ms': float})
+SHARED_EDITS_MERGED = define_event('shared_edits_merged', {'ops': int}, per_second=1.0)
@@ -7,78 +7,142 @@ Falls back to local storage if Firebase is not configured.
 
 import os
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, NamedTuple, Sequence, Tuple
 import streamlit as st
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    FIREBASE_AVAILABLE = False
-    firebase_admin = None
-    credentials = None
-    firestore = None
+from src.config.constants import (
+    TRIP_CODE_CACHE_TTL, TRIP_CODE_NEGATIVE_TTL, CRDT_COMPACT_OPS, FIREBASE_INIT_TIMEOUT
+)
+from src.storage.crdt import TripCRDT
+from src.storage.firestore import FirestoreTripStore
+from src.storage.versioning import DocVersion, merge_fields
+from src.utils.cache import TTLCache
+from src.utils.metrics import gauge
+from src.utils.tracing import traced, wrap
+
+_SECRET_FIELDS = (
+    'type', 'project_id', 'private_key_id', 'private_key', 'client_email', 'client_id',
+    'auth_uri', 'token_uri', 'auth_provider_x509_cert_url', 'client_x509_cert_url',
+)
+
+
+class SyncedTrip(NamedTuple):
+    """Trip fields read with shared edits merged, and what was read"""
+    data: Dict[str, Any]
+    replica: Optional[TripCRDT]     # None when no collaboratively edited field was read
+    version: DocVersion
+
+
+@lru_cache(maxsize=1)
+def load_firebase_credentials() -> Optional[Dict[str, Any]]:
+    """
+    Service-account credentials from Streamlit secrets or FIREBASE_CREDENTIALS
+
+    Parsed once per process.
+
+    Returns:
+        Credentials dictionary or None if none are configured
+    """
+    firebase_creds = None
+    try:
+        if 'firebase' in st.secrets:
+            # Convert Streamlit secrets to dictionary
+            secrets = st.secrets['firebase']
+            firebase_creds = {key: secrets.get(key) for key in _SECRET_FIELDS}
+            firebase_creds['universe_domain'] = secrets.get('universe_domain', 'googleapis.com')
+            # Verify we have the required fields
+            if not firebase_creds.get('project_id') or not firebase_creds.get('private_key'):
+                firebase_creds = None
+    except Exception as e:
+        print(f"Error reading Streamlit secrets: {e}")
+        firebase_creds = None
+
+    # Fall back to environment variable
+    if not firebase_creds:
+        firebase_creds_json = os.getenv('FIREBASE_CREDENTIALS')
+        if firebase_creds_json:
+            firebase_creds = json.loads(firebase_creds_json)
+    return firebase_creds
 
 
 class FirebaseManager:
     """Manages Firebase Firestore operations for trip data"""
 
-    def __init__(self):
+    def __init__(self, db=None, background: bool = False):
+        """
+        Args:
+            db: Optional pre-built Firestore client (emulator or in-process fake).
+                When omitted, credentials are read from secrets/environment.
+            background: Initialize on a daemon thread; calls that need
+                Firestore wait (at most FIREBASE_INIT_TIMEOUT) for it to finish
+        """
         self.db = None
         self.enabled = False
-        self._initialize()
-
+        self.store = None
+        # trip_code -> exists (bool), shared by every session in this process
+        self.code_cache = TTLCache(default_ttl=TRIP_CODE_CACHE_TTL)
+        # Start-up phase -> seconds, filled in by _initialize
+        self.init_timings: Dict[str, float] = {}
+        self._ready = threading.Event()
+        if db is not None:
+            self.db = db
+            self.enabled = True
+            self._finish_init()
+        elif background:
+            # wrap(): start-up spans nest under whatever span started it
+            threading.Thread(target=wrap(self._initialize), name="firebase-init", daemon=True).start()
+        else:
+            self._initialize()
+
+    def _finish_init(self):
+        if self.db is not None:
+            self.store = FirestoreTripStore(self.db)
+        self._ready.set()
+
+    @traced('firebase.init')
     def _initialize(self):
         """Initialize Firebase if credentials are available"""
-        if not FIREBASE_AVAILABLE:
-            return
+        started = time.perf_counter()
+        phase_start = started
+
+        def mark(phase: str):
+            nonlocal phase_start
+            now = time.perf_counter()
+            self.init_timings[phase] = now - phase_start
+            phase_start = now
 
         try:
+            # Heavy import (grpc, google-cloud) kept off the module import path
+            try:
+                import firebase_admin
+                from firebase_admin import credentials, firestore
+            except ImportError:
+                return
+            finally:
+                mark('import')
+
             # Check if already initialized
             if len(firebase_admin._apps) > 0:
                 self.db = firestore.client()
                 self.enabled = True
+                mark('client')
                 return
 
-            # Try to get credentials from Streamlit secrets
-            firebase_creds = None
-            try:
-                if 'firebase' in st.secrets:
-                    # Convert Streamlit secrets to dictionary
-                    firebase_creds = {
-                        'type': st.secrets['firebase'].get('type'),
-                        'project_id': st.secrets['firebase'].get('project_id'),
-                        'private_key_id': st.secrets['firebase'].get('private_key_id'),
-                        'private_key': st.secrets['firebase'].get('private_key'),
-                        'client_email': st.secrets['firebase'].get('client_email'),
-                        'client_id': st.secrets['firebase'].get('client_id'),
-                        'auth_uri': st.secrets['firebase'].get('auth_uri'),
-                        'token_uri': st.secrets['firebase'].get('token_uri'),
-                        'auth_provider_x509_cert_url': st.secrets['firebase'].get('auth_provider_x509_cert_url'),
-                        'client_x509_cert_url': st.secrets['firebase'].get('client_x509_cert_url'),
-                        'universe_domain': st.secrets['firebase'].get('universe_domain', 'googleapis.com')
-                    }
-                    # Verify we have the required fields
-                    if not firebase_creds.get('project_id') or not firebase_creds.get('private_key'):
-                        firebase_creds = None
-            except Exception as e:
-                print(f"Error reading Streamlit secrets: {e}")
-                firebase_creds = None
-
-            # Fall back to environment variable
-            if not firebase_creds:
-                firebase_creds_json = os.getenv('FIREBASE_CREDENTIALS')
-                if firebase_creds_json:
-                    firebase_creds = json.loads(firebase_creds_json)
+            firebase_creds = load_firebase_credentials()
+            mark('credentials')
 
             # Initialize Firebase if we have credentials
             if firebase_creds:
                 cred = credentials.Certificate(firebase_creds)
                 firebase_admin.initialize_app(cred)
+                mark('initialize_app')
                 self.db = firestore.client()
                 self.enabled = True
-                print("Firebase initialized successfully!")
+                mark('client')
+                print(f"Firebase initialized successfully in {time.perf_counter() - started:.2f}s!")
             else:
                 print("No Firebase credentials found")
         except Exception as e:
@@ -86,9 +150,35 @@ class FirebaseManager:
             import traceback
             traceback.print_exc()
             self.enabled = False
+        finally:
+            self.init_timings['total'] = time.perf_counter() - started
+            self._finish_init()
+
+    def is_ready(self) -> bool:
+        """True once initialization has finished (successfully or not)"""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = FIREBASE_INIT_TIMEOUT) -> bool:
+        """Block until initialization finishes; returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def readiness(self) -> Dict[str, Any]:
+        """Initialization status and start-up timings, for health checks and admin views"""
+        return {
+            'ready': self.is_ready(),
+            'enabled': self.is_ready() and self.enabled and self.db is not None,
+            'timings': dict(self.init_timings),
+        }
 
     def is_enabled(self) -> bool:
-        """Check if Firebase is enabled and configured"""
+        """
+        Check if Firebase is enabled and configured
+
+        Waits for any initialization still running in the background.
+        """
+        if not self.wait_ready():
+            print("Firebase still initializing; continuing without cloud sync")
+            return False
         return self.enabled and self.db is not None
 
     def save_trip(self, trip_code: str, trip_data: Dict[str, Any]) -> bool:
@@ -106,17 +196,34 @@ class FirebaseManager:
             return False
 
         try:
-            # Convert trip_data to JSON-serializable format
-            serializable_data = self._prepare_for_firestore(trip_data)
-
-            # Save to Firestore
-            doc_ref = self.db.collection('trips').document(trip_code)
-            doc_ref.set(serializable_data)
-            return True
+            saved = self.store.save(trip_code, trip_data)
+            if saved:
+                self.code_cache.set(trip_code, True)
+            return saved
         except Exception as e:
             print(f"Error saving to Firebase: {e}")
             return False
 
+    def update_trip(self, trip_code: str, fields: Dict[str, Any]) -> bool:
+        """
+        Overwrite some top-level fields of an existing trip, leaving the rest untouched
+
+        Args:
+            trip_code: Unique trip identifier
+            fields: Fields to write (e.g. only the sections a session has loaded)
+
+        Returns:
+            True if the trip existed and was updated, False otherwise
+        """
+        if not self.is_enabled():
+            return False
+
+        try:
+            return self.store.update(trip_code, fields)
+        except Exception as e:
+            print(f"Error updating Firebase: {e}")
+            return False
+
     def load_trip(self, trip_code: str) -> Optional[Dict[str, Any]]:
         """
         Load trip data from Firebase
@@ -131,105 +238,212 @@ class FirebaseManager:
             return None
 
         try:
-            doc_ref = self.db.collection('trips').document(trip_code)
-            doc = doc_ref.get()
+            data = self.store.load(trip_code)
+            self._remember_code(trip_code, data is not None)
+            return data
+        except Exception as e:
+            print(f"Error loading from Firebase: {e}")
+            return None
+
+    def load_trip_fields(self, trip_code: str, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        Load only some top-level fields of a trip (server-side projection)
 
-            if doc.exists:
-                return self._prepare_from_firestore(doc.to_dict())
+        Args:
+            trip_code: Unique trip identifier
+            fields: Top-level fields to fetch (e.g. ['ideas'])
+
+        Returns:
+            Dictionary with the requested fields that exist, or None if not found
+        """
+        if not self.is_enabled():
             return None
+
+        try:
+            data = self.store.load_fields(trip_code, fields)
+            self._remember_code(trip_code, data is not None)
+            return data
         except Exception as e:
             print(f"Error loading from Firebase: {e}")
             return None
 
-    def trip_exists(self, trip_code: str) -> bool:
+    def load_trip_synced(self, trip_code: str, fields: Sequence[str]) -> Optional[SyncedTrip]:
         """
-        Check if a trip exists in Firebase
+        Load some trip fields with shared edits merged, plus the merged CRDT
+        replica and the document version they were read at
+
+        Compacts the trip's op log when reading it took more than
+        CRDT_COMPACT_OPS ops.
+
+        Returns:
+            SyncedTrip or None if not found
+        """
+        if not self.is_enabled():
+            return None
+
+        try:
+            result = self.store.read_merged(trip_code, fields)
+        except Exception as e:
+            print(f"Error loading from Firebase: {e}")
+            return None
+        self._remember_code(trip_code, result is not None)
+        if result is None:
+            return None
+
+        document, replica, version = result
+        if replica is not None and replica.ops_applied >= CRDT_COMPACT_OPS:
+            self.compact_trip_ops(trip_code)
+        return SyncedTrip(self.store.decode(document), replica, version)
+
+    def write_trip(self, trip_code: str, fields: Dict[str, Any],
+                   expected: Optional[DocVersion], ops: Sequence[Dict[str, Any]] = (),
+                   loose: Optional[Dict[str, Any]] = None,
+                   resolve=merge_fields) -> Optional[Tuple[DocVersion, Dict[str, Any]]]:
+        """
+        Save trip fields and CRDT ops without clobbering newer data
+
+        The write is conditional on the version this session last saw. If
+        someone else saved first, the conflicting fields are merged and the
+        write retried (see FirestoreTripStore.write_versioned).
 
         Args:
             trip_code: Unique trip identifier
+            fields: Plain fields to write
+            expected: Version last seen (None to create a new trip)
+            ops: Op records from src.storage.crdt
+            loose: Derived fields to write unconditionally when `fields` is empty
+            resolve: Conflict merge function; None keeps this session's values
 
         Returns:
-            True if trip exists, False otherwise
+            (new version, fields as written) or None on failure
         """
         if not self.is_enabled():
-            return False
+            return None
 
         try:
-            doc_ref = self.db.collection('trips').document(trip_code)
-            doc = doc_ref.get()
-            return doc.exists
+            result = self.store.write_versioned(trip_code, fields, expected, ops, loose, resolve)
+            self.code_cache.set(trip_code, True)
+            return result
         except Exception as e:
-            print(f"Error checking trip existence: {e}")
-            return False
+            print(f"Error saving to Firebase: {e}")
+            return None
 
-    def _prepare_for_firestore(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def pull_trip_ops(self, trip_code: str, after: Optional[str]) -> List[Dict[str, Any]]:
+        """Fetch ops newer than `after` (all ops when None)"""
+        if not self.is_enabled():
+            return []
+
+        try:
+            return self.store.load_ops(trip_code, after)
+        except Exception as e:
+            print(f"Error reading ops from Firebase: {e}")
+            return []
+
+    def clear_trip_ops(self, trip_code: str) -> int:
+        """Drop a trip's op log (after its document was replaced); returns ops deleted"""
+        if not self.is_enabled():
+            return 0
+
+        try:
+            return self.store.clear_ops(trip_code)
+        except Exception as e:
+            print(f"Error clearing trip ops: {e}")
+            return 0
+
+    def compact_trip_ops(self, trip_code: str) -> int:
+        """Fold a trip's op log into its document; returns ops deleted"""
+        if not self.is_enabled():
+            return 0
+
+        try:
+            return self.store.compact_ops(trip_code)
+        except Exception as e:
+            print(f"Error compacting trip ops: {e}")
+            return 0
+
+    def join_trip(self, trip_code: str, fields: Sequence[str]) -> Optional[SyncedTrip]:
         """
-        Convert data to Firestore-compatible format
-
-        Handles:
-        - Pydantic models -> dictionaries
-        - Sets -> lists
-        - Datetime objects -> ISO strings
-        """
-        from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
-        from datetime import datetime
-
-        serializable = {}
-
-        for key, value in data.items():
-            if value is None:
-                serializable[key] = None
-            elif isinstance(value, TripDetails):
-                serializable[key] = value.model_dump(mode='json')
-            elif isinstance(value, list):
-                # Handle lists of Pydantic models or regular items
-                serializable[key] = [
-                    item.model_dump(mode='json') if hasattr(item, 'model_dump')
-                    else item
-                    for item in value
-                ]
-            elif isinstance(value, set):
-                serializable[key] = list(value)
-            elif isinstance(value, datetime):
-                serializable[key] = value.isoformat()
-            else:
-                serializable[key] = value
+        Load a trip for joining in a single document read
 
-        return serializable
+        Replaces the trip_exists() + load_trip() pair. Codes recently seen
+        as missing are answered from the negative cache without any read.
 
-    def _prepare_from_firestore(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        Args:
+            trip_code: Unique trip identifier
+            fields: Top-level fields to fetch
+
+        Returns:
+            SyncedTrip (its version is what the session's saves build on) or None if not found
         """
-        Convert Firestore data back to application format
+        if not self.is_enabled():
+            return None
 
-        Handles:
-        - Dictionaries -> Pydantic models
-        - Lists -> sets (for rejected_items)
+        found, exists = self.code_cache.lookup(trip_code)
+        if found and not exists:
+            return None
+
+        return self.load_trip_synced(trip_code, fields)
+
+    def trip_exists(self, trip_code: str) -> bool:
         """
-        from src.models.trip_data import TripDetails, ChecklistItem, IdeaSuggestion
+        Check if a trip exists in Firebase
 
-        prepared = {}
+        Args:
+            trip_code: Unique trip identifier
 
-        for key, value in data.items():
-            if key == 'trip_details' and value:
-                prepared[key] = TripDetails(**value)
-            elif key == 'checklist' and value:
-                prepared[key] = [ChecklistItem(**item) for item in value]
-            elif key == 'ideas' and value:
-                prepared[key] = [IdeaSuggestion(**item) for item in value]
-            elif key == 'rejected_items' and value:
-                prepared[key] = set(value)
-            else:
-                prepared[key] = value
+        Returns:
+            True if trip exists, False otherwise
+        """
+        if not self.is_enabled():
+            return False
 
-        return prepared
+        found, exists = self.code_cache.lookup(trip_code)
+        if found:
+            return exists
+
+        try:
+            exists = self.store.exists(trip_code)
+            self._remember_code(trip_code, exists)
+            return exists
+        except Exception as e:
+            print(f"Error checking trip existence: {e}")
+            return False
+
+    def _remember_code(self, trip_code: str, exists: bool):
+        """Cache a trip code lookup (misses expire sooner than hits)"""
+        ttl = TRIP_CODE_CACHE_TTL if exists else TRIP_CODE_NEGATIVE_TTL
+        self.code_cache.set(trip_code, exists, ttl=ttl)
+
+    def _prepare_for_firestore(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert data to Firestore-compatible format"""
+        return FirestoreTripStore.encode(data)
+
+    def _prepare_from_firestore(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert Firestore data back to application format"""
+        return FirestoreTripStore.decode(data)
 
 
 # Global instance
 _firebase_manager = None
+_firebase_lock = threading.Lock()
 
 def get_firebase_manager() -> FirebaseManager:
-    """Get or create the global Firebase manager instance"""
+    """Get or create the global Firebase manager instance (thread-safe)"""
     global _firebase_manager
     if _firebase_manager is None:
-        _firebase_manager = FirebaseManager()
+        with _firebase_lock:
+            if _firebase_manager is None:
+                _firebase_manager = FirebaseManager(background=True)
     return _firebase_manager
+
+gauge('trip_code_cache_hit_ratio', "Trip-code existence lookups answered from cache",
+      lambda: _firebase_manager.code_cache.hit_ratio if _firebase_manager is not None else 0.0)
+
+def start_firebase_warmup() -> FirebaseManager:
+    """
+    Begin Firebase initialization on a background thread
+
+    Call at process start; idempotent. The first save or load then waits
+    only for whatever initialization is still running.
+    """
+    return get_firebase_manager()
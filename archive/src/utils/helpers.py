@@ -1,9 +1,8 @@
 """
 Utility functions for the Disney Trip Planning Agent
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Tuple
-import pytz
 
 
 def calculate_countdown(target_date: datetime) -> Tuple[int, int, int, int]:
@@ -13,9 +12,9 @@ def calculate_countdown(target_date: datetime) -> Tuple[int, int, int, int]:
     Returns:
         Tuple of (days, hours, minutes, seconds) until trip
     """
-    now = datetime.now(pytz.UTC)
+    now = datetime.now(timezone.utc)
     if target_date.tzinfo is None:
-        target_date = pytz.UTC.localize(target_date)
+        target_date = target_date.replace(tzinfo=timezone.utc)
 
     delta = target_date - now
 
@@ -56,9 +55,9 @@ def get_trip_phase(trip_date: datetime) -> str:
     Returns:
         Phase name: "early", "mid", "final", or "imminent"
     """
-    now = datetime.now(pytz.UTC)
+    now = datetime.now(timezone.utc)
     if trip_date.tzinfo is None:
-        trip_date = pytz.UTC.localize(trip_date)
+        trip_date = trip_date.replace(tzinfo=timezone.utc)
 
     days_until = (trip_date - now).days
 
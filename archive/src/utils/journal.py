@@ -0,0 +1,465 @@
+"""
+Append-only operation journal for local trip persistence.
+
+Instead of re-pickling the whole trip on every click, each action is appended
+as a small JSON line (item added, toggled, deleted, idea saved, suggestions set).
+A background compactor folds the journal into a snapshot, and loading replays
+the snapshot plus whatever tail has not been folded yet.
+
+Crash safety:
+- Snapshots are written to a temp file, fsynced and atomically renamed
+- Every record carries a sequence number; the snapshot stores the last
+  sequence it contains, so records folded before a crash are never replayed twice
+- A torn final line (crash mid-append) is ignored on load
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.constants import (
+    JOURNAL_FILE, SNAPSHOT_FILE,
+    JOURNAL_FSYNC_BATCH, JOURNAL_FSYNC_INTERVAL,
+    JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_INTERVAL,
+    MAX_CHAT_HISTORY, MAX_IDEAS, MAX_PENDING_SUGGESTIONS
+)
+from src.models.trip_data import trim_ideas
+from src.storage.codec import encode_trip, decode_trip
+from src.utils.logger import log_error, log_info
+from src.utils.metrics import STORAGE_LATENCY, timed
+from src.utils.tracing import traced
+
+
+# ============================================================================
+# STATE SERIALIZATION
+# ============================================================================
+def empty_state() -> Dict[str, Any]:
+    """Blank trip state in journal (JSON) form"""
+    return {
+        'trip_details': None,
+        'checklist': [],
+        'ideas': [],
+        'chat_history': [],
+        'rejected_items': [],
+        'pending_suggestions': []
+    }
+
+
+def decode_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert journal (JSON) state back to application format"""
+    document = empty_state()
+    document.update(state)
+    decoded = decode_trip(document)
+    decoded['rejected_items'] = set(decoded['rejected_items'])
+    return decoded
+
+
+# ============================================================================
+# OPERATION REPLAY
+# ============================================================================
+def _find(items: List[dict], item_id: str) -> Optional[dict]:
+    for item in items:
+        if item.get('id') == item_id:
+            return item
+    return None
+
+
+def _add_rejected(state: Dict[str, Any], texts: List[str]):
+    rejected = set(state['rejected_items'])
+    rejected.update(t for t in texts if t)
+    state['rejected_items'] = sorted(rejected)
+
+
+def _apply_snapshot(state, record):
+    state.clear()
+    state.update(empty_state())
+    state.update(record['state'])
+
+
+def _apply_fields_loaded(state, record):
+    # Sections fetched lazily from the cloud replace their local copies
+    state.update(record['fields'])
+
+
+def _apply_item_added(state, record):
+    state['checklist'].append(record['item'])
+
+
+def _apply_items_added(state, record):
+    state['checklist'].extend(record['items'])
+
+
+def _apply_item_toggled(state, record):
+    item = _find(state['checklist'], record['item_id'])
+    if item is not None:
+        item['completed'] = record['completed']
+
+
+def _apply_item_deleted(state, record):
+    state['checklist'] = [i for i in state['checklist'] if i.get('id') != record['item_id']]
+    _add_rejected(state, [record.get('rejected')])
+
+
+def _apply_items_edited(state, record):
+    for item_id, completed in record.get('toggled', {}).items():
+        item = _find(state['checklist'], item_id)
+        if item is not None:
+            item['completed'] = completed
+    deleted = set(record.get('deleted', []))
+    if deleted:
+        state['checklist'] = [i for i in state['checklist'] if i.get('id') not in deleted]
+    _add_rejected(state, record.get('rejected', []))
+
+
+def _apply_ideas_added(state, record):
+    state['ideas'] = trim_ideas(state['ideas'] + record['ideas'], MAX_IDEAS)
+
+
+def _apply_idea_saved(state, record):
+    idea = _find(state['ideas'], record['idea_id'])
+    if idea is not None:
+        idea['saved'] = record['saved']
+
+
+def _apply_chat_appended(state, record):
+    state['chat_history'].extend(record['messages'])
+    state['chat_history'] = state['chat_history'][-MAX_CHAT_HISTORY:]
+    if record.get('pending_suggestions') is not None:
+        state['pending_suggestions'] = record['pending_suggestions'][-MAX_PENDING_SUGGESTIONS:]
+
+
+def _apply_suggestions_set(state, record):
+    state['pending_suggestions'] = record['pending_suggestions'][-MAX_PENDING_SUGGESTIONS:]
+
+
+def _apply_suggestion_resolved(state, record):
+    state['pending_suggestions'] = [
+        s for s in state['pending_suggestions'] if s.get('text') != record['text']
+    ]
+    if record.get('item'):
+        state['checklist'].append(record['item'])
+    _add_rejected(state, [record.get('rejected')])
+
+
+def _apply_suggestions_cleared(state, record):
+    state['pending_suggestions'] = []
+    _add_rejected(state, record.get('rejected', []))
+
+
+_APPLY: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {
+    'snapshot': _apply_snapshot,
+    'fields_loaded': _apply_fields_loaded,
+    'item_added': _apply_item_added,
+    'items_added': _apply_items_added,
+    'item_toggled': _apply_item_toggled,
+    'item_deleted': _apply_item_deleted,
+    'items_edited': _apply_items_edited,
+    'ideas_added': _apply_ideas_added,
+    'idea_saved': _apply_idea_saved,
+    'chat_appended': _apply_chat_appended,
+    'suggestions_set': _apply_suggestions_set,
+    'suggestion_resolved': _apply_suggestion_resolved,
+    'suggestions_cleared': _apply_suggestions_cleared,
+}
+
+OPERATIONS = frozenset(_APPLY)
+
+
+def apply_record(state: Dict[str, Any], record: Dict[str, Any]):
+    """Fold a single journal record into JSON state (unknown ops are skipped)"""
+    handler = _APPLY.get(record.get('op'))
+    if handler is not None:
+        handler(state, record)
+
+
+# ============================================================================
+# JOURNAL
+# ============================================================================
+class TripJournal:
+    """
+    Crash-safe local persistence: snapshot file + append-only JSONL journal.
+
+    Appends are flushed to the OS immediately and fsynced in batches
+    (every `fsync_batch` records or `fsync_interval` seconds, whichever
+    comes first). A daemon thread handles deferred fsyncs and compacts
+    the journal once it grows past `compact_bytes`.
+    """
+
+    def __init__(
+        self,
+        journal_file: Path = JOURNAL_FILE,
+        snapshot_file: Path = SNAPSHOT_FILE,
+        fsync_batch: int = JOURNAL_FSYNC_BATCH,
+        fsync_interval: float = JOURNAL_FSYNC_INTERVAL,
+        compact_bytes: int = JOURNAL_COMPACT_BYTES,
+        compact_interval: float = JOURNAL_COMPACT_INTERVAL,
+        background: bool = True
+    ):
+        self.journal_file = Path(journal_file)
+        self.snapshot_file = Path(snapshot_file)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+        self.compact_interval = compact_interval
+
+        self._lock = threading.RLock()
+        self._fh = None
+        self._seq = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._stop = threading.Event()
+        self._worker = None
+
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        self._seq = self._read_last_seq()
+
+        if background:
+            # Not wrap()ped: the thread outlives the rerun that created the
+            # journal, so each background compaction is a trace of its own
+            self._worker = threading.Thread(
+                target=self._background_loop, name='trip-journal', daemon=True
+            )
+            self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @traced('journal.append')
+    @timed(STORAGE_LATENCY, 'journal.append')
+    def append(self, op: str, **fields) -> int:
+        """
+        Append one operation record
+
+        Args:
+            op: Operation name (see OPERATIONS)
+            **fields: Operation payload; models and sets are converted to JSON
+
+        Returns:
+            Number of bytes written
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'op': op, 'ts': round(time.time(), 3)}
+            record.update(encode_trip(fields))
+            line = json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n'
+
+            fh = self._open()
+            fh.write(line)
+            fh.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._sync()
+            return len(line.encode('utf-8'))
+
+    def write_snapshot(self, data: Dict[str, Any]):
+        """Replace all local state with a full snapshot and reset the journal"""
+        with self._lock:
+            self._seq += 1
+            self._write_snapshot_file(encode_trip(data), self._seq)
+            self._truncate_journal()
+
+    def flush(self):
+        """Force any batched records to disk"""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def reset(self):
+        """Delete the snapshot and journal (used by 'Start Fresh')"""
+        with self._lock:
+            self._truncate_journal()
+            if self.snapshot_file.exists():
+                self.snapshot_file.unlink()
+
+    def close(self):
+        """Stop the background thread and flush outstanding records"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=2)
+        with self._lock:
+            if self._fh is not None:
+                self._sync()
+                self._fh.close()
+                self._fh = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def exists(self) -> bool:
+        """Whether any journaled state is on disk"""
+        return self.snapshot_file.exists() or (
+            self.journal_file.exists() and self.journal_file.stat().st_size > 0
+        )
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        """Replay snapshot + journal tail into JSON state"""
+        with self._lock:
+            if not self.exists():
+                return None
+            state, _ = self._replay()
+            return state
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Replay snapshot + journal tail and return application-format data"""
+        state = self.load_state()
+        return decode_state(state) if state is not None else None
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+    def journal_size(self) -> int:
+        try:
+            return self.journal_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    @traced('journal.compact')
+    def compact(self) -> bool:
+        """Fold the journal into a new snapshot. Returns True if work was done."""
+        with self._lock:
+            if self.journal_size() == 0:
+                return False
+            start = time.monotonic()
+            self._sync()
+            state, last_seq = self._replay()
+            self._write_snapshot_file(state, last_seq)
+            self._truncate_journal()
+            log_info("Journal compacted", {
+                'seq': last_seq, 'duration_ms': round((time.monotonic() - start) * 1000, 1)
+            })
+            return True
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _open(self):
+        if self._fh is None:
+            self._drop_torn_tail()
+            self._fh = open(self.journal_file, 'a', encoding='utf-8')
+        return self._fh
+
+    def _drop_torn_tail(self):
+        """Cut a half-written last line (crash mid-append) so the next record starts on its own line"""
+        try:
+            with open(self.journal_file, 'rb+') as fh:
+                size = fh.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                fh.seek(size - 1)
+                if fh.read(1) == b'\n':
+                    return
+                # Walk back to the last complete line
+                end = size
+                while end > 0:
+                    start = max(0, end - 4096)
+                    fh.seek(start)
+                    newline = fh.read(end - start).rfind(b'\n')
+                    if newline != -1:
+                        end = start + newline + 1
+                        break
+                    end = start
+                fh.truncate(end)
+                fh.flush()
+                os.fsync(fh.fileno())
+            log_info("Dropped torn journal tail", {'bytes': size - end})
+        except FileNotFoundError:
+            return
+
+    def _sync(self):
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _truncate_journal(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        with open(self.journal_file, 'w', encoding='utf-8') as fh:
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._unsynced = 0
+
+    def _write_snapshot_file(self, state: Dict[str, Any], seq: int):
+        tmp = self.snapshot_file.with_suffix(self.snapshot_file.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'seq': seq, 'state': state}, fh, separators=(',', ':'), ensure_ascii=False)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.snapshot_file)
+
+    def _read_snapshot(self):
+        if not self.snapshot_file.exists():
+            return empty_state(), 0
+        with open(self.snapshot_file, 'r', encoding='utf-8') as fh:
+            payload = json.load(fh)
+        state = empty_state()
+        state.update(payload.get('state', {}))
+        return state, payload.get('seq', 0)
+
+    def _iter_journal(self):
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                if not line.endswith('\n'):
+                    break  # Torn write from a crash mid-append
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    break
+
+    def _replay(self):
+        state, last_seq = self._read_snapshot()
+        for record in self._iter_journal():
+            seq = record.get('seq', 0)
+            if seq <= last_seq:
+                continue  # Already folded into the snapshot
+            apply_record(state, record)
+            last_seq = seq
+        return state, last_seq
+
+    def _read_last_seq(self) -> int:
+        try:
+            _, last_seq = self._read_snapshot()
+            for record in self._iter_journal():
+                last_seq = max(last_seq, record.get('seq', 0))
+            return last_seq
+        except Exception as e:
+            log_error("Could not read journal sequence", e)
+            return 0
+
+    def _background_loop(self):
+        tick = max(0.05, min(self.fsync_interval, self.compact_interval))
+        last_compact = time.monotonic()
+        while not self._stop.wait(tick):
+            try:
+                with self._lock:
+                    if self._unsynced and time.monotonic() - self._last_sync >= self.fsync_interval:
+                        self._sync()
+                if time.monotonic() - last_compact >= self.compact_interval:
+                    last_compact = time.monotonic()
+                    if self.journal_size() >= self.compact_bytes:
+                        self.compact()
+            except Exception as e:
+                log_error("Journal background task failed", e)
+
+
+# Global instance
+_trip_journal = None
+_trip_journal_lock = threading.Lock()
+
+def get_trip_journal() -> TripJournal:
+    """Get or create the global trip journal instance (thread-safe)"""
+    global _trip_journal
+    if _trip_journal is None:
+        with _trip_journal_lock:
+            if _trip_journal is None:
+                _trip_journal = TripJournal()
+    return _trip_journal
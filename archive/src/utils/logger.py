@@ -1,67 +1,228 @@
 """
 Logging utility for Disney Trip Planner
 Structured logging with context and proper error handling
+
+Log calls only enqueue a record; a QueueListener thread formats it and does
+the file and console I/O. Context dicts travel on the record and are
+serialized in that thread. The log file rotates by size and by time and
+holds one JSON object per line (LOG_FILE_FORMAT).
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Any
 import streamlit as st
 
+from src.config.constants import (
+    LOG_FILE_FORMAT, LOG_MAX_BYTES, LOG_ROTATE_WHEN, LOG_BACKUP_COUNT, LOG_QUEUE_SIZE
+)
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
 LOG_DIR = Path.home() / '.disney_trip_planner' / 'logs'
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-# Create log file with timestamp
-log_file = LOG_DIR / f'app_{datetime.now().strftime("%Y%m%d")}.log'
-
-# Configure logging format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+LOG_FILE = LOG_DIR / 'app.log'
 
 logger = logging.getLogger('DisneyTripPlanner')
 
+_configured = False
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SizedTimedRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotates at LOG_ROTATE_WHEN intervals and whenever the file passes max_bytes"""
+
+    def __init__(self, filename, max_bytes: int, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.max_bytes
+
+    def doRollover(self):
+        # Size rollovers can happen several times per interval; keep each file
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        stamp = time.strftime(self.suffix, time.localtime())
+        target = self.rotation_filename(f"{self.baseFilename}.{stamp}")
+        n = 1
+        while os.path.exists(target):
+            target = self.rotation_filename(f"{self.baseFilename}.{stamp}.{n}")
+            n += 1
+        self.rotate(self.baseFilename, target)
+        for old in self.getFilesToDelete():
+            os.remove(old)
+        self.rolloverAt = self.computeRollover(int(time.time()))
+        if not self.delay:
+            self.stream = self._open()
+
+    def getFilesToDelete(self):
+        prefix = os.path.basename(self.baseFilename) + '.'
+        directory = os.path.dirname(self.baseFilename)
+        rotated = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix)),
+            key=os.path.getmtime,
+        )
+        if len(rotated) <= self.backupCount:
+            return []
+        return rotated[:len(rotated) - self.backupCount]
+
+
+def _error_text(record: logging.LogRecord) -> Optional[str]:
+    error = getattr(record, 'error', None)
+    return str(error) if error is not None else None
+
+
+class TextFormatter(logging.Formatter):
+    """`time | LEVEL | logger | message | Error: ... | Context: {...}`"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s | %(levelname)-8s | %(name)s | %(message)s')
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        error = _error_text(record)
+        if error is not None:
+            line = f"{line} | Error: {error}"
+        context = getattr(record, 'context', None)
+        if context:
+            line = f"{line} | Context: {context}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; context fields are kept as structured data"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+        }
+        error = _error_text(record)
+        if error is not None:
+            entry['error'] = error
+        context = getattr(record, 'context', None)
+        if context:
+            entry['context'] = context
+        if record.exc_info:
+            entry['traceback'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records as-is
+
+    The stock QueueHandler formats each record in the calling thread; here
+    message interpolation and context serialization are left to the
+    listener's formatters. A full queue drops the record rather than block.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def configure_logging():
+    """
+    Start the logging pipeline: queue handler -> listener thread -> file + console
+
+    Runs on the first log call rather than at import, so importing this
+    module touches no files.
+    """
+    global _configured, _listener
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+        file_handler = SizedTimedRotatingFileHandler(
+            LOG_FILE, max_bytes=LOG_MAX_BYTES, when=LOG_ROTATE_WHEN,
+            backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True,
+        )
+        file_handler.setFormatter(JsonFormatter() if LOG_FILE_FORMAT == 'json' else TextFormatter())
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(TextFormatter())
+
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(log_queue)])
+        _configured = True
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
 
 # ============================================================================
 # LOGGING HELPERS
 # ============================================================================
+def _log(level: int, message: str, context: Optional[dict], error: Optional[Exception] = None):
+    configure_logging()
+    if not logger.isEnabledFor(level):
+        return
+    extra = {}
+    if context:
+        # Shallow copy: the caller may keep mutating its dict after this returns
+        extra['context'] = dict(context)
+    if error is not None:
+        extra['error'] = error
+    logger.log(level, message, exc_info=error, extra=extra)
+
+
 def log_info(message: str, context: Optional[dict] = None):
     """Log informational message with optional context"""
-    if context:
-        message = f"{message} | Context: {context}"
-    logger.info(message)
+    _log(logging.INFO, message, context)
 
 
 def log_warning(message: str, context: Optional[dict] = None):
     """Log warning message with optional context"""
-    if context:
-        message = f"{message} | Context: {context}"
-    logger.warning(message)
+    _log(logging.WARNING, message, context)
 
 
 def log_error(message: str, error: Optional[Exception] = None, context: Optional[dict] = None):
     """Log error message with exception details and context"""
-    if error:
-        message = f"{message} | Error: {str(error)}"
-    if context:
-        message = f"{message} | Context: {context}"
-    logger.error(message, exc_info=error is not None)
+    _log(logging.ERROR, message, context, error)
 
 
 def log_debug(message: str, context: Optional[dict] = None):
     """Log debug message with optional context"""
-    if context:
-        message = f"{message} | Context: {context}"
-    logger.debug(message)
+    _log(logging.DEBUG, message, context)
 
 
 # ============================================================================
@@ -112,19 +273,23 @@ def show_success(message: str, display_to_user: bool = True):
 # CONTEXT MANAGERS FOR OPERATIONS
 # ============================================================================
 class OperationContext:
-    """Context manager for tracking operations with logging"""
+    """Context manager for tracking operations with logging (and a tracing span)"""
 
     def __init__(self, operation_name: str, context: Optional[dict] = None):
         self.operation_name = operation_name
         self.context = context or {}
         self.start_time = None
+        self.span = None
 
     def __enter__(self):
+        from src.utils.tracing import span
         self.start_time = datetime.now()
+        self.span = span(self.operation_name, **self.context).__enter__()
         log_info(f"Starting: {self.operation_name}", self.context)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.span.__exit__(exc_type, exc_val, exc_tb)
         duration = (datetime.now() - self.start_time).total_seconds()
 
         if exc_type is None:
@@ -182,14 +347,9 @@ def log_api_call(
     params: Optional[dict] = None,
     response_summary: Optional[str] = None
 ):
-    """Log API calls for debugging and cost tracking"""
-    context = {
-        'api': api_name,
-        'endpoint': endpoint,
-        'params': params or {}
-    }
-
+    """Log API calls for debugging and cost tracking (an `api_call` event)"""
+    from src.utils.events import API_CALL, emit
     if response_summary:
-        context['response'] = response_summary
-
-    log_info(f"API Call: {api_name}", context)
+        emit(API_CALL, api=api_name, endpoint=endpoint, params=params or {}, response=response_summary)
+    else:
+        emit(API_CALL, api=api_name, endpoint=endpoint, params=params or {})
@@ -0,0 +1,156 @@
+"""
+Session-state memory accounting and byte budgets.
+
+The count limits in constants.py (MAX_CHAT_HISTORY, MAX_PENDING_SUGGESTIONS,
+page sizes) bound how many records a session holds, not how many bytes: one
+long chat answer can outweigh a whole checklist. Once every
+MEMORY_CHECK_INTERVAL seconds, at the end of a rerun, enforce_memory_budget()
+measures the session's state (src.utils.sessions.deep_size, the same estimator
+the dashboard and the slow-rerun warning use) and, while it is over budget,
+sheds data in this order:
+    caches  list indexes, rebuilt on next use
+    chat    older chat pages; the chat log keeps them, "Load earlier" reads them back
+    ideas   the ideas section; it is saved, and reloads when the tab opens
+            (not while changes wait to reach the shared trip, see app.py)
+Sections on screen, and their list indexes, are never shed. The budget is
+SESSION_MEMORY_BUDGET, or this session's share of PROCESS_MEMORY_BUDGET once
+the active sessions together exceed it.
+
+Each session's latest size is kept here, so the process-wide total costs
+nothing to read (gauge session_state_bytes_total, performance dashboard).
+"""
+import time
+from typing import Any, Callable, Collection, Dict, List, Tuple
+
+from src.config.constants import MEMORY_CHECK_INTERVAL, PROCESS_MEMORY_BUDGET, SESSION_MEMORY_BUDGET
+from src.utils.logger import log_info, log_warning
+from src.utils.metrics import counter, gauge, histogram
+from src.utils.session_state import SECTIONS, evict_section
+from src.utils.sessions import active_sessions, state_sizes
+
+SESSION_BYTES = histogram('session_state_bytes', "Measured session-state size per check")
+EVICTIONS = counter('session_evictions_total', "Data shed from session state to meet the byte budget",
+                    ('kind',))
+
+# session id -> bytes at its last check
+_sizes: Dict[str, int] = {}
+
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+def session_bytes(state) -> int:
+    """Deep size of a session's state; objects shared between keys count once"""
+    return sum(state_sizes(state).values())
+
+
+def session_sizes() -> Dict[str, int]:
+    """{session id: bytes at its last check} for active sessions"""
+    active = active_sessions()
+    for session_id in list(_sizes):
+        if session_id not in active:
+            _sizes.pop(session_id, None)
+    return {session_id: size for session_id, size in _sizes.items() if session_id in active}
+
+
+def process_bytes() -> int:
+    """Session state across all active sessions, as last measured"""
+    return sum(session_sizes().values())
+
+
+gauge('session_state_bytes_total', "Measured session state across active sessions", process_bytes)
+
+
+def session_budget() -> int:
+    """SESSION_MEMORY_BUDGET, cut to an equal share once the process is over its budget"""
+    sizes = session_sizes()
+    if sum(sizes.values()) <= PROCESS_MEMORY_BUDGET:
+        return SESSION_MEMORY_BUDGET
+    return min(SESSION_MEMORY_BUDGET, PROCESS_MEMORY_BUDGET // max(1, len(sizes)))
+
+
+# ============================================================================
+# EVICTION
+# ============================================================================
+def _drop_caches(state, keep: Collection[str]) -> bool:
+    kept = {f'_index_{field}' for section in keep for field in SECTIONS.get(section, ())}
+    keys = [key for key in list(state.keys()) if str(key).startswith('_index_') and key not in kept]
+    for key in keys:
+        state.pop(key, None)
+    return bool(keys)
+
+
+def _trim_chat(state, keep: Collection[str]) -> bool:
+    chat_log = state.get('chat_log')
+    history = state.get('chat_history')
+    if 'chat' in keep or chat_log is None or not history or len(history) <= chat_log.head_count:
+        return False
+    state['chat_history'] = history[-chat_log.head_count:] if chat_log.head_count else []
+    state['chat_oldest_page'] = chat_log.head_page
+    state.pop('chat_window', None)
+    return True
+
+
+def _spill_ideas(state, keep: Collection[str]) -> bool:
+    # Ideas are read back from the shared trip, so only spill them once it has every change
+    if 'ideas' in keep or state.get('unsynced_changes'):
+        return False
+    return evict_section('ideas')
+
+
+EVICTIONS_IN_ORDER: List[Tuple[str, Callable[[Any, Collection[str]], bool]]] = [
+    ('caches', _drop_caches),
+    ('chat', _trim_chat),
+    ('ideas', _spill_ideas),
+]
+
+
+# ============================================================================
+# STREAMLIT RERUNS
+# ============================================================================
+def enforce_memory_budget(state, keep: Collection[str] = (), force: bool = False) -> int:
+    """
+    Measure this session's state and shed data until it fits the budget
+
+    Args:
+        state: st.session_state of the current session
+        keep: Sections on screen this rerun (never shed)
+        force: Measure even if the last check was recent
+
+    Returns:
+        Bytes after any eviction (0 if the check was skipped)
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    now = time.time()
+    if not force and now - state.get('_memory_checked_at', 0.0) < MEMORY_CHECK_INTERVAL:
+        return 0
+    state['_memory_checked_at'] = now
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx is not None else 'bare'
+
+    size = session_bytes(state)
+    before = size
+    budget = session_budget()
+    evicted = []
+    for kind, evict in EVICTIONS_IN_ORDER:
+        if size <= budget:
+            break
+        if evict(state, keep):
+            EVICTIONS.inc(kind)
+            evicted.append(kind)
+            size = session_bytes(state)
+
+    _sizes[session_id] = size
+    SESSION_BYTES.observe(value=size)
+    if evicted:
+        log_info("Session state shed to fit budget", {
+            'before': before, 'after': size, 'budget': budget, 'evicted': evicted,
+            'trip_code': state.get('trip_code'),
+        })
+    if size > budget:
+        log_warning("Session state over budget", {
+            'bytes': size, 'budget': budget, 'trip_code': state.get('trip_code'),
+            'state_bytes': state_sizes(state, 10),
+        })
+    return size
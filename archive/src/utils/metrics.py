@@ -0,0 +1,423 @@
+"""
+In-process metrics: counters, gauges and HDR-style latency histograms.
+
+    LLM_LATENCY = histogram('llm_latency_seconds', "...", ('method', 'model', 'outcome'))
+    LLM_LATENCY.labels('brainstorm_ideas', 'gpt-4o', 'ok').observe(1.84)
+    LLM_LATENCY.labels('brainstorm_ideas', 'gpt-4o', 'ok').percentile(95)
+
+Histograms bucket values HDR-style: log2 magnitude plus HISTOGRAM_SUB_BUCKETS
+linear sub-buckets, so every quantile is within 1/HISTOGRAM_SUB_BUCKETS of
+the true value at any scale, in constant memory per label set. Each one
+also keeps METRICS_WINDOW_SLOTS slots of METRICS_WINDOW_SLOT seconds, so
+window(300) gives the last five minutes without any background work.
+
+Everything in the registry exports as Prometheus text format: counters and
+gauges directly, histograms as summaries (quantiles, _sum, _count). Use
+prometheus_text() for an endpoint, or start_metrics_export() to rewrite
+METRICS_FILE every METRICS_EXPORT_INTERVAL seconds (node_exporter textfile
+collector) and, when METRICS_PORT is set, serve /metrics over HTTP.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.config.constants import (
+    HISTOGRAM_SUB_BUCKETS, METRICS_EXPORT_INTERVAL, METRICS_FILE, METRICS_PORT_ENV_VAR,
+    METRICS_WINDOW_SLOT, METRICS_WINDOW_SLOTS, MODEL_PRICING
+)
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+class HdrHistogram:
+    """
+    Log-linear histogram of non-negative values
+
+    Values are stored as integers in units of `resolution` (default 1us for
+    seconds). Bucket index: the top log2(sub_buckets) significant bits of the
+    value plus its magnitude, like HdrHistogram with ~2 significant digits.
+    """
+
+    def __init__(self, resolution: float = 1e-6, sub_buckets: int = HISTOGRAM_SUB_BUCKETS):
+        self.resolution = resolution
+        self.sub_bits = max(1, (sub_buckets - 1).bit_length())
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _index(self, units: int) -> int:
+        shift = max(0, units.bit_length() - self.sub_bits)
+        return (shift << self.sub_bits) | (units >> shift)
+
+    def _lowest(self, index: int) -> int:
+        shift = index >> self.sub_bits
+        return (index & ((1 << self.sub_bits) - 1)) << shift
+
+    def _upper(self, index: int) -> int:
+        return self._lowest(index) + (1 << (index >> self.sub_bits)) - 1
+
+    def observe(self, value: float):
+        units = int(max(0.0, value) / self.resolution)
+        index = self._index(units)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None or value < self.min else self.min
+            self.max = value if self.max is None or value > self.max else self.max
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile p (0-100); midpoint of the matching bucket, clamped to min/max"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, int(round(p / 100.0 * self.count + 0.4999)))
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    mid = (self._lowest(index) + self._upper(index)) / 2 * self.resolution
+                    return min(max(mid, self.min), self.max)
+            return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        summary = {f"p{int(q * 100)}": self.percentile(q * 100) for q in QUANTILES}
+        summary.update(count=self.count, sum=self.total, min=self.min or 0.0, max=self.max or 0.0)
+        return summary
+
+    def merge(self, other: 'HdrHistogram'):
+        """Add another histogram's values (same resolution and sub-buckets)"""
+        with other._lock:
+            counts, count, total = dict(other.counts), other.count, other.total
+            low, high = other.min, other.max
+        if not count:
+            return
+        with self._lock:
+            for index, n in counts.items():
+                self.counts[index] = self.counts.get(index, 0) + n
+            self.count += count
+            self.total += total
+            self.min = low if self.min is None or low < self.min else self.min
+            self.max = high if self.max is None or high > self.max else self.max
+
+
+class RollingHdrHistogram(HdrHistogram):
+    """
+    Cumulative histogram that also keeps recent values in time slots
+
+    Slots are created by observe() as time moves on; old ones fall off the
+    deque. A window covers whole slots, so window(60) spans 60-70 s with the
+    default 10 s slots.
+    """
+
+    def __init__(self, resolution: float = 1e-6, sub_buckets: int = HISTOGRAM_SUB_BUCKETS):
+        super().__init__(resolution, sub_buckets)
+        self.slots: Deque[Tuple[int, HdrHistogram]] = deque(maxlen=METRICS_WINDOW_SLOTS)
+
+    def observe(self, value: float):
+        super().observe(value)
+        slot = int(time.monotonic() // METRICS_WINDOW_SLOT)
+        with self._lock:
+            if not self.slots or self.slots[-1][0] != slot:
+                self.slots.append((slot, HdrHistogram(self.resolution, 1 << self.sub_bits)))
+            current = self.slots[-1][1]
+        current.observe(value)
+
+    def window(self, seconds: Optional[float]) -> HdrHistogram:
+        """Values from roughly the last `seconds` (None: everything since start)"""
+        if seconds is None:
+            return self
+        oldest = int((time.monotonic() - seconds) // METRICS_WINDOW_SLOT)
+        merged = HdrHistogram(self.resolution, 1 << self.sub_bits)
+        with self._lock:
+            slots = list(self.slots)
+        for slot, histogram in slots:
+            if slot >= oldest:
+                merged.merge(histogram)
+        return merged
+
+
+# ============================================================================
+# METRIC FAMILIES
+# ============================================================================
+class _Family:
+    """A named metric with a fixed set of label names"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def items(self) -> List[Tuple[Dict[str, str], object]]:
+        return [(dict(zip(self.label_names, key)), child) for key, child in list(self._children.items())]
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        self.labels(*label_values).inc(amount)
+
+
+class Histogram(_Family):
+    kind = 'summary'
+
+    def _new_child(self):
+        return RollingHdrHistogram()
+
+    def observe(self, *label_values, value: float):
+        self.labels(*label_values).observe(value)
+
+
+class Gauge(_Family):
+    """Value computed at export time by `fn` (e.g. a cache hit ratio)"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.fn = fn
+
+    def items(self):
+        try:
+            value = _Value()
+            value.set(float(self.fn()))
+            return [({}, value)]
+        except Exception:
+            return []
+
+
+REGISTRY: Dict[str, _Family] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(family: _Family) -> _Family:
+    with _registry_lock:
+        return REGISTRY.setdefault(family.name, family)
+
+
+def counter(name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Sequence[str] = ()) -> Histogram:
+    return _register(Histogram(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, fn: Callable[[], float]) -> Gauge:
+    return _register(Gauge(name, help_text, fn))
+
+
+def timed(family: Histogram, *label_values):
+    """Decorator observing each call's wall time (successful or not) in `family`"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                family.observe(*label_values, value=time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# LLM METRICS
+# ============================================================================
+LLM_REQUESTS = counter('llm_requests_total', "LLM calls by agent method, model and outcome",
+                       ('method', 'model', 'outcome'))
+LLM_ERRORS = counter('llm_errors_total', "Failed LLM calls by error class", ('method', 'model', 'error'))
+LLM_LATENCY = histogram('llm_latency_seconds', "LLM call latency", ('method', 'model', 'outcome'))
+LLM_TOKENS = counter('llm_tokens_total', "Tokens used (kind: prompt, completion, cached_prompt)",
+                     ('method', 'model', 'kind'))
+LLM_COST = counter('llm_cost_usd_total', "Estimated spend from MODEL_PRICING", ('method', 'model'))
+LLM_FALLBACKS = counter('llm_fallbacks_total', "Results served from a fallback after an LLM failure",
+                        ('method',))
+
+
+def _price(model: str) -> Optional[Tuple[float, float]]:
+    if model in MODEL_PRICING:
+        return MODEL_PRICING[model]
+    # Dated snapshots (gpt-4o-2024-08-06) are priced like their base model
+    for name in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICING[name]
+    return None
+
+
+def record_llm_call(method: str, model: str, seconds: float, usage=None, error: Optional[BaseException] = None):
+    """
+    Record one chat completion
+
+    Args:
+        usage: response.usage (prompt_tokens, completion_tokens and, when the
+               API reports prompt caching, prompt_tokens_details.cached_tokens)
+        error: Exception raised by the call, if it failed
+    """
+    outcome = 'ok' if error is None else 'error'
+    LLM_REQUESTS.inc(method, model, outcome)
+    LLM_LATENCY.observe(method, model, outcome, value=seconds)
+    if error is not None:
+        LLM_ERRORS.inc(method, model, type(error).__name__)
+    if usage is None:
+        return
+
+    prompt = getattr(usage, 'prompt_tokens', 0) or 0
+    completion = getattr(usage, 'completion_tokens', 0) or 0
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', 0) or 0
+    LLM_TOKENS.inc(method, model, 'prompt', amount=prompt)
+    LLM_TOKENS.inc(method, model, 'completion', amount=completion)
+    LLM_TOKENS.inc(method, model, 'cached_prompt', amount=cached)
+    price = _price(model)
+    if price is not None:
+        LLM_COST.inc(method, model, amount=(prompt * price[0] + completion * price[1]) / 1_000_000)
+
+
+def _token_total(kind: str) -> float:
+    return sum(child.value for labels, child in LLM_TOKENS.items() if labels['kind'] == kind)
+
+
+gauge('llm_prompt_cache_hit_ratio', "Share of prompt tokens served from the provider's prompt cache",
+      lambda: _token_total('cached_prompt') / (_token_total('prompt') or 1))
+
+
+# ============================================================================
+# STORAGE METRICS
+# ============================================================================
+STORAGE_LATENCY = histogram('storage_latency_seconds', "Storage operation latency (Firestore, journal, chat log, codec)",
+                            ('op',))
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+def _label_text(labels: Dict[str, str], **extra: str) -> str:
+    pairs = dict(labels, **extra)
+    if not pairs:
+        return ''
+    body = ','.join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for k, v in pairs.items())
+    return '{' + body + '}'
+
+
+def prometheus_text() -> str:
+    """Every registered metric in Prometheus text exposition format"""
+    lines = []
+    for family in list(REGISTRY.values()):
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for labels, child in family.items():
+            if isinstance(child, HdrHistogram):
+                for q in QUANTILES:
+                    lines.append(f"{family.name}{_label_text(labels, quantile=str(q))} {child.percentile(q * 100):.6g}")
+                lines.append(f"{family.name}_sum{_label_text(labels)} {child.total:.6g}")
+                lines.append(f"{family.name}_count{_label_text(labels)} {child.count}")
+            else:
+                lines.append(f"{family.name}{_label_text(labels)} {child.value:.6g}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path=METRICS_FILE):
+    """Atomically rewrite the textfile-collector file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(prometheus_text(), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('/metrics', ''):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_export_started = False
+_export_lock = threading.Lock()
+
+
+def start_metrics_export():
+    """
+    Start the periodic file export (and the /metrics endpoint if METRICS_PORT
+    is set) on daemon threads; idempotent
+    """
+    global _export_started
+    if _export_started:
+        return
+    with _export_lock:
+        if _export_started:
+            return
+        _export_started = True
+
+        def export_loop():
+            while True:
+                time.sleep(METRICS_EXPORT_INTERVAL)
+                try:
+                    write_prometheus()
+                except Exception as e:
+                    print(f"Metrics export failed: {e}")
+
+        threading.Thread(target=export_loop, name='metrics-export', daemon=True).start()
+
+        port = os.getenv(METRICS_PORT_ENV_VAR)
+        if port:
+            try:
+                server = ThreadingHTTPServer(('0.0.0.0', int(port)), _MetricsHandler)
+            except (OSError, ValueError) as e:
+                print(f"Metrics endpoint not started on port {port}: {e}")
+                return
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
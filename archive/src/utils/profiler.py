@@ -0,0 +1,166 @@
+"""
+Opt-in per-rerun sampling profiler.
+
+Enabled for every rerun with DISNEY_PROFILE=1, or for one admin session
+with `?profile=1` (`?profile=0` turns it off again). While a rerun runs, a
+background thread samples the script thread's stack every PROFILE_INTERVAL
+seconds. Frames above app.py's module level (Streamlit's runner) are cut off.
+
+Each profiled rerun writes to PROFILE_DIR (the newest PROFILE_KEEP reruns
+are kept):
+    rerun-<time>.collapsed   folded stacks, one `frame;frame;frame count` per
+                             line (flamegraph.pl, speedscope, inferno)
+    rerun-<time>.txt         top PROFILE_TOP_N functions by self and total samples
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.config.constants import (
+    PROFILE_DIR, PROFILE_ENV_VAR, PROFILE_INTERVAL, PROFILE_KEEP, PROFILE_TOP_N
+)
+from src.utils.logger import log_error, log_info
+
+_always = os.getenv(PROFILE_ENV_VAR, '').lower() in ('1', 'true', 'yes')
+
+
+def frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def capture_stack(thread_id: int, root_frame=None) -> Optional[Tuple]:
+    """Code objects on a thread's stack, outermost first, cut at `root_frame`"""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    stack = []
+    while frame is not None:
+        stack.append(frame.f_code)
+        if frame is root_frame:
+            break
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def fold(stack: Tuple) -> str:
+    """`outer;inner;leaf` line of a collapsed-stack file (without the count)"""
+    return ';'.join(frame_name(code) for code in stack)
+
+
+class RerunProfiler:
+    """Samples one thread's stack until stopped"""
+
+    def __init__(self, thread_id: int, root_frame, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rerun-profiler', daemon=True)
+
+    def start(self) -> 'RerunProfiler':
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stack = capture_stack(self.thread_id, self.root_frame)
+            if stack is None:
+                return  # The sampled thread is gone
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.root_frame = None
+        self.seconds = time.perf_counter() - self.started
+
+    # ------------------------------------------------------------------ output
+    def collapsed(self) -> str:
+        return ''.join(f"{fold(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def hot_functions(self, top_n: int = PROFILE_TOP_N) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        """(by self samples, by total samples), each the top `top_n` (name, samples)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[frame_name(stack[-1])] += count
+            for name in {frame_name(code) for code in stack}:
+                total[name] += count
+        return own.most_common(top_n), total.most_common(top_n)
+
+    def summary(self, top_n: int = PROFILE_TOP_N) -> str:
+        own, total = self.hot_functions(top_n)
+        # Samples land less often than `interval` while the script holds the
+        # GIL, so weight each by the measured wall time instead
+        ms = self.seconds * 1000 / self.samples if self.samples else 0.0
+        lines = [f"Rerun: {self.seconds * 1000:.0f} ms, {self.samples} samples (~{ms:.1f} ms each)", ""]
+        for title, rows in (("Self time", own), ("Total time (incl. callees)", total)):
+            lines.append(f"{title}:")
+            for name, count in rows:
+                share = count / self.samples * 100 if self.samples else 0.0
+                lines.append(f"  {share:5.1f}%  {count * ms:8.1f} ms  {name}")
+            lines.append("")
+        return '\n'.join(lines)
+
+    def write(self, directory: Path = PROFILE_DIR) -> Optional[Path]:
+        if not self.samples:
+            return None
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = directory / f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}"
+        stem.with_suffix('.collapsed').write_text(self.collapsed(), encoding='utf-8')
+        stem.with_suffix('.txt').write_text(self.summary(), encoding='utf-8')
+        _prune(directory)
+        return stem.with_suffix('.collapsed')
+
+
+def _prune(directory: Path, keep: int = PROFILE_KEEP):
+    profiles = sorted(directory.glob('rerun-*.collapsed'))
+    for old in profiles[:-keep] if keep else profiles:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.txt').unlink(missing_ok=True)
+
+
+# ============================================================================
+# STREAMLIT RERUNS
+# ============================================================================
+def profiling_requested(state, query_params, admin: bool) -> bool:
+    """Env switch, or the sticky `?profile=` flag of an admin session"""
+    if _always:
+        return True
+    flag = query_params.get('profile')
+    if flag is not None and admin:
+        state['profile_reruns'] = flag not in ('0', 'false', 'off')
+    return bool(state.get('profile_reruns'))
+
+
+def start_rerun_profile(root_frame=None) -> RerunProfiler:
+    """Start sampling the calling thread, up to `root_frame` (default: the caller's frame)"""
+    return RerunProfiler(threading.get_ident(), root_frame or sys._getframe(1)).start()
+
+
+def finish_rerun_profile(profiler: Optional[RerunProfiler]):
+    """Stop sampling and write the flamegraph input and summary"""
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        path = profiler.write()
+    except Exception as e:
+        log_error("Could not write rerun profile", e)
+        return
+    if path is not None:
+        own, _ = profiler.hot_functions(3)
+        log_info("Rerun profile written", {
+            'path': str(path), 'ms': round(profiler.seconds * 1000), 'samples': profiler.samples,
+            'hottest': [name for name, _ in own],
+        })
@@ -0,0 +1,65 @@
+"""
+Per-rerun instrumentation: tracing, the slow-rerun watchdog and the profiler.
+
+A full script run and an st.fragment rerun are both one user interaction,
+but a fragment rerun runs only the fragment function, not app.py's module
+level. So instrumented_rerun() wraps app.py's __main__ block, and
+@instrumented_fragment wraps each fragment body. Either way the rerun gets
+a root span, a RERUN_SECONDS sample, slow-rerun stacks and (when enabled) a
+profile. When a fragment is drawn as part of a full run, it is already
+inside that run's instrumentation and adds nothing.
+"""
+import functools
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+import streamlit as st
+
+from src.utils.access import is_admin
+from src.utils.profiler import finish_rerun_profile, profiling_requested, start_rerun_profile
+from src.utils.sessions import touch_session
+from src.utils.tracing import begin_rerun, end_rerun
+from src.utils.watchdog import finish_rerun_watchdog, start_rerun_watchdog
+
+# Set while the current script thread is inside an instrumented rerun
+_active = threading.local()
+
+
+@contextmanager
+def instrumented_rerun(rerun: str = 'script', root_frame=None):
+    """
+    Trace, watch and (if requested) profile the code in the `with` block
+
+    Args:
+        rerun: 'script' or 'fragment:<name>' (span attribute, slow-rerun log)
+        root_frame: Sampled stacks are cut above this frame (default: the caller's)
+    """
+    if getattr(_active, 'rerun', None) is not None:
+        yield
+        return
+    root_frame = root_frame or sys._getframe(2)
+    _active.rerun = rerun
+    watchdog = profile = None
+    try:
+        begin_rerun(st.session_state, rerun=rerun)
+        touch_session()
+        watchdog = start_rerun_watchdog(root_frame)
+        if profiling_requested(st.session_state, st.query_params, is_admin()):
+            profile = start_rerun_profile(root_frame)
+        yield
+    finally:
+        _active.rerun = None
+        end_rerun(st.session_state)
+        finish_rerun_profile(profile)
+        finish_rerun_watchdog(watchdog, st.session_state, rerun)
+
+
+def instrumented_fragment(fn: Callable) -> Callable:
+    """Instrument a fragment body; apply it under @st.fragment"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with instrumented_rerun(f"fragment:{fn.__name__}", sys._getframe()):
+            return fn(*args, **kwargs)
+    return wrapper
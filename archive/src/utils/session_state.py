@@ -0,0 +1,340 @@
+"""
+Lazy, per-tab hydration of trip state in st.session_state.
+
+A session starts with only the trip details and a summary of counts. Each
+tab's data is fetched the first time that tab is opened, so a visitor who
+only looks at the countdown never loads the full checklist, every idea or
+the chat history into their session.
+
+Sections and the trip fields they own:
+    checklist -> checklist, rejected_items
+    ideas     -> ideas
+    chat      -> pending_suggestions, chat_history (legacy inline history)
+
+Loaded checklists and idea lists get a ListIndex (positions by id, facet
+buckets, counts). It is rebuilt only after the list changes (mark_changed()),
+so paging, filters and counts cost what is on screen rather than the
+length of the list.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import streamlit as st
+
+from src.config.constants import IDEAS_PAGE_SIZE, INDEX_SELECTION_CACHE, MAX_PENDING_SUGGESTIONS
+from src.storage.codec import decode_trip
+from src.storage.crdt import HybridClock, TripCRDT
+
+SECTIONS: Dict[str, Tuple[str, ...]] = {
+    'checklist': ('checklist', 'rejected_items'),
+    'ideas': ('ideas',),
+    'chat': ('pending_suggestions', 'chat_history'),
+}
+
+# Loaded up front for every session
+SUMMARY_FIELDS = ('trip_details', 'summary')
+
+# Called with a list of trip fields; returns those fields (or None if the trip is gone)
+Fetcher = Callable[[Sequence[str]], Optional[Dict[str, Any]]]
+
+
+def _default(field: str):
+    return set() if field == 'rejected_items' else []
+
+
+# ============================================================================
+# SUMMARY COUNTS
+# ============================================================================
+def summarize_trip(data: Dict[str, Any]) -> Dict[str, int]:
+    """Counts shown without loading the sections themselves"""
+    summary = {}
+    if 'checklist' in data:
+        checklist = data['checklist'] or []
+        summary['checklist_total'] = len(checklist)
+        summary['checklist_completed'] = sum(1 for item in checklist if item.completed)
+    if 'ideas' in data:
+        ideas = data['ideas'] or []
+        summary['ideas_total'] = len(ideas)
+        summary['ideas_saved'] = sum(1 for idea in ideas if idea.saved)
+    return summary
+
+
+def current_summary() -> Dict[str, int]:
+    """Stored summary, with counts of hydrated sections taken from their indexes"""
+    summary = dict(st.session_state.get('trip_summary') or {})
+    if is_hydrated('checklist'):
+        index = list_index('checklist')
+        summary['checklist_total'] = index.size
+        summary['checklist_completed'] = index.counts('completed').get(True, 0)
+    if is_hydrated('ideas'):
+        index = list_index('ideas')
+        summary['ideas_total'] = index.size
+        summary['ideas_saved'] = index.counts('saved').get(True, 0)
+    return summary
+
+
+# ============================================================================
+# SESSION LIFECYCLE
+# ============================================================================
+def start_session(data: Optional[Dict[str, Any]], source: str):
+    """
+    Reset the session to a trip's up-front fields
+
+    Args:
+        data: Trip data holding at least SUMMARY_FIELDS (None for no trip)
+        source: Where sections are fetched from: 'cloud' or 'local'
+    """
+    data = data or {}
+    # Sections present in `data` (full local loads) are counted, not trusted
+    summary = dict(data.get('summary') or {})
+    summary.update(summarize_trip(data))
+    st.session_state.trip_details = data.get('trip_details')
+    st.session_state.trip_summary = summary
+    st.session_state.trip_source = source
+    st.session_state.hydrated = set()
+    for fields in SECTIONS.values():
+        for field in fields:
+            st.session_state.pop(field, None)
+    for key in ('ideas_cursor', 'checklist_page', 'trip_crdt', 'crdt_pulled_at', 'trip_version'):
+        st.session_state.pop(key, None)
+    mark_changed()
+
+
+def start_empty_session(source: str = 'local'):
+    """Reset the session to a blank trip with every section already loaded"""
+    start_session(None, source)
+    for section, fields in SECTIONS.items():
+        for field in fields:
+            st.session_state[field] = _default(field)
+        st.session_state.hydrated.add(section)
+
+
+def is_hydrated(section: str) -> bool:
+    return section in st.session_state.get('hydrated', ())
+
+
+def all_hydrated() -> bool:
+    return all(is_hydrated(section) for section in SECTIONS)
+
+
+def hydrate(fetch: Fetcher, *sections: str) -> bool:
+    """
+    Load sections into session state on first access, in a single fetch
+
+    Returns:
+        True if anything was fetched
+    """
+    missing = [section for section in sections if not is_hydrated(section)]
+    if not missing:
+        return False
+
+    fields = [field for section in missing for field in SECTIONS[section]]
+    data = fetch(fields) or {}
+    for field in fields:
+        value = data.get(field)
+        st.session_state[field] = value if value else _default(field)
+
+    if 'rejected_items' in fields:
+        # Firestore and the journal return it as a list
+        st.session_state.rejected_items = set(st.session_state.rejected_items)
+    if 'pending_suggestions' in fields:
+        st.session_state.pending_suggestions = st.session_state.pending_suggestions[-MAX_PENDING_SUGGESTIONS:]
+
+    st.session_state.hydrated.update(missing)
+    mark_changed()
+    return True
+
+
+def evict_section(section: str) -> bool:
+    """
+    Drop a loaded section from session state; it is fetched again on next access
+
+    Only safe for data already persisted (every change is saved as it is
+    made). The section's counts are kept in the summary.
+
+    Returns:
+        True if the section was loaded
+    """
+    if not is_hydrated(section):
+        return False
+    st.session_state.trip_summary = current_summary()
+    for field in SECTIONS[section]:
+        st.session_state.pop(field, None)
+        st.session_state.pop(f'_index_{field}', None)
+    st.session_state.hydrated.discard(section)
+    mark_changed()
+    return True
+
+
+def hydrate_all(fetch: Fetcher) -> bool:
+    return hydrate(fetch, *SECTIONS)
+
+
+def hydrated_trip_data() -> Dict[str, Any]:
+    """Trip details, summary and every section this session has loaded"""
+    data = {
+        'trip_details': st.session_state.get('trip_details'),
+        'summary': current_summary(),
+    }
+    for section, fields in SECTIONS.items():
+        if is_hydrated(section):
+            for field in fields:
+                data[field] = st.session_state[field]
+    return data
+
+
+# ============================================================================
+# SHARED EDITS
+# ============================================================================
+def session_clock() -> HybridClock:
+    """This session's hybrid logical clock (one CRDT actor per session)"""
+    if 'crdt_clock' not in st.session_state:
+        st.session_state.crdt_clock = HybridClock()
+    return st.session_state.crdt_clock
+
+
+def session_replica() -> TripCRDT:
+    """CRDT replica of the shared trip as this session has seen it"""
+    if 'trip_crdt' not in st.session_state:
+        st.session_state.trip_crdt = TripCRDT()
+    return st.session_state.trip_crdt
+
+
+def merge_replica(replica: TripCRDT):
+    """Fold a replica read alongside freshly hydrated fields into the session's"""
+    session_replica().merge(replica)
+    session_clock().observe(replica.latest_ts)
+
+
+def apply_remote_ops(ops) -> bool:
+    """
+    Apply other members' ops and refresh the loaded sections they touch
+
+    Returns:
+        True if any visible state changed
+    """
+    replica = session_replica()
+    if not replica.apply_all(ops):
+        return False
+    session_clock().observe(replica.latest_ts)
+
+    if is_hydrated('checklist'):
+        st.session_state.checklist = decode_trip({'checklist': replica.checklist()})['checklist']
+        st.session_state.rejected_items = replica.rejected_items()
+    if is_hydrated('ideas'):
+        for idea in st.session_state.ideas:
+            flag = replica.flags.get(idea.id)
+            if flag is not None:
+                idea.saved = flag[0]
+    mark_changed()
+    return True
+
+
+# ============================================================================
+# INDEXES
+# ============================================================================
+class ListIndex:
+    """Positions by id and facet buckets of one list, built in a single pass"""
+
+    def __init__(self, items: Sequence[Any], facets: Dict[str, Callable[[Any], Any]]):
+        self.size = len(items)
+        self.positions: Dict[str, int] = {}
+        self.buckets: Dict[str, Dict[Any, List[int]]] = {name: {} for name in facets}
+        for idx, item in enumerate(items):
+            self.positions[item.id] = idx
+            for name, key in facets.items():
+                self.buckets[name].setdefault(key(item), []).append(idx)
+        self._selections: Dict[tuple, List[int]] = {}
+
+    def counts(self, facet: str) -> Dict[Any, int]:
+        return {value: len(positions) for value, positions in self.buckets[facet].items()}
+
+    def values(self, facet: str) -> List[Any]:
+        return sorted(self.buckets[facet], key=str)
+
+    def select(self, **allowed) -> List[int]:
+        """Ascending positions whose every named facet takes one of the allowed values"""
+        key = tuple(sorted((name, frozenset(values)) for name, values in allowed.items()))
+        selection = self._selections.get(key)
+        if selection is None:
+            chosen = None
+            for name, values in allowed.items():
+                bucket = self.buckets[name]
+                positions = set().union(*(bucket.get(value, ()) for value in values))
+                chosen = positions if chosen is None else chosen & positions
+            selection = sorted(chosen) if chosen is not None else list(range(self.size))
+            if len(self._selections) >= INDEX_SELECTION_CACHE:
+                self._selections.clear()
+            self._selections[key] = selection
+        return selection
+
+
+FACETS: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+    'checklist': {
+        'category': lambda item: item.category,
+        'priority': lambda item: item.priority,
+        'completed': lambda item: bool(item.completed),
+    },
+    'ideas': {
+        'saved': lambda idea: bool(idea.saved),
+    },
+}
+
+
+def mark_changed():
+    """Invalidate list indexes after the checklist or ideas changed"""
+    st.session_state.data_rev = st.session_state.get('data_rev', 0) + 1
+
+
+def list_index(field: str) -> ListIndex:
+    """Index of a loaded list field ('checklist' or 'ideas'), rebuilt only after changes"""
+    items = st.session_state[field]
+    signature = (id(items), len(items), st.session_state.get('data_rev', 0))
+    cached = st.session_state.get(f'_index_{field}')
+    if cached is None or cached[0] != signature:
+        cached = (signature, ListIndex(items, FACETS[field]))
+        st.session_state[f'_index_{field}'] = cached
+    return cached[1]
+
+
+def page_window(positions: Sequence[int], page: int, page_size: int) -> Tuple[int, int, List[int], List[int]]:
+    """
+    One page of a selection, plus the page after it (to prefetch)
+
+    Returns:
+        (page clamped to range, page count, positions on the page, positions on the next page)
+    """
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(max(page, 0), pages - 1)
+    start = page * page_size
+    return page, pages, list(positions[start:start + page_size]), \
+        list(positions[start + page_size:start + 2 * page_size])
+
+
+# ============================================================================
+# IDEAS PAGING
+# ============================================================================
+def page_ideas(ideas: List[Any], cursor: Optional[str], page_size: int = IDEAS_PAGE_SIZE,
+               positions: Optional[Dict[str, int]] = None) -> Tuple[List[int], Optional[str], Optional[str]]:
+    """
+    One newest-first page of the ideas list
+
+    The cursor is the id of the newest idea on the page, so newly brainstormed
+    ideas appear on the first page without shifting the page being read.
+
+    Args:
+        positions: Idea id -> index (ListIndex.positions); scanned for if omitted
+
+    Returns:
+        (indexes into `ideas` to show, cursor of the newer page, cursor of the
+         older page; either None at that end)
+    """
+    top = len(ideas) - 1
+    if cursor is not None:
+        if positions is None:
+            positions = {idea.id: idx for idx, idea in enumerate(ideas)}
+        top = positions.get(cursor, top)
+
+    window = list(range(top, max(top - page_size, -1), -1))
+    newer = ideas[min(top + page_size, len(ideas) - 1)].id if top < len(ideas) - 1 else None
+    older = ideas[top - page_size].id if top - page_size >= 0 else None
+    return window, newer, older
@@ -0,0 +1,116 @@
+"""
+Active-session registry and session-state size estimates.
+
+app.py calls touch_session() once per rerun; that records the session id,
+the time and a weak reference to its state (a dict assignment, nothing
+more). Sizes are only estimated when someone asks (the performance
+dashboard, the slow-rerun watchdog, the memory budget in src.utils.memory),
+all with the same deep_size walk.
+"""
+import sys
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.config.constants import SESSION_ACTIVE_WINDOW
+from src.storage.crdt import HybridClock, TripCRDT
+
+# session id -> (last rerun, weak reference to its SafeSessionState)
+_sessions: Dict[str, Tuple[float, Any]] = {}
+
+
+# Objects whose attributes are this session's own data. Anything else (the
+# agent's API client, the chat log's Firestore handle) is shared between
+# sessions and counted shallow.
+_SESSION_DATA = (BaseModel, TripCRDT, HybridClock)
+
+
+def deep_size(value, seen=None) -> int:
+    """
+    Bytes held by `value` and everything it references, each object counted once
+
+    Walks containers, models and CRDT replicas; anything else is counted
+    by sys.getsizeof alone.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, _SESSION_DATA):
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), '__slots__', ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
+def state_sizes(state, top_n: Optional[int] = None) -> Dict[str, int]:
+    """
+    Session-state entries as {key: bytes}, biggest first
+
+    An object shared between keys counts once, under the first key that
+    reaches it, so the sizes add up to the whole state's size.
+    """
+    seen = set()
+    sizes = {}
+    for key in list(state.keys()):
+        try:
+            sizes[str(key)] = deep_size(state[key], seen)
+        except Exception:
+            continue
+    ranked = sorted(sizes.items(), key=lambda kv: kv[1], reverse=True)
+    return dict(ranked[:top_n] if top_n is not None else ranked)
+
+
+def touch_session():
+    """Mark the current Streamlit session as active"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    _sessions[ctx.session_id] = (time.time(), weakref.ref(ctx.session_state))
+
+
+def active_sessions(window: float = SESSION_ACTIVE_WINDOW) -> Dict[str, Tuple[float, Any]]:
+    """{session id: (seconds since last rerun, state)} for sessions seen within `window`"""
+    now = time.time()
+    active = {}
+    for session_id, (seen, ref) in list(_sessions.items()):
+        state = ref()
+        if state is None or now - seen > window:
+            _sessions.pop(session_id, None)
+            continue
+        active[session_id] = (now - seen, state)
+    return active
+
+
+def session_memory(window: float = SESSION_ACTIVE_WINDOW) -> List[Dict[str, Any]]:
+    """Per active session: idle seconds, key count, bytes and largest key"""
+    rows = []
+    for session_id, (idle, state) in active_sessions(window).items():
+        try:
+            sizes = state_sizes(state.filtered_state)
+        except Exception:
+            continue
+        largest = next(iter(sizes.items()), ('', 0))
+        rows.append({
+            'session': session_id[:8], 'idle_s': round(idle), 'keys': len(sizes),
+            'bytes': sum(sizes.values()), 'largest_key': largest[0], 'largest_bytes': largest[1],
+        })
+    return sorted(rows, key=lambda row: row['bytes'], reverse=True)
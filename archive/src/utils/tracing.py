@@ -0,0 +1,343 @@
+"""
+Lightweight span tracing.
+
+Spans nest through a contextvar, so the current span follows the code that
+is running, including into worker threads started with `wrap()` (or
+`contextvars.copy_context().run`):
+
+    with span('save_trip_data', op=op):
+        ...                                   # child spans attach here
+
+    @traced('codec.encode')
+    def encode_trip(...): ...
+
+Tracing is off unless DISNEY_TRACE=1 (or enable_tracing() is called). While
+off, span() and @traced cost a flag check. When a trace's root span ends,
+the trace is handed to a background writer. The writer appends it to
+TRACE_DIR/traces.otlp.jsonl (OTLP/JSON, one ExportTraceServiceRequest per
+line) and keeps it in a ring of recent traces. export_chrome() writes that
+ring as Chrome trace-event JSON (chrome://tracing, Perfetto).
+
+Streamlit reruns have no end hook (st.stop / st.rerun raise out of the
+script), so app.py brackets each run with begin_rerun() / end_rerun(). A
+rerun left open is closed by the next one, marked interrupted.
+"""
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from src.config.constants import (
+    TRACE_DIR, TRACE_ENV_VAR, TRACE_FILE_MAX_BYTES, TRACE_MAX_SPANS, TRACE_RECENT
+)
+
+_enabled = os.getenv(TRACE_ENV_VAR, '').lower() in ('1', 'true', 'yes')
+_current: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+SERVICE_NAME = 'disney-trip-planner'
+
+
+def enable_tracing(enabled: bool = True):
+    global _enabled
+    _enabled = enabled
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+class _Trace:
+    """Spans of one trace, collected until its root span ends"""
+
+    __slots__ = ('trace_id', 'spans', 'dropped')
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: List['Span'] = []
+        self.dropped = 0
+
+
+class Span:
+    """A timed operation with attributes, a parent and a trace"""
+
+    __slots__ = ('name', 'span_id', 'parent', 'trace', 'attributes', 'start_ns', 'end_ns',
+                 'status', 'thread', '_token')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent = parent
+        self.trace = parent.trace if parent is not None else _Trace()
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = 'ok'
+        self.thread = threading.current_thread().name
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any):
+        """Add attributes (e.g. result sizes known only at the end)"""
+        self.attributes.update(attributes)
+
+    def end(self, status: Optional[str] = None, end_ns: Optional[int] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if status is not None:
+            self.status = status
+        trace = self.trace
+        if len(trace.spans) < TRACE_MAX_SPANS:
+            trace.spans.append(self)
+        else:
+            trace.dropped += 1
+        if self.parent is None:
+            _exporter.submit(trace)
+
+    # Context manager protocol: becomes the current span while open
+    def __enter__(self) -> 'Span':
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.status = 'error'
+            self.attributes.setdefault('error', f"{exc_type.__name__}: {exc}")
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """Returned while tracing is off"""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any):
+        pass
+
+    def end(self, status: Optional[str] = None, end_ns: Optional[int] = None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attributes: Any):
+    """Child of the current span (or a new root); use as a context manager"""
+    if not _enabled:
+        return _NOOP
+    return Span(name, _current.get(), attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get() if _enabled else None
+
+
+def traced(name: Optional[str] = None):
+    """Decorator running the function inside a span (named after it by default)"""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, _current.get(), {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def wrap(fn: Callable) -> Callable:
+    """Bind `fn` to the caller's context so spans opened in a thread nest correctly"""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn)
+
+
+# ============================================================================
+# STREAMLIT RERUNS
+# ============================================================================
+def begin_rerun(state, **attributes: Any):
+    """
+    Open the root span for one script run
+
+    Args:
+        state: st.session_state (holds the open span between runs)
+    """
+    previous = state.get('_trace_rerun')
+    if previous is not None and previous.end_ns is None:
+        # Stopped early (st.stop / st.rerun): close at its last known activity
+        last = max((s.end_ns for s in previous.trace.spans if s.end_ns), default=None)
+        previous.end(status='interrupted', end_ns=last)
+    if not _enabled:
+        state.pop('_trace_rerun', None)
+        return _NOOP
+    rerun = Span('rerun', None, attributes)
+    _current.set(rerun)
+    state['_trace_rerun'] = rerun
+    return rerun
+
+
+def end_rerun(state):
+    rerun = state.pop('_trace_rerun', None)
+    if rerun is not None:
+        _current.set(None)
+        rerun.end()
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(v) for v in value]}}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(traces: Iterable[_Trace]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for the given traces"""
+    spans = []
+    for trace in traces:
+        for s in trace.spans:
+            attributes = dict(s.attributes, **{'thread.name': s.thread})
+            spans.append({
+                'traceId': trace.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent.span_id if s.parent is not None else '',
+                'name': s.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns),
+                'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in attributes.items()],
+                'status': {'code': 2 if s.status == 'error' else 1, 'message': s.status},
+            })
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+    }]}
+
+
+def to_chrome(traces: Iterable[_Trace]) -> Dict[str, Any]:
+    """Chrome trace-event JSON (complete 'X' events, microseconds) for the given traces"""
+    pid = os.getpid()
+    events = []
+    for trace in traces:
+        for s in trace.spans:
+            events.append({
+                'name': s.name,
+                'cat': s.name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': s.start_ns / 1000,
+                'dur': (s.end_ns - s.start_ns) / 1000,
+                'pid': pid,
+                'tid': s.thread,
+                'args': dict(s.attributes, trace_id=trace.trace_id, status=s.status),
+            })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+class _Exporter:
+    """Background writer: finished traces never touch the disk on the caller's thread"""
+
+    def __init__(self):
+        self.recent: Deque[_Trace] = deque(maxlen=TRACE_RECENT)
+        self._queue: 'queue.Queue[_Trace]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, trace: _Trace):
+        self.recent.append(trace)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                    self._thread.start()
+        self._queue.put(trace)
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self._write(trace)
+            except Exception as e:
+                print(f"Trace export failed: {e}")
+
+    def _write(self, trace: _Trace):
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        path = TRACE_DIR / 'traces.otlp.jsonl'
+        if path.exists() and path.stat().st_size > TRACE_FILE_MAX_BYTES:
+            path.replace(path.with_suffix('.jsonl.1'))
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(to_otlp([trace]), default=str) + '\n')
+
+
+_exporter = _Exporter()
+
+
+def recent_traces() -> List[_Trace]:
+    """Most recent finished traces (newest last)"""
+    return list(_exporter.recent)
+
+
+def export_chrome(path: Path, traces: Optional[Iterable[_Trace]] = None) -> Path:
+    """Write traces (default: the recent ones) as a Chrome trace file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(to_chrome(traces if traces is not None else recent_traces()), default=str),
+                    encoding='utf-8')
+    return path
+
+
+def otlp_file_to_chrome(path: Path, last: Optional[int] = None) -> Dict[str, Any]:
+    """Convert traces.otlp.jsonl (optionally only its last N traces) to Chrome trace-event JSON"""
+    lines = Path(path).read_text(encoding='utf-8').splitlines()
+    if last is not None:
+        lines = lines[-last:]
+    events = []
+    for line in lines:
+        for resource in json.loads(line).get('resourceSpans', []):
+            for scope in resource.get('scopeSpans', []):
+                for s in scope.get('spans', []):
+                    attributes = {a['key']: next(iter(a['value'].values())) for a in s.get('attributes', [])}
+                    start, end = int(s['startTimeUnixNano']), int(s['endTimeUnixNano'])
+                    events.append({
+                        'name': s['name'],
+                        'cat': s['name'].split('.', 1)[0],
+                        'ph': 'X',
+                        'ts': start / 1000,
+                        'dur': (end - start) / 1000,
+                        'pid': 0,
+                        'tid': attributes.pop('thread.name', 'main'),
+                        'args': dict(attributes, trace_id=s['traceId'],
+                                     status=s.get('status', {}).get('message', '')),
+                    })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
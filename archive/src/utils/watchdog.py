@@ -0,0 +1,118 @@
+"""
+Slow-rerun watchdog.
+
+Every rerun starts a watchdog thread that sleeps until the rerun either
+finishes or runs past SLOW_RERUN_THRESHOLD seconds. Fast reruns cost one
+thread start and an Event wait. Once a rerun runs past the threshold, the
+watchdog samples the script thread's stack every SLOW_RERUN_SAMPLE_INTERVAL
+seconds. When the rerun finishes, it logs one warning with:
+    - the slowest stacks (folded `frame;frame;frame`, with sample counts)
+    - the trip code
+    - the approximate size of each large session-state entry
+
+Samples are taken only after the threshold, so a steady 3 s rerun shows
+where the time after 2 s goes. That is usually the same call that made the
+rerun slow in the first place. For a whole-rerun picture, use the profiler
+(src.utils.profiler).
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from src.config.constants import (
+    SLOW_RERUN_SAMPLE_INTERVAL, SLOW_RERUN_STATE_KEYS, SLOW_RERUN_THRESHOLD, SLOW_RERUN_TOP_STACKS
+)
+from src.utils.logger import log_warning
+from src.utils.metrics import counter, histogram
+from src.utils.profiler import capture_stack, fold
+from src.utils.sessions import state_sizes
+
+RERUN_SECONDS = histogram('rerun_seconds', "Script rerun wall time")
+SLOW_RERUNS = counter('slow_reruns_total', "Reruns that exceeded SLOW_RERUN_THRESHOLD")
+
+
+class RerunWatchdog:
+    """Samples one thread's stack once it has been running longer than `threshold`"""
+
+    def __init__(self, thread_id: int, root_frame, threshold: float = SLOW_RERUN_THRESHOLD,
+                 interval: float = SLOW_RERUN_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.threshold = threshold
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rerun-watchdog', daemon=True)
+
+    def start(self) -> 'RerunWatchdog':
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self._done.wait(self.threshold):
+            return
+        while not self._done.is_set():
+            stack = capture_stack(self.thread_id, self.root_frame)
+            if stack is None:
+                return  # The watched thread is gone
+            self.stacks[stack] += 1
+            self.samples += 1
+            self._done.wait(self.interval)
+
+    def stop(self) -> float:
+        self._done.set()
+        self._thread.join()
+        self.root_frame = None
+        self.seconds = time.perf_counter() - self.started
+        return self.seconds
+
+    @property
+    def slow(self) -> bool:
+        return self.seconds > self.threshold
+
+    def top_stacks(self, top_n: int = SLOW_RERUN_TOP_STACKS) -> Dict[str, int]:
+        return {fold(stack): count for stack, count in self.stacks.most_common(top_n)}
+
+
+# ============================================================================
+# STREAMLIT RERUNS
+# ============================================================================
+def start_rerun_watchdog(root_frame=None) -> RerunWatchdog:
+    """Watch the calling thread, up to `root_frame` (default: the caller's frame)"""
+    return RerunWatchdog(threading.get_ident(), root_frame or sys._getframe(1)).start()
+
+
+def finish_rerun_watchdog(watchdog: Optional[RerunWatchdog], state, rerun: str = 'script'):
+    """
+    Stop watching; record the rerun time and log details if it was slow
+
+    Args:
+        state: st.session_state (trip code and entry sizes go in the warning)
+        rerun: What ran: 'script' or 'fragment:<name>'
+    """
+    if watchdog is None:
+        return
+    seconds = watchdog.stop()
+    RERUN_SECONDS.labels().observe(seconds)
+    if not watchdog.slow:
+        return
+    SLOW_RERUNS.labels().inc()
+    try:
+        sizes = state_sizes(state, SLOW_RERUN_STATE_KEYS)
+        trip_code = state.get('trip_code')
+    except Exception:
+        sizes, trip_code = {}, None
+    log_warning("Slow rerun", {
+        'rerun': rerun,
+        'ms': round(seconds * 1000),
+        'threshold_ms': round(watchdog.threshold * 1000),
+        'trip_code': trip_code,
+        'samples': watchdog.samples,
+        'stacks': watchdog.top_stacks(),
+        'state_bytes': sizes,
+    })
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.storage.fake_firestore import FakeFirestoreClient  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    return FakeFirestoreClient()
@@ -0,0 +1,61 @@
+from benchmarks.workload import make_trip
+from src.storage import bulk
+from src.storage.chat_log import ChatLog, FirestoreChatPages
+from src.storage.fake_firestore import FakeFirestoreClient
+from src.storage.firestore import FirestoreTripStore
+
+
+def seed(db, trips=12, messages=7):
+    store = FirestoreTripStore(db)
+    for n in range(trips):
+        code = f"T{n:03d}"
+        store.save(code, make_trip(num_messages=0, seed=n))
+        log = ChatLog(FirestoreChatPages(db, code), page_size=3, hot_pages=1)
+        log.extend([{'role': 'user', 'content': f"{code}-{i}"} for i in range(messages)])
+    return store
+
+
+def test_export_import_round_trip(db, tmp_path):
+    seed(db)
+    path = tmp_path / 'trips.jsonl.gz'
+    exported = bulk.export_trips(db, path, chunk_size=5, workers=3)
+    assert exported.trips == 12
+
+    target = FakeFirestoreClient()
+    # A small batch limit splits a trip's chat pages over several commits
+    imported = bulk.import_trips(target, path, workers=2, batch_limit=2)
+    assert imported.trips == 12 and not imported.errors
+
+    for n in (0, 11):
+        code = f"T{n:03d}"
+        assert FirestoreTripStore(target).load(code) == FirestoreTripStore(db).load(code)
+        log = ChatLog(FirestoreChatPages(target, code))
+        # Page 1 is archived (bytes), pages 2-3 are live
+        assert [m['content'] for page in (1, 2, 3) for m in log.load_page(page)] == \
+            [f"{code}-{i}" for i in range(7)]
+
+
+def test_stats_count_paged_chat(db):
+    seed(db, trips=3, messages=7)
+    stats = bulk.trip_stats(db, chunk_size=2, workers=2)
+    assert stats['trips'] == 3
+    assert stats['chat_messages'] == 21
+
+
+def test_ops_travel_with_their_trip(db, tmp_path):
+    from src.storage.crdt import HybridClock, ops_for_change
+
+    store = seed(db, trips=2, messages=0)
+    item = {'id': 'x', 'text': 'Book Space Mountain', 'completed': False,
+            'category': 'general', 'priority': 'medium', 'deadline': None}
+    ops = ops_for_change(HybridClock('a'), 'item_added', {'item': item})
+    for op in ops:
+        db.collection('trips').document('T001').collection('ops').document(op['id']).set(op)
+    assert bulk.trip_stats(db)['ops'] == 1
+
+    path = tmp_path / 'trips.jsonl.gz'
+    bulk.export_trips(db, path)
+    target = FakeFirestoreClient()
+    bulk.import_trips(target, path)
+    assert FirestoreTripStore(target).load_ops('T001') == ops
+    assert FirestoreTripStore(target).load('T001') == store.load('T001')
@@ -0,0 +1,106 @@
+import pytest
+
+from src.storage.chat_log import ChatLog, FirestoreChatPages, LocalChatPages
+
+
+@pytest.fixture(params=['firestore', 'local'])
+def pages(request, db, tmp_path):
+    if request.param == 'firestore':
+        return FirestoreChatPages(db, 'T1')
+    return LocalChatPages(tmp_path / 'chat')
+
+
+def contents(messages):
+    return [m['content'] for m in messages]
+
+
+def test_append_rolls_over_pages(pages):
+    log = ChatLog(pages, page_size=3, hot_pages=10)
+    for n in range(7):
+        log.append({'role': 'user', 'content': f"m{n}"})
+
+    assert log.latest() == (3, log.load_page(3))
+    assert contents(log.load_page(1)) == ['m0', 'm1', 'm2']
+    assert contents(log.load_page(2)) == ['m3', 'm4', 'm5']
+    assert contents(log.load_page(3)) == ['m6']
+    assert log.head_count == 1
+
+
+def test_cold_pages_are_archived_and_stay_readable(pages):
+    log = ChatLog(pages, page_size=2, hot_pages=1)
+    for n in range(6):
+        log.append({'role': 'user', 'content': f"m{n}"})
+
+    assert contents(log.load_page(1)) == ['m0', 'm1']
+    assert contents(log.load_page(2)) == ['m2', 'm3']
+    assert pages.count(1) == 2
+    # Appending to the head after archiving continues where it left off
+    log.append({'role': 'user', 'content': 'm6'})
+    assert contents(log.load_page(4)) == ['m6']
+
+
+def test_two_writers_share_page_sizes(pages):
+    ours, theirs = ChatLog(pages, page_size=3), ChatLog(pages, page_size=3)
+    for n in range(4):
+        ours.append({'role': 'user', 'content': f"a{n}"})
+        theirs.append({'role': 'user', 'content': f"b{n}"})
+
+    sizes = [len(ours.load_page(page)) for page in range(1, ours.latest()[0] + 1)]
+    assert sizes == [3, 3, 2]
+
+
+def test_clear(pages):
+    log = ChatLog(pages, page_size=2)
+    log.extend([{'role': 'user', 'content': 'hi'}] * 3)
+    log.clear()
+    assert log.latest() == (0, [])
+
+
+def test_archive_keeps_message_appended_mid_fold(db, monkeypatch):
+    pages = FirestoreChatPages(db, 'T1')
+    log = ChatLog(pages, page_size=5)
+    log.extend([{'role': 'user', 'content': f"m{n}"} for n in range(3)])
+
+    late = ChatLog.new_message('assistant', 'late')
+    fold = FirestoreChatPages._messages
+    calls = []
+
+    def racing_messages(data):
+        if not calls:
+            # Another session appends after archive() read the page
+            pages.append(1, 3, late)
+        calls.append(1)
+        return fold(data)
+
+    monkeypatch.setattr(FirestoreChatPages, '_messages', staticmethod(racing_messages))
+    pages.archive(1)
+    monkeypatch.undo()
+
+    assert contents(pages.read(1)) == ['m0', 'm1', 'm2', 'late']
+    assert pages.count(1) == 4
+
+
+def test_firestore_append_counts_on_meta_without_reading_page(db, monkeypatch):
+    pages = FirestoreChatPages(db, 'T1')
+    log = ChatLog(pages, page_size=3)
+    log.extend([{'role': 'user', 'content': f"m{n}"} for n in range(4)])
+
+    meta = pages.pages.document('meta').get().to_dict()
+    assert meta == {'head': 2, 'count': 1}
+
+    monkeypatch.setattr(FirestoreChatPages, 'read', lambda self, page: pytest.fail('page read'))
+    monkeypatch.setattr(FirestoreChatPages, 'count', lambda self, page: pytest.fail('page count'))
+    log.append({'role': 'user', 'content': 'm4'})
+    monkeypatch.undo()
+
+    assert contents(log.load_page(2)) == ['m3', 'm4']
+    assert pages.pages.document('meta').get().to_dict()['count'] == 2
+
+
+def test_firestore_meta_without_count_is_backfilled(db):
+    pages = FirestoreChatPages(db, 'T1')
+    ChatLog(pages, page_size=5).extend([{'role': 'user', 'content': f"m{n}"} for n in range(2)])
+    pages.pages.document('meta').set({'head': 1})
+
+    assert pages.head_and_count() == (1, 2)
+    assert pages.pages.document('meta').get().to_dict() == {'head': 1, 'count': 2}
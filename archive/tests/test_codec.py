@@ -0,0 +1,48 @@
+import pytest
+
+from benchmarks.workload import make_trip
+from src.models.trip_data import ChecklistItem, IdeaSuggestion
+from src.storage.codec import decode_trip, dumps_compact, encode_trip, loads_compact
+
+
+@pytest.fixture
+def document():
+    return encode_trip(make_trip(num_items=40, num_ideas=12))
+
+
+def validated(document):
+    return {
+        'checklist': [ChecklistItem.model_validate(raw) for raw in document['checklist']],
+        'ideas': [IdeaSuggestion.model_validate(raw) for raw in document['ideas']],
+    }
+
+
+def test_trusted_decode_matches_model_validate(document):
+    trusted = decode_trip(document, trusted=True, sample_rate=0)
+    expected = validated(document)
+    for field in ('checklist', 'ideas'):
+        assert trusted[field] == expected[field]
+        for built, model in zip(trusted[field], expected[field]):
+            assert built.model_dump() == model.model_dump()
+            assert built.model_fields_set == model.model_fields_set
+
+
+def test_trusted_decode_fills_missing_defaults():
+    trusted = decode_trip({'checklist': [{'id': 'a', 'text': 'Book dining'}]}, sample_rate=0)
+    item = trusted['checklist'][0]
+    assert item == ChecklistItem.model_validate({'id': 'a', 'text': 'Book dining'})
+    assert item.model_fields_set == {'id', 'text'}
+
+
+def test_failed_sample_falls_back_to_validation():
+    document = {'checklist': [{'id': 'a'}]}  # 'text' is required
+    with pytest.raises(Exception):
+        decode_trip(document, trusted=True, sample_rate=1.0)
+
+
+def test_untrusted_decode_validates(document):
+    assert decode_trip(document, trusted=False) == decode_trip(document, sample_rate=0)
+
+
+def test_compact_round_trip(document):
+    assert loads_compact(dumps_compact(document)) == decode_trip(document, sample_rate=0)
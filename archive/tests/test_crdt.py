@@ -0,0 +1,97 @@
+import itertools
+import random
+
+from src.storage.crdt import HybridClock, TripCRDT, make_op, ops_for_change
+
+
+def item(item_id, text=None):
+    return {'id': item_id, 'text': text or f"Item {item_id}", 'completed': False,
+            'category': 'general', 'priority': 'medium', 'deadline': None}
+
+
+def replay(ops):
+    replica = TripCRDT()
+    replica.apply_all(ops)
+    return replica
+
+
+def visible(replica):
+    return replica.checklist(), replica.rejected_items(), replica.flags
+
+
+def two_writers():
+    alice, bob = HybridClock('alice'), HybridClock('bob')
+    base = ops_for_change(alice, 'items_added', {'items': [item('a'), item('b'), item('c')]})
+    ours = (ops_for_change(alice, 'item_toggled', {'item_id': 'a', 'completed': True})
+            + ops_for_change(alice, 'item_deleted', {'item_id': 'b', 'rejected': 'Item b'}))
+    bob.observe(ours[-1]['ts'])
+    theirs = (ops_for_change(bob, 'item_toggled', {'item_id': 'a', 'completed': False})
+              + ops_for_change(bob, 'item_added', {'item': item('d')})
+              + ops_for_change(bob, 'idea_saved', {'idea_id': 'i1', 'saved': True}))
+    return base, ours, theirs
+
+
+def test_apply_is_order_independent():
+    base, ours, theirs = two_writers()
+    ops = base + ours + theirs
+    expected = visible(replay(ops))
+    rng = random.Random(7)
+    for _ in range(20):
+        shuffled = list(ops)
+        rng.shuffle(shuffled)
+        assert visible(replay(shuffled)) == expected
+
+
+def test_apply_is_idempotent():
+    base, ours, theirs = two_writers()
+    ops = base + ours + theirs
+    assert visible(replay(ops + ops)) == visible(replay(ops))
+
+
+def test_merge_is_commutative():
+    base, ours, theirs = two_writers()
+    left, right = replay(base + ours), replay(base + theirs)
+
+    merged_lr = replay(base + ours)
+    merged_lr.merge(right)
+    merged_rl = replay(base + theirs)
+    merged_rl.merge(left)
+
+    assert visible(merged_lr) == visible(merged_rl) == visible(replay(base + ours + theirs))
+
+
+def test_merge_through_serialized_state():
+    base, ours, theirs = two_writers()
+    document = {'checklist': replay(base + ours).checklist(), 'crdt': replay(base + ours).to_state()}
+    replica = TripCRDT.from_document(document)
+    replica.apply_all(theirs)
+    assert visible(replica) == visible(replay(base + ours + theirs))
+
+
+def test_later_toggle_wins():
+    base, ours, theirs = two_writers()
+    replica = replay(base + ours + theirs)
+    # Bob's clock observed Alice's ops, so his toggle is the later one
+    assert {i['id']: i['completed'] for i in replica.checklist()}['a'] is False
+
+
+def test_re_add_after_delete_wins():
+    clock = HybridClock('alice')
+    ops = ops_for_change(clock, 'item_added', {'item': item('a')})
+    ops += ops_for_change(clock, 'item_deleted', {'item_id': 'a'})
+    ops += ops_for_change(clock, 'item_added', {'item': item('a')})
+    for order in itertools.permutations(ops):
+        assert [i['id'] for i in replay(order).checklist()] == ['a']
+
+
+def test_rejection_add_wins_over_concurrent_remove():
+    alice, bob = HybridClock('alice'), HybridClock('bob')
+    first = make_op(alice, 'rejected_added', text='Dole Whip')
+    # Bob removes only the tag he has seen ...
+    removed = make_op(bob, 'rejected_removed', text='Dole Whip', tags=[first['id']])
+    # ... while Alice rejects the same text again
+    again = make_op(alice, 'rejected_added', text='Dole Whip')
+
+    for order in itertools.permutations([first, removed, again]):
+        assert replay(order).rejected_items() == {'Dole Whip'}
+    assert replay([first, removed]).rejected_items() == set()
@@ -0,0 +1,78 @@
+import pytest
+
+from src.models.trip_data import IdeaSuggestion
+from src.storage.firestore import FirestoreTripStore
+from src.storage.versioning import VersionConflict
+
+
+def idea(idea_id, saved=False):
+    return IdeaSuggestion(id=idea_id, title=f"Idea {idea_id}", description="", category="dining",
+                          saved=saved)
+
+
+@pytest.fixture
+def store(db):
+    return FirestoreTripStore(db)
+
+
+def test_create_then_update(store):
+    version, _ = store.write_versioned('T1', {'ideas': [idea('a')]}, None)
+    assert version.version == 1
+    version, _ = store.write_versioned('T1', {'ideas': [idea('a'), idea('b')]}, version)
+    assert version.version == 2
+    assert [i.id for i in store.load('T1')['ideas']] == ['a', 'b']
+
+
+def test_conflict_merges_and_retries(store):
+    seen, _ = store.write_versioned('T1', {'ideas': [idea('a')]}, None)
+    # Another member writes first
+    store.write_versioned('T1', {'ideas': [idea('a'), idea('remote')]}, seen)
+
+    version, written = store.write_versioned('T1', {'ideas': [idea('a'), idea('local')]}, seen)
+    assert version.version == 3
+    assert {i.id for i in written['ideas']} == {'a', 'local', 'remote'}
+    assert {i.id for i in store.load('T1')['ideas']} == {'a', 'local', 'remote'}
+
+
+def test_conflict_without_resolver_keeps_local(store):
+    seen, _ = store.write_versioned('T1', {'ideas': [idea('a')]}, None)
+    store.write_versioned('T1', {'ideas': [idea('remote')]}, seen)
+
+    store.write_versioned('T1', {'ideas': [idea('local')]}, seen, resolve=None)
+    assert [i.id for i in store.load('T1')['ideas']] == ['local']
+
+
+def test_create_race_becomes_update(store):
+    store.write_versioned('T1', {'ideas': [idea('remote')]}, None)
+    version, _ = store.write_versioned('T1', {'ideas': [idea('local')]}, None)
+    assert version.version == 2
+    assert {i.id for i in store.load('T1')['ideas']} == {'local', 'remote'}
+
+
+def test_gives_up_after_retries(store, monkeypatch):
+    seen, _ = store.write_versioned('T1', {'ideas': [idea('a')]}, None)
+    store.write_versioned('T1', {'ideas': [idea('b')]}, seen)
+
+    def stale(local, remote):
+        # Keep losing: someone else writes again before every retry
+        store.db.collection('trips').document('T1').update({'touched': True})
+        return local
+
+    with pytest.raises(VersionConflict):
+        store.write_versioned('T1', {'ideas': [idea('c')]}, seen, resolve=stale, retries=2)
+
+
+def test_ops_are_written_and_merged(store):
+    from src.storage.crdt import HybridClock, ops_for_change
+    from src.storage.codec import encode_value
+    from src.models.trip_data import ChecklistItem
+
+    seen, _ = store.write_versioned('T1', {'checklist': [], 'ideas': []}, None)
+    item = ChecklistItem(id='x', text='Book Space Mountain')
+    ops = ops_for_change(HybridClock('a'), 'item_added', {'item': encode_value(item)})
+    store.write_versioned('T1', {}, seen, ops=ops)
+
+    assert store.load('T1')['checklist'] == [item]
+    assert store.compact_ops('T1', min_age=0) == 1
+    assert store.load_ops('T1') == []
+    assert store.load('T1')['checklist'] == [item]
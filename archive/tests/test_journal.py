@@ -0,0 +1,99 @@
+from src.models.trip_data import ChecklistItem
+from src.utils.journal import TripJournal
+
+
+def make_journal(tmp_path, **kwargs):
+    return TripJournal(tmp_path / 'journal.jsonl', tmp_path / 'snapshot.json',
+                       background=False, **kwargs)
+
+
+def item(item_id, text='Pack sunscreen'):
+    return ChecklistItem(id=item_id, text=text)
+
+
+def test_replay_applies_records_in_order(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append('item_added', item=item('a'))
+    journal.append('items_added', items=[item('b'), item('c')])
+    journal.append('item_toggled', item_id='b', completed=True)
+    journal.append('item_deleted', item_id='c', rejected='Pack sunscreen')
+    journal.close()
+
+    state = make_journal(tmp_path).load_state()
+    assert [i['id'] for i in state['checklist']] == ['a', 'b']
+    assert state['checklist'][1]['completed'] is True
+    assert state['rejected_items'] == ['Pack sunscreen']
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append('item_added', item=item('a'))
+    journal.append('item_added', item=item('b'))
+    journal.close()
+    with open(tmp_path / 'journal.jsonl', 'a', encoding='utf-8') as fh:
+        fh.write('{"seq":3,"op":"item_added","item":{"id":"c"')
+
+    reopened = make_journal(tmp_path)
+    assert [i['id'] for i in reopened.load_state()['checklist']] == ['a', 'b']
+    # The next record continues after the last complete one
+    assert reopened._seq == 2
+
+
+def test_append_after_torn_line_is_kept(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append('item_added', item=item('a'))
+    journal.close()
+    with open(tmp_path / 'journal.jsonl', 'a', encoding='utf-8') as fh:
+        fh.write('{"seq":2,"op":"item_ad')
+
+    reopened = make_journal(tmp_path)
+    reopened.append('item_added', item=item('b'))
+    reopened.append('item_added', item=item('c'))
+    reopened.close()
+
+    assert [i['id'] for i in make_journal(tmp_path).load_state()['checklist']] == ['a', 'b', 'c']
+
+
+def test_compact_folds_journal_into_snapshot(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.write_snapshot({'checklist': [item('a')]})
+    journal.append('item_added', item=item('b'))
+    before = journal.load_state()
+
+    assert journal.compact()
+    assert journal.journal_size() == 0
+    assert journal.load_state() == before
+    assert not journal.compact()
+
+
+def test_records_already_in_snapshot_are_skipped(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append('item_added', item=item('a'))
+    journal.compact()
+    # A crash between the snapshot rename and the truncate leaves old records behind
+    with open(tmp_path / 'journal.jsonl', 'a', encoding='utf-8') as fh:
+        fh.write('{"seq":1,"op":"item_added","item":{"id":"a","text":"x"}}\n')
+
+    assert [i['id'] for i in make_journal(tmp_path).load_state()['checklist']] == ['a']
+
+
+def test_load_returns_models(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append('item_added', item=item('a'))
+    loaded = journal.load()
+    assert loaded['checklist'] == [item('a')]
+
+
+def test_ideas_are_capped_keeping_saved_ones(tmp_path, monkeypatch):
+    from src.models.trip_data import IdeaSuggestion
+    from src.utils import journal as journal_module
+
+    monkeypatch.setattr(journal_module, 'MAX_IDEAS', 3)
+    ideas = [IdeaSuggestion(id=str(n), title=f"Idea {n}", description="", category="dining",
+                            saved=n == 0)
+             for n in range(5)]
+    journal = make_journal(tmp_path)
+    journal.append('ideas_added', ideas=ideas[:2])
+    journal.append('ideas_added', ideas=ideas[2:])
+
+    assert [i['id'] for i in journal.load_state()['ideas']] == ['0', '3', '4']